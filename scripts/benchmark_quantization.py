@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+量化/编译基准测试脚本
+在 multi-speaker.wav 上比较 FP32、动态 int8 量化和 torch.compile 的识别速度与字错误率 (CER)
+
+没有参考文本时以 FP32 的识别结果为参考,CER 反映的是相对 FP32 的偏差。
+
+用法:
+  python scripts/benchmark_quantization.py --whisper-model base
+  python scripts/benchmark_quantization.py --variants fp32 int8 --reference reference.txt --json q.json
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+import torch
+
+from whisper_diarization import model_registry
+from whisper_diarization.audio_processor import AudioProcessor
+from whisper_diarization.benchmark import synthetic_segments
+from whisper_diarization.speech_recognition import SpeechRecognition
+from whisper_diarization.utils.metrics import character_error_rate
+
+DEFAULT_AUDIO = Path(__file__).parent.parent / "multi-speaker.wav"
+
+# 变体名称 -> (quantize, compile_model)
+VARIANTS = {
+    "fp32": (False, False),
+    "int8": (True, False),
+    "compile": (False, True),
+    "int8+compile": (True, True),
+}
+
+
+def run_variant(name, args, waveform, sample_rate, segments) -> dict:
+    """加载一个变体并测量加载耗时、首次识别耗时、稳定识别耗时和识别文本"""
+    quantize, compile_model = VARIANTS[name]
+    model_registry.clear()
+
+    start = time.perf_counter()
+    recognizer = SpeechRecognition(
+        model_name=args.whisper_model, quantize=quantize, compile_model=compile_model
+    )
+    load_seconds = time.perf_counter() - start
+
+    def transcribe():
+        return recognizer.transcribe_segments(
+            waveform,
+            segments,
+            sample_rate,
+            batch_size=args.batch_size,
+            mel_cache=recognizer.create_mel_cache(waveform),
+        )
+
+    # 首次运行包含 torch.compile 的编译开销
+    start = time.perf_counter()
+    results = transcribe()
+    first_seconds = time.perf_counter() - start
+
+    best = first_seconds
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        results = transcribe()
+        best = min(best, time.perf_counter() - start)
+
+    return {
+        "variant": name,
+        "load_seconds": load_seconds,
+        "first_seconds": first_seconds,
+        "asr_seconds": best,
+        "text": "".join(r["text"] for r in results),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FP32 / int8 量化 / torch.compile 速度与 CER 对比")
+    parser.add_argument("--audio", default=str(DEFAULT_AUDIO), help="测试音频文件")
+    parser.add_argument("--whisper-model", default="base", help="Whisper 模型 (默认: base)")
+    parser.add_argument(
+        "--variants",
+        nargs="+",
+        default=["fp32", "int8"],
+        choices=list(VARIANTS),
+        help="要测试的变体,第一个作为速度基线 (默认: fp32 int8)",
+    )
+    parser.add_argument("--reference", default=None, help="参考文本文件,默认以 FP32 结果为参考")
+    parser.add_argument("--segment-length", type=float, default=20.0, help="识别片段时长(秒)")
+    parser.add_argument("--batch-size", type=int, default=1, help="识别批量大小 (默认: 1)")
+    parser.add_argument("--repeat", type=int, default=2, help="重复次数,取最短耗时")
+    parser.add_argument("--json", default=None, help="把结果写入 JSON 文件")
+    args = parser.parse_args()
+
+    processor = AudioProcessor()
+    waveform, sample_rate = processor.load_audio(args.audio)
+    duration = processor.get_duration(waveform, sample_rate)
+    segments = synthetic_segments(duration, turn=args.segment_length, speakers=1)
+
+    variants = list(args.variants)
+    if args.reference is None and "fp32" not in variants:
+        variants.insert(0, "fp32")
+
+    results = [run_variant(name, args, waveform, sample_rate, segments) for name in variants]
+
+    if args.reference:
+        reference = Path(args.reference).read_text(encoding="utf-8")
+    else:
+        reference = next(r["text"] for r in results if r["variant"] == "fp32")
+    baseline = results[0]["asr_seconds"]
+    for row in results:
+        row["rtf"] = row["asr_seconds"] / duration
+        row["speedup"] = baseline / row["asr_seconds"]
+        row["cer"] = character_error_rate(reference, row["text"])
+
+    print()
+    print(
+        f"音频: {args.audio} ({duration:.2f}s), Whisper 模型: {args.whisper_model}, "
+        f"线程数: {torch.get_num_threads()}"
+    )
+    print(f"CER 参考: {args.reference or 'fp32 识别结果'}")
+    print(
+        f"{'variant':<14}{'load(s)':>9}{'first(s)':>10}{'asr(s)':>9}{'RTF':>8}"
+        f"{'speedup':>9}{'CER':>8}"
+    )
+    for row in results:
+        print(
+            f"{row['variant']:<14}{row['load_seconds']:>9.2f}{row['first_seconds']:>10.2f}"
+            f"{row['asr_seconds']:>9.2f}{row['rtf']:>8.3f}{row['speedup']:>9.2f}"
+            f"{row['cer']:>8.3f}"
+        )
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "audio": args.audio,
+                    "duration": duration,
+                    "whisper_model": args.whisper_model,
+                    "threads": torch.get_num_threads(),
+                    "results": results,
+                },
+                f,
+                ensure_ascii=False,
+                indent=2,
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+线程数基准测试脚本
+在 multi-speaker.wav 上测量不同 torch 线程数下的处理吞吐量
+
+用法:
+  python scripts/benchmark_threads.py --whisper-model tiny
+  python scripts/benchmark_threads.py --threads 1 2 4 8 16 32 --diarization --offline
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+import torch
+
+from whisper_diarization.audio_processor import AudioProcessor
+from whisper_diarization.resources import available_cores
+from whisper_diarization.speaker_diarization import SpeakerDiarization
+from whisper_diarization.speech_recognition import SpeechRecognition
+
+DEFAULT_AUDIO = Path(__file__).parent.parent / "multi-speaker.wav"
+
+
+def default_thread_counts() -> list[int]:
+    """1, 2, 4, ... 直到可用核心数"""
+    counts, n = [], 1
+    while n < available_cores():
+        counts.append(n)
+        n *= 2
+    counts.append(available_cores())
+    return counts
+
+
+def measure(fn, repeat: int) -> float:
+    """返回 repeat 次运行中的最短耗时(秒)"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="不同线程数下的吞吐量基准测试")
+    parser.add_argument("--audio", default=str(DEFAULT_AUDIO), help="测试音频文件")
+    parser.add_argument("--whisper-model", default="tiny", help="Whisper 模型 (默认: tiny)")
+    parser.add_argument("--threads", type=int, nargs="+", default=None, help="要测试的线程数")
+    parser.add_argument("--repeat", type=int, default=2, help="每个线程数重复次数,取最短耗时")
+    parser.add_argument("--diarization", action="store_true", help="同时测试说话人分离阶段")
+    parser.add_argument("--offline", action="store_true", help="说话人分离使用离线模型")
+    parser.add_argument("--json", default=None, help="把结果写入 JSON 文件")
+    args = parser.parse_args()
+
+    processor = AudioProcessor()
+    waveform, sample_rate = processor.load_audio(args.audio)
+    duration = processor.get_duration(waveform, sample_rate)
+
+    recognizer = SpeechRecognition(model_name=args.whisper_model)
+    diarizer = SpeakerDiarization(offline=args.offline) if args.diarization else None
+    segments = [{"speaker": "SPEAKER_00", "start": 0.0, "end": duration}]
+
+    # 预热,排除首次运行的初始化开销
+    recognizer.transcribe_segments(waveform, segments, sample_rate)
+
+    results = []
+    for threads in args.threads or default_thread_counts():
+        torch.set_num_threads(threads)
+        row = {"threads": threads}
+
+        if diarizer is not None:
+            elapsed = measure(lambda: diarizer.diarize(waveform, sample_rate), args.repeat)
+            row["diarization_seconds"] = elapsed
+            row["diarization_rtf"] = elapsed / duration
+
+        elapsed = measure(
+            lambda: recognizer.transcribe_segments(waveform, segments, sample_rate), args.repeat
+        )
+        row["asr_seconds"] = elapsed
+        row["asr_rtf"] = elapsed / duration
+        row["asr_throughput"] = duration / elapsed
+        results.append(row)
+
+    print()
+    print(f"音频: {args.audio} ({duration:.2f}s), Whisper 模型: {args.whisper_model}")
+    header = f"{'threads':>8} {'asr(s)':>9} {'asr RTF':>9} {'音频秒/秒':>10}"
+    if diarizer is not None:
+        header += f" {'diar(s)':>9} {'diar RTF':>9}"
+    print(header)
+    for row in results:
+        line = (
+            f"{row['threads']:>8} {row['asr_seconds']:>9.2f} "
+            f"{row['asr_rtf']:>9.3f} {row['asr_throughput']:>10.2f}"
+        )
+        if diarizer is not None:
+            line += f" {row['diarization_seconds']:>9.2f} {row['diarization_rtf']:>9.3f}"
+        print(line)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(
+                {"audio": args.audio, "duration": duration, "results": results},
+                f,
+                ensure_ascii=False,
+                indent=2,
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -9,12 +9,36 @@ __version__ = "0.1.0"
 __author__ = "Your Name"
 __license__ = "MIT"
 
-from .audio_processor import AudioProcessor
-from .speaker_diarization import SpeakerDiarization
-from .speech_recognition import SpeechRecognition
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .audio_processor import AudioProcessor
+    from .speaker_diarization import SpeakerDiarization
+    from .speech_recognition import SpeechRecognition
+
+# 公开名称 -> 所在子模块;这些模块依赖 torch、pyannote.audio 和 whisper,
+# 首次访问时才导入 (PEP 562),使 `--help` 等不需要模型的操作保持快速
+_LAZY_ATTRS = {
+    "AudioProcessor": ".audio_processor",
+    "SpeakerDiarization": ".speaker_diarization",
+    "SpeechRecognition": ".speech_recognition",
+}
 
 __all__ = [
     "AudioProcessor",
     "SpeakerDiarization",
     "SpeechRecognition",
 ]
+
+
+def __getattr__(name: str):
+    if name in _LAZY_ATTRS:
+        value = getattr(importlib.import_module(_LAZY_ATTRS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> list[str]:
+    return sorted(list(globals()) + list(_LAZY_ATTRS))
@@ -3,12 +3,8 @@
 整合说话人分离和语音识别功能
 """
 
-import os
 import warnings
 
-# 禁用 NNPACK 以避免警告
-os.environ["OMP_NUM_THREADS"] = "1"
-
 # 过滤第三方库的弃用警告
 warnings.filterwarnings(
     "ignore", category=UserWarning, module="pyannote.audio.pipelines.speaker_verification"
@@ -24,21 +20,44 @@ warnings.filterwarnings("ignore", category=UserWarning, message=".*speechbrain.*
 warnings.filterwarnings("ignore", message=".*NNPACK.*")
 
 import argparse
-from datetime import datetime
+import sys
+from contextlib import ExitStack
 from pathlib import Path
+from typing import TYPE_CHECKING, Optional
 
 from . import config
-from .audio_processor import AudioProcessor
-from .speaker_diarization import SpeakerDiarization
-from .speech_recognition import SpeechRecognition
-from .utils.formatters import format_time, save_json, save_srt, save_text
+from .instrumentation import Tracer, set_tracer
+from .resources import configure_threads
+from .utils.formatters import open_segment_writer
 from .utils.logger import setup_logger
 
+if TYPE_CHECKING:
+    from .pipeline import PipelineOptions
+
+
+# --socket 任务中转发给工作进程的选项: 参数名 -> (任务字段, 取值转换)
+_SOCKET_OPTIONS = {
+    "whisper_model": ("whisper_model", None),
+    "asr_backend": ("asr_backend", None),
+    "quantize": ("quantize", None),
+    "compile": ("compile_model", None),
+    "batch_size": ("batch_size", None),
+    "merge_gap": ("merge_gap", None),
+    "no_mel_cache": ("mel_cache", lambda value: not value),
+    "low_memory": ("low_memory", None),
+    "audio_backend": ("audio_backend", None),
+    "vad": ("vad", None),
+    "mode": ("mode", None),
+    "asr_workers": ("asr_workers", None),
+    "diarization_chunk": ("diarization_chunk", None),
+    "diarization_workers": ("diarization_workers", None),
+    "speaker_index": ("speaker_index", lambda value: str(Path(value).absolute())),
+    "split_channels": ("split_channels", None),
+}
 
-def main() -> None:
-    """主函数 - 命令行入口"""
-    logger = setup_logger()
 
+def build_parser() -> argparse.ArgumentParser:
+    """创建命令行参数解析器"""
     parser = argparse.ArgumentParser(
         description="中文说话人分离和语音识别工具",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -50,12 +69,51 @@ def main() -> None:
   # 指定输出格式
   python -m whisper_diarization --audio audio.wav --offline --format srt
   
+  # 边识别边写入(长音频可实时查看进度)
+  python -m whisper_diarization --audio long.wav --offline --format jsonl --stream
+  
   # 使用更大的 Whisper 模型
   python -m whisper_diarization --audio audio.wav --offline --whisper-model large
+  
+  # CPU 上使用 faster-whisper (int8) 后端
+  python -m whisper_diarization --audio audio.wav --offline --asr-backend faster-whisper
+  
+  # CPU 上使用动态 int8 量化的 Whisper 模型(首次运行时转换并缓存)
+  python -m whisper_diarization --audio audio.wav --offline --quantize
+  
+  # 批量解码短片段以提升吞吐
+  python -m whisper_diarization --audio audio.wav --offline --batch-size 8
+  
+  # 频繁切换说话人的对话: 整段识别后按词对齐到说话人
+  python -m whisper_diarization --audio dialog.wav --offline --mode align
+  
+  # 数小时的录音: 按 10 分钟分块分离说话人,2 个进程并行
+  python -m whisper_diarization --audio hearing.wav --offline --diarization-chunk 600 --diarization-workers 2
+  
+  # 双声道电话录音: 每个声道是一个说话人,跳过 pyannote
+  python -m whisper_diarization --audio call.wav --offline --split-channels
+  
+  # 登记说话人,之后的录音中把匹配的说话人标注为登记的名称
+  python -m whisper_diarization --audio zhang_san.wav --offline --enroll 张三
+  python -m whisper_diarization --audio meeting.wav --offline --speaker-index
+  
+  # 长会议录音: 4 个进程并行识别片段
+  python -m whisper_diarization --audio meeting.wav --offline --asr-workers 4
+  
+  # 批量处理目录中的所有音频,4 个工作进程并行
+  python -m whisper_diarization --batch recordings/ --offline --workers 4 --output-dir results/
+  
+  # 实时处理麦克风或音频流(16kHz 单声道 s16le PCM)
+  arecord -f S16_LE -r 16000 -c 1 | python -m whisper_diarization --live - --offline --whisper-model base
+  python -m whisper_diarization --live tcp://127.0.0.1:9000 --offline --output live.jsonl --format jsonl
+  
+  # 启动常驻工作进程,之后的任务无需重新加载模型
+  python -m whisper_diarization --serve --offline
+  python -m whisper_diarization --audio audio.wav --socket
         """,
     )
 
-    parser.add_argument("--audio", required=True, help="输入音频文件路径")
+    parser.add_argument("--audio", default=None, help="输入音频文件路径")
     parser.add_argument("--output", default=None, help="输出文件路径,默认保存到 output 目录")
     parser.add_argument(
         "--offline",
@@ -74,7 +132,217 @@ def main() -> None:
         help=f"Whisper 模型大小 (默认: {config.WHISPER_MODEL})",
     )
     parser.add_argument(
-        "--format", default="json", choices=["json", "text", "srt"], help="输出格式 (默认: json)"
+        "--asr-backend",
+        default=config.ASR_BACKEND,
+        choices=["whisper", "faster-whisper"],
+        help="语音识别后端: whisper (openai-whisper) 或 faster-whisper "
+        f"(CTranslate2 {config.ASR_COMPUTE_TYPE} 量化,CPU 上更快,需安装 faster-whisper) "
+        f"(默认: {config.ASR_BACKEND})",
+    )
+    parser.add_argument(
+        "--quantize",
+        action="store_true",
+        help="whisper 后端: 对 Linear 层做动态 int8 量化(仅 CPU,量化模型缓存在磁盘上)",
+    )
+    parser.add_argument(
+        "--compile",
+        action="store_true",
+        help="whisper 后端: 用 torch.compile 编译编码器(首次调用较慢,需要 C++ 编译器)",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=config.WHISPER_BATCH_SIZE,
+        help=f"批量解码大小,大于 1 时将短片段打包批量识别 (默认: {config.WHISPER_BATCH_SIZE})",
+    )
+    parser.add_argument(
+        "--merge-gap",
+        type=float,
+        nargs="?",
+        const=config.MERGE_MAX_GAP,
+        default=None,
+        help=f"识别前合并同一说话人间隔小于该值(秒)的相邻片段 (不带值时: {config.MERGE_MAX_GAP})",
+    )
+    parser.add_argument(
+        "--no-mel-cache",
+        action="store_true",
+        help="逐片段计算 log-mel 频谱,而不是对整个文件计算一次后按片段切片",
+    )
+    parser.add_argument(
+        "--low-memory",
+        action="store_true",
+        help="低内存模式: 不把整个音频加载到内存,按片段从文件读取(适合数小时的长录音)",
+    )
+    parser.add_argument(
+        "--audio-backend",
+        default=config.AUDIO_BACKEND,
+        choices=["torchaudio", "ffmpeg"],
+        help=f"音频解码后端,ffmpeg 在子进程中解码并重采样 (默认: {config.AUDIO_BACKEND})",
+    )
+    parser.add_argument(
+        "--vad",
+        action="store_true",
+        help="识别前按能量检测语音,裁剪片段首尾静音并跳过不含语音的片段(如长时间等待音)",
+    )
+    parser.add_argument(
+        "--mode",
+        default="sequential",
+        choices=["sequential", "pipelined", "align"],
+        help="执行模式: sequential 先完成说话人分离再逐片段识别; pipelined 按窗口分离并同时识别; "
+        "align 整段按 30 秒窗口识别后按词级时间戳分配给说话人,适合频繁切换说话人的对话 "
+        "(默认: sequential)",
+    )
+    parser.add_argument(
+        "--diarization-chunk",
+        type=float,
+        nargs="?",
+        const=config.DIARIZATION_CHUNK,
+        default=None,
+        metavar="SECONDS",
+        help="长音频分块说话人分离: 按固定时长分块独立分离,再对各分块的说话人中心向量全局聚类,"
+        f"内存占用只与分块时长有关 (不带数值时为 {config.DIARIZATION_CHUNK:g} 秒)",
+    )
+    parser.add_argument(
+        "--diarization-workers",
+        type=int,
+        default=1,
+        help="分块说话人分离时并行处理分块的进程数,每个进程加载一份模型 (默认: 1)",
+    )
+    parser.add_argument(
+        "--split-channels",
+        action="store_true",
+        help="分声道说话人分离: 多声道录音(如坐席和客户分别录在两个声道的电话录音)按各声道的"
+        "语音活动得到说话人片段并分别识别,不运行 pyannote;声道之间串音时自动回退到常规说话人分离",
+    )
+    parser.add_argument(
+        "--speaker-index",
+        nargs="?",
+        const=str(config.SPEAKER_INDEX_DIR),
+        default=None,
+        metavar="DIR",
+        help="说话人分离后按已登记说话人的嵌入向量识别身份,匹配的说话人标注为登记的名称 "
+        f"(不带目录时为 {config.SPEAKER_INDEX_DIR})",
+    )
+    parser.add_argument(
+        "--enroll",
+        metavar="NAME",
+        help="登记说话人: 取 --audio 中说话最多的说话人的嵌入向量,以 NAME 存入 --speaker-index 目录",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="不使用结果缓存,总是重新执行说话人分离和语音识别",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=None,
+        help=f"结果缓存目录 (默认: {config.CACHE_DIR})",
+    )
+    parser.add_argument(
+        "--threads",
+        type=int,
+        default=config.NUM_THREADS,
+        help="torch intra-op 线程数 (默认: 全部可用核心)",
+    )
+    parser.add_argument(
+        "--interop-threads",
+        type=int,
+        default=config.INTEROP_THREADS,
+        help="torch inter-op 线程数 (默认: 由 torch 决定)",
+    )
+    parser.add_argument(
+        "--diarization-threads",
+        type=int,
+        default=config.DIARIZATION_THREADS,
+        help="说话人分离阶段的线程数 (默认: 与 --threads 相同)",
+    )
+    parser.add_argument(
+        "--asr-threads",
+        type=int,
+        default=config.ASR_THREADS,
+        help="语音识别阶段的线程数 (默认: 与 --threads 相同)",
+    )
+    parser.add_argument(
+        "--asr-workers",
+        type=int,
+        default=config.ASR_WORKERS,
+        help="单个文件的语音识别进程数,大于 1 时片段分片到多个进程并行识别,"
+        "每个进程加载一份模型,线程数由 --asr-threads 指定(默认平分核心) (默认: 1)",
+    )
+    parser.add_argument(
+        "--format",
+        default="json",
+        choices=["json", "jsonl", "text", "srt"],
+        help="输出格式 (默认: json)",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="每识别完一个片段就追加写入输出文件 (jsonl/text/srt),处理过程中即可查看结果",
+    )
+    parser.add_argument(
+        "--trace",
+        default=None,
+        metavar="FILE",
+        help="把各阶段/各片段的耗时、计数器和内存采样导出为 JSON trace 文件",
+    )
+    parser.add_argument(
+        "--chrome-trace",
+        default=None,
+        metavar="FILE",
+        help="导出 Chrome trace 格式文件,可在 chrome://tracing 或 Perfetto 中查看",
+    )
+    parser.add_argument(
+        "--batch",
+        default=None,
+        metavar="INPUT",
+        help="批量模式: 音频目录、通配符(如 'calls/*.wav')或清单文件(每行一个路径)",
+    )
+    parser.add_argument(
+        "--output-dir",
+        default=None,
+        help="批量模式的输出目录 (默认: output)",
+    )
+    parser.add_argument(
+        "--live",
+        default=None,
+        metavar="SOURCE",
+        help="实时模式: 从标准输入(-)、命名管道或 tcp://host:port 读取 16kHz 单声道 PCM 流,"
+        "边接收边输出临时和最终结果",
+    )
+    parser.add_argument(
+        "--live-format",
+        default="s16le",
+        choices=["s16le", "f32le"],
+        help="实时模式的 PCM 采样格式 (默认: s16le)",
+    )
+    parser.add_argument(
+        "--no-partial",
+        action="store_true",
+        help="实时模式下只输出最终结果,不输出进行中片段的临时结果",
+    )
+    parser.add_argument("--workers", type=int, default=1, help="批量模式的工作进程数 (默认: 1)")
+    parser.add_argument(
+        "--threads-per-worker",
+        type=int,
+        default=None,
+        help="批量模式下每个工作进程的线程数 (默认: 可用核心数 / 工作进程数)",
+    )
+    parser.add_argument(
+        "--serve",
+        nargs="?",
+        const=config.WORKER_SOCKET,
+        default=None,
+        metavar="SOCKET",
+        help=f"启动常驻工作进程,模型常驻内存并通过 Unix socket 接收任务 (默认: {config.WORKER_SOCKET})",
+    )
+    parser.add_argument(
+        "--socket",
+        nargs="?",
+        const=config.WORKER_SOCKET,
+        default=None,
+        metavar="SOCKET",
+        help="将任务提交给已启动的常驻工作进程处理",
     )
     parser.add_argument(
         "--log-level",
@@ -82,83 +350,198 @@ def main() -> None:
         choices=["DEBUG", "INFO", "WARNING", "ERROR"],
         help="日志级别 (默认: INFO)",
     )
+    return parser
+
+
+def explicit_options(argv: Optional[list[str]] = None) -> set[str]:
+    """
+    命令行中显式给出的选项
+
+    Args:
+        argv: 命令行参数,默认 sys.argv[1:]
+
+    Returns:
+        显式给出的参数名 (argparse dest) 集合
+    """
+    parser = build_parser()
+    for action in parser._actions:
+        action.default = argparse.SUPPRESS
+    return set(vars(parser.parse_args(argv)))
+
+
+def socket_job(args: argparse.Namespace, explicit: set[str], audio_path: Path) -> dict[str, object]:
+    """
+    构造提交给常驻工作进程的任务
+
+    只转发显式给出的处理选项,其余选项使用工作进程启动时的设置(如 --serve --whisper-model)。
 
+    Args:
+        args: 解析后的命令行参数
+        explicit: 显式给出的参数名,参见 explicit_options
+        audio_path: 音频文件路径
+
+    Returns:
+        任务字典
+    """
+    job: dict[str, object] = {"audio": str(audio_path.absolute()), "format": args.format}
+    for dest, (key, convert) in _SOCKET_OPTIONS.items():
+        if dest in explicit:
+            value = getattr(args, dest)
+            job[key] = convert(value) if convert and value is not None else value
+    if args.output:
+        job["output"] = str(Path(args.output).absolute())
+    return job
+
+
+def main() -> None:
+    """主函数 - 命令行入口"""
+    logger = setup_logger()
+
+    parser = build_parser()
     args = parser.parse_args()
 
     # 更新日志级别
     logger.setLevel(args.log_level)
 
+    # 处理流程依赖 torch、pyannote.audio 和 whisper,解析参数之后再导入,
+    # 使 --help 和参数错误立即返回
+    from .batch import collect_inputs, run_batch
+    from .pipeline import (
+        PipelineOptions,
+        enroll_speaker,
+        process_audio,
+        resolve_output_path,
+        save_result,
+    )
+    from .server import serve, submit_job
+
+    options = PipelineOptions(
+        whisper_model=args.whisper_model,
+        asr_backend=args.asr_backend,
+        quantize=args.quantize,
+        compile_model=args.compile,
+        hf_token=args.hf_token,
+        offline=args.offline,
+        batch_size=args.batch_size,
+        merge_gap=args.merge_gap,
+        mel_cache=not args.no_mel_cache,
+        low_memory=args.low_memory,
+        audio_backend=args.audio_backend,
+        vad=args.vad,
+        mode=args.mode,
+        use_cache=not args.no_cache,
+        cache_dir=args.cache_dir,
+        diarization_threads=args.diarization_threads,
+        asr_threads=args.asr_threads,
+        asr_workers=args.asr_workers,
+        diarization_chunk=args.diarization_chunk,
+        diarization_workers=args.diarization_workers,
+        speaker_index=args.speaker_index,
+        split_channels=args.split_channels,
+    )
+
+    # 批量模式下线程数由各工作进程自行设置
+    if not args.batch:
+        threads = configure_threads(args.threads, args.interop_threads)
+        logger.debug(f"torch 线程数: {threads}")
+
+    # 常驻工作进程模式
+    if args.serve:
+        serve(args.serve, options)
+        return
+
+    # 批量模式
+    if args.batch:
+        if args.workers < 1:
+            parser.error("--workers 必须至少为 1")
+        inputs = collect_inputs(args.batch)
+        if not inputs:
+            logger.error(f"没有找到音频文件: {args.batch}")
+            return
+        output_dir = Path(args.output_dir) if args.output_dir else config.OUTPUT_DIR
+        run_batch(
+            inputs,
+            output_dir,
+            args.format,
+            options,
+            workers=args.workers,
+            threads_per_worker=args.threads_per_worker or args.threads,
+        )
+        return
+
+    # 实时流模式
+    if args.live:
+        if args.output and args.format == "json":
+            parser.error("--live 输出到文件时需要 jsonl、text 或 srt 格式")
+        _run_live(args, options)
+        return
+
+    if not args.audio:
+        parser.error("需要指定 --audio、--batch 或 --live 参数")
+    if args.stream and args.format == "json":
+        parser.error("--stream 需要 jsonl、text 或 srt 格式")
+
     # 验证音频文件
     audio_path = Path(args.audio)
     if not audio_path.exists():
         logger.error(f"音频文件不存在: {audio_path}")
         return
 
+    # 登记说话人
+    if args.enroll:
+        index_dir = args.speaker_index or config.SPEAKER_INDEX_DIR
+        enroll_speaker(audio_path, args.enroll, index_dir, options)
+        logger.info(f"已登记说话人 {args.enroll}: {index_dir}")
+        return
+
+    # 提交到常驻工作进程
+    if args.socket:
+        job = socket_job(args, explicit_options(), audio_path)
+        response = submit_job(job, args.socket)
+        if response["status"] != "ok":
+            logger.error(f"工作进程处理失败: {response['error']}")
+            raise SystemExit(1)
+        logger.info(f"结果已保存到: {response['output']}")
+        return
+
     logger.info("=" * 60)
     logger.info("中文说话人分离和语音识别")
     logger.info("=" * 60)
     logger.info(f"音频文件: {audio_path}")
     logger.info(f"运行模式: {'离线模式' if args.offline else '在线模式'}")
-    logger.info(f"Whisper 模型: {args.whisper_model}")
+    logger.info(f"Whisper 模型: {args.whisper_model} ({args.asr_backend})")
     logger.info(f"设备: {config.DEVICE}")
     logger.info("=" * 60)
 
+    tracer = None
+    if args.trace or args.chrome_trace:
+        tracer = Tracer()
+        set_tracer(tracer)
+
     try:
-        # 1. 加载音频
-        logger.info("[1/4] 加载音频文件...")
-        processor = AudioProcessor()
-        waveform, sample_rate = processor.load_audio(str(audio_path))
-        duration = processor.get_duration(waveform, sample_rate)
-        logger.info(f"音频时长: {format_time(duration)}")
-
-        # 2. 说话人分离
-        logger.info("[2/4] 执行说话人分离...")
-        diarizer = SpeakerDiarization(hf_token=args.hf_token, offline=args.offline)
-        segments = diarizer.diarize(str(audio_path))
-
-        # 显示统计信息
-        stats = diarizer.get_speaker_statistics(segments)
-        logger.info("说话人统计:")
-        for speaker, info in stats.items():
-            logger.info(
-                f"  {speaker}: {info['segment_count']} 个片段, "
-                f"总时长 {format_time(info['total_duration'])}"
-            )
+        output_path = resolve_output_path(args.output, args.format)
 
-        # 3. 语音识别
-        logger.info("[3/4] 执行语音识别...")
-        recognizer = SpeechRecognition(model_name=args.whisper_model)
-        results = recognizer.transcribe_segments(waveform, segments, sample_rate)
-
-        # 4. 保存结果
-        logger.info("[4/4] 保存结果...")
-
-        # 准备输出数据
-        output_data = {
-            "audio_file": str(audio_path.absolute()),
-            "duration": duration,
-            "speakers": len(stats),
-            "segments": results,
-            "statistics": stats,
-            "timestamp": datetime.now().isoformat(),
-        }
-
-        # 确定输出路径
-        if args.output:
-            output_path = Path(args.output)
+        if args.stream:
+            # 增量输出: 片段识别完成即写入,结束时补充汇总信息
+            logger.info(f"识别结果将实时写入: {output_path}")
+            with open_segment_writer(
+                output_path, args.format, audio_file=str(audio_path.absolute())
+            ) as writer:
+                output_data = process_audio(audio_path, options, on_segment=writer.write_segment)
+                logger.info("[4/4] 写入汇总信息...")
+                writer.finalize(output_data)
         else:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            output_path = config.OUTPUT_DIR / f"result_{timestamp}.{args.format}"
+            output_data = process_audio(audio_path, options)
 
-        # 根据格式保存
-        if args.format == "json":
-            save_json(output_data, output_path)
-        elif args.format == "text":
-            save_text(output_data, output_path)
-        elif args.format == "srt":
-            save_srt(output_data, output_path)
+            # 4. 保存结果
+            logger.info("[4/4] 保存结果...")
+            save_result(output_data, output_path, args.format)
 
         logger.info(f"结果已保存到: {output_path}")
+
+        if tracer is not None:
+            _report_trace(tracer, args.trace, args.chrome_trace)
+
         logger.info("处理完成!")
         logger.info("=" * 60)
 
@@ -167,5 +550,96 @@ def main() -> None:
         raise
 
 
+def _run_live(args: argparse.Namespace, options: "PipelineOptions") -> None:
+    """实时流模式: 边接收音频边输出识别结果,最终结果可同时写入文件"""
+    from .live import LiveTranscriber, open_stream
+    from .speaker_diarization import SpeakerDiarization
+    from .speech_recognition import create_recognizer
+    from .utils.formatters import format_time
+
+    logger = setup_logger()
+    diarizer = SpeakerDiarization(hf_token=options.hf_token, offline=options.offline)
+    recognizer = create_recognizer(
+        options.whisper_model,
+        options.asr_backend,
+        quantize=options.quantize,
+        compile_model=options.compile_model,
+    )
+
+    tracer = None
+    if args.trace or args.chrome_trace:
+        tracer = Tracer()
+        set_tracer(tracer)
+
+    with ExitStack() as stack:
+        writer = None
+        if args.output:
+            writer = stack.enter_context(
+                open_segment_writer(
+                    Path(args.output), args.format, audio_file=args.live, flush_interval=0
+                )
+            )
+
+        def on_segment(segment: dict) -> None:
+            tag = "最终" if segment["final"] else "临时"
+            logger.info(
+                f"[{tag}] [{format_time(segment['start'])} - {format_time(segment['end'])}] "
+                f"{segment['speaker']}: {segment['text']} (延迟 {segment['latency']:.2f}s)"
+            )
+            if writer is not None and segment["final"]:
+                writer.write_segment({k: segment[k] for k in ("speaker", "start", "end", "text")})
+
+        engine = LiveTranscriber(
+            diarizer,
+            recognizer,
+            partial_interval=0 if args.no_partial else None,
+            on_segment=on_segment,
+        )
+        stream = open_stream(args.live)
+        logger.info(f"实时模式: 正在读取 {args.live} ({args.live_format}, {engine.sample_rate}Hz)")
+        try:
+            engine.run(stream, fmt=args.live_format)
+        except KeyboardInterrupt:
+            logger.info("已停止,输出剩余片段...")
+            engine.flush()
+        finally:
+            if stream is not sys.stdin.buffer:
+                stream.close()
+
+        summary = engine.summary()
+        if writer is not None:
+            writer.finalize(summary)
+            logger.info(f"结果已保存到: {args.output}")
+
+    logger.info(
+        f"共 {len(summary['segments'])} 个片段, {summary['speakers']} 个说话人, "
+        f"平均延迟 {summary['latency_mean']:.2f}s, 最大延迟 {summary['latency_max']:.2f}s"
+    )
+    if tracer is not None:
+        _report_trace(tracer, args.trace, args.chrome_trace)
+
+
+def _report_trace(
+    tracer: Tracer, trace_path: Optional[str] = None, chrome_trace_path: Optional[str] = None
+) -> None:
+    """输出埋点汇总并导出 trace 文件"""
+    logger = setup_logger()
+
+    logger.info("各阶段耗时:")
+    for name, item in sorted(tracer.summary().items(), key=lambda kv: -kv[1]["total"]):
+        logger.info(
+            f"  {name}: {item['count']} 次, 总计 {item['total']:.3f}s, 最长 {item['max']:.3f}s"
+        )
+    for name, value in tracer.counters.items():
+        logger.info(f"  {name}: {value:g}")
+
+    if trace_path:
+        tracer.dump_json(Path(trace_path))
+        logger.info(f"trace 已保存到: {trace_path}")
+    if chrome_trace_path:
+        tracer.dump_chrome_trace(Path(chrome_trace_path))
+        logger.info(f"Chrome trace 已保存到: {chrome_trace_path}")
+
+
 if __name__ == "__main__":
     main()
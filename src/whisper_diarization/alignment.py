@@ -0,0 +1,166 @@
+"""
+词级对齐模块
+整段识别得到带时间戳的词后,通过区间树查找与每个词重叠的说话人片段,把词分配给说话人
+"""
+
+import bisect
+from typing import Optional
+
+
+class _Node:
+    """区间树节点: 跨过中心点的区间按开始时间升序、结束时间降序各存一份"""
+
+    __slots__ = ("center", "by_start", "by_end", "left", "right")
+
+    def __init__(self, center: float, by_start: list, by_end: list, left, right):
+        self.center = center
+        self.by_start = by_start
+        self.by_end = by_end
+        self.left = left
+        self.right = right
+
+
+class IntervalTree:
+    """
+    静态区间树 (centered interval tree)
+
+    区间按闭区间处理,查询与 [start, end] 重叠的区间为 O(log n + k)。
+    """
+
+    def __init__(self, intervals: list[tuple[float, float]]):
+        """
+        构建区间树
+
+        Args:
+            intervals: (start, end) 区间列表,查询结果为区间在列表中的下标
+        """
+        self.intervals = intervals
+        self._root = self._build(list(range(len(intervals))))
+
+        # 查找最近区间用: 按开始时间和结束时间排序的下标
+        self._by_start = sorted(range(len(intervals)), key=lambda i: intervals[i][0])
+        self._starts = [intervals[i][0] for i in self._by_start]
+        self._by_end = sorted(range(len(intervals)), key=lambda i: intervals[i][1])
+        self._ends = [intervals[i][1] for i in self._by_end]
+
+    def _build(self, indices: list[int]) -> Optional[_Node]:
+        if not indices:
+            return None
+        points = sorted(p for i in indices for p in self.intervals[i])
+        center = points[len(points) // 2]
+
+        left, right, here = [], [], []
+        for i in indices:
+            start, end = self.intervals[i]
+            if end < center:
+                left.append(i)
+            elif start > center:
+                right.append(i)
+            else:
+                here.append(i)
+
+        return _Node(
+            center,
+            [(self.intervals[i][0], i) for i in sorted(here, key=lambda i: self.intervals[i][0])],
+            [(self.intervals[i][1], i) for i in sorted(here, key=lambda i: -self.intervals[i][1])],
+            self._build(left),
+            self._build(right),
+        )
+
+    def overlapping(self, start: float, end: float) -> list[int]:
+        """
+        查询与 [start, end] 重叠的区间
+
+        Args:
+            start: 查询开始时间
+            end: 查询结束时间(等于 start 时为时间点查询)
+
+        Returns:
+            重叠区间的下标(升序)
+        """
+        found: list[int] = []
+        self._query(self._root, start, end, found)
+        return sorted(found)
+
+    def _query(self, node: Optional[_Node], start: float, end: float, found: list[int]) -> None:
+        while node is not None:
+            if end < node.center:
+                # 节点内区间都包含中心点,只需比较开始时间
+                for interval_start, i in node.by_start:
+                    if interval_start > end:
+                        break
+                    found.append(i)
+                node = node.left
+            elif start > node.center:
+                # 只需比较结束时间
+                for interval_end, i in node.by_end:
+                    if interval_end < start:
+                        break
+                    found.append(i)
+                node = node.right
+            else:
+                # 查询范围包含中心点: 节点内区间全部重叠,两侧子树都要查找
+                found.extend(i for _, i in node.by_start)
+                self._query(node.left, start, end, found)
+                node = node.right
+
+    def nearest(self, point: float) -> Optional[int]:
+        """
+        查找离时间点最近的区间,包含该时间点的区间距离为 0
+
+        Args:
+            point: 时间点(秒)
+
+        Returns:
+            最近区间的下标,没有区间时返回 None
+        """
+        containing = self.overlapping(point, point)
+        if containing:
+            return containing[0]
+
+        candidates = []
+        before = bisect.bisect_right(self._ends, point) - 1
+        if before >= 0:
+            candidates.append((point - self._ends[before], self._by_end[before]))
+        after = bisect.bisect_left(self._starts, point)
+        if after < len(self._starts):
+            candidates.append((self._starts[after] - point, self._by_start[after]))
+        return min(candidates)[1] if candidates else None
+
+
+def assign_words(words: list[dict], segments: list[dict], offset: float = 0.0) -> list[str]:
+    """
+    把整段识别得到的词分配给说话人片段
+
+    每个词归入与其时间范围重叠最多的片段(重叠相同时取较短的片段);
+    不与任何片段重叠的词(如落在片段间隙中)归入最近的片段。
+
+    Args:
+        words: 词列表,每个词包含 word、start、end(相对 offset)
+        segments: 说话人片段列表(绝对时间),可以相互重叠
+        offset: 词时间戳相对完整音频的偏移(秒)
+
+    Returns:
+        与 segments 顺序一致的文本列表
+    """
+    if not segments:
+        return []
+    tree = IntervalTree([(s["start"], s["end"]) for s in segments])
+    pieces: list[list[str]] = [[] for _ in segments]
+
+    for word in words:
+        start, end = offset + word["start"], offset + word["end"]
+        best, best_score = None, (0.0, 0.0)
+        for i in tree.overlapping(start, end):
+            segment = segments[i]
+            overlap = min(end, segment["end"]) - max(start, segment["start"])
+            # 重叠相同时取较短的片段: 落在长片段中的插话属于插话的说话人
+            score = (overlap, segment["start"] - segment["end"])
+            if overlap > 0 and (best is None or score > best_score):
+                best, best_score = i, score
+        if best is None:
+            # 只在边界接触、零时长的词或落在间隙中的词按中点归入最近的片段
+            best = tree.nearest((start + end) / 2)
+        pieces[best].append(word["word"])
+
+    return ["".join(piece).strip() for piece in pieces]
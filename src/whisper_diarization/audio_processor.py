@@ -3,30 +3,433 @@
 负责音频加载、格式转换和分段处理
 """
 
+import functools
+import shutil
+import struct
+import subprocess
+import tempfile
+from collections.abc import Iterator
 from pathlib import Path
+from typing import Callable, Optional, Union
 
+import numpy as np
 import torch
 import torchaudio
 
+from . import config
+from .instrumentation import span
+
+# 可直接内存映射的 WAV 采样格式: (格式码, 位深) -> (numpy dtype, 归一化偏移, 归一化系数)
+_WAV_DTYPES = {
+    (1, 8): (np.uint8, 128.0, 128.0),
+    (1, 16): (np.dtype("<i2"), 0.0, 32768.0),
+    (1, 32): (np.dtype("<i4"), 0.0, 2147483648.0),
+    (3, 32): (np.dtype("<f4"), 0.0, 1.0),
+}
+
+
+def _parse_wav_header(path: Path) -> Optional[tuple[int, int, int, int, int, int]]:
+    """
+    解析 WAV 文件头
+
+    Returns:
+        (data_offset, data_size, channels, sample_rate, bits_per_sample, format_code),
+        不是 RIFF/WAVE 文件时返回 None
+    """
+    with open(path, "rb") as f:
+        header = f.read(12)
+        if len(header) < 12 or header[:4] != b"RIFF" or header[8:12] != b"WAVE":
+            return None
+
+        fmt = None
+        while True:
+            chunk = f.read(8)
+            if len(chunk) < 8:
+                return None
+            chunk_id, chunk_size = struct.unpack("<4sI", chunk)
+
+            if chunk_id == b"fmt ":
+                body = f.read(chunk_size)
+                format_code, channels, sample_rate = struct.unpack("<HHI", body[:8])
+                bits = struct.unpack("<H", body[14:16])[0]
+                # WAVE_FORMAT_EXTENSIBLE: 真实格式码位于子格式 GUID 的前两个字节
+                if format_code == 0xFFFE and len(body) >= 26:
+                    format_code = struct.unpack("<H", body[24:26])[0]
+                fmt = (channels, sample_rate, bits, format_code)
+            elif chunk_id == b"data":
+                if fmt is None:
+                    return None
+                return (f.tell(), chunk_size, *fmt)
+            else:
+                f.seek(chunk_size, 1)
+
+            # RIFF 块按偶数字节对齐
+            if chunk_size % 2:
+                f.seek(1, 1)
+
+
+# 分块重采样时每块的输入时长(秒)
+RESAMPLE_CHUNK_DURATION = 30.0
+
+
+@functools.lru_cache(maxsize=16)
+def get_resampler(orig_sample_rate: int, sample_rate: int) -> torchaudio.transforms.Resample:
+    """
+    获取重采样器,按 (原采样率, 目标采样率) 缓存,sinc 卷积核只计算一次
+
+    Args:
+        orig_sample_rate: 原采样率
+        sample_rate: 目标采样率
+
+    Returns:
+        torchaudio 重采样器
+    """
+    return torchaudio.transforms.Resample(orig_sample_rate, sample_rate)
+
+
+def _resample_frames(
+    read: Callable[[int, int], torch.Tensor],
+    num_frames: int,
+    num_channels: int,
+    orig_sample_rate: int,
+    sample_rate: int,
+    downmix: bool,
+    chunk_duration: float,
+) -> torch.Tensor:
+    """
+    分块读取、混音并重采样,结果直接写入预分配的输出张量
+
+    与 torchaudio 的 sinc 重采样逐点一致: 输出按 (原采样率 / gcd) 个输入采样为步长分块,
+    每块额外读取卷积核宽度的上下文,因此不需要整段填充后的副本和整段卷积的中间结果。
+
+    Args:
+        read: read(start, end) 返回 (channels, end - start) 的原始采样
+        num_frames: 总帧数
+        num_channels: 声道数
+        orig_sample_rate: 原采样率
+        sample_rate: 目标采样率
+        downmix: 是否逐块混音为单声道
+        chunk_duration: 每块的输入时长(秒)
+
+    Returns:
+        (channels, samples) 的重采样结果
+    """
+    channels = 1 if downmix else num_channels
+
+    if orig_sample_rate == sample_rate:
+        output = torch.empty(channels, num_frames)
+        step = max(int(chunk_duration * orig_sample_rate), 1)
+        for start in range(0, num_frames, step):
+            end = min(start + step, num_frames)
+            chunk = read(start, end)
+            output[:, start:end] = chunk.mean(dim=0, keepdim=True) if downmix else chunk
+        return output
+
+    resampler = get_resampler(orig_sample_rate, sample_rate)
+    orig = orig_sample_rate // resampler.gcd
+    new = sample_rate // resampler.gcd
+    kernel, width = resampler.kernel, resampler.width
+    kernel_size = kernel.shape[-1]
+
+    target_length = -(-new * num_frames // orig)
+    output = torch.empty(channels, target_length)
+
+    # 第 j 步卷积覆盖输入 [j * orig - width, j * orig - width + kernel_size)
+    steps = num_frames // orig + 1
+    chunk_steps = max(int(chunk_duration * orig_sample_rate) // orig, 1)
+    for first in range(0, steps, chunk_steps):
+        last = min(first + chunk_steps, steps)
+        lo = first * orig - width
+        hi = (last - 1) * orig - width + kernel_size
+
+        chunk = read(max(lo, 0), min(hi, num_frames))
+        if downmix and chunk.shape[0] > 1:
+            chunk = chunk.mean(dim=0, keepdim=True)
+        if lo < 0 or hi > num_frames:
+            chunk = torch.nn.functional.pad(chunk, (max(-lo, 0), max(hi - num_frames, 0)))
+
+        resampled = torch.nn.functional.conv1d(chunk[:, None], kernel, stride=orig)
+        resampled = resampled.transpose(1, 2).reshape(chunk.shape[0], -1)
+        out_start = first * new
+        out_end = min(last * new, target_length)
+        output[:, out_start:out_end] = resampled[:, : out_end - out_start]
+
+    return output
+
+
+def resample(
+    waveform: torch.Tensor,
+    orig_sample_rate: int,
+    sample_rate: int,
+    downmix: bool = False,
+    chunk_duration: float = RESAMPLE_CHUNK_DURATION,
+) -> torch.Tensor:
+    """
+    分块重采样(可同时混音为单声道),使用缓存的重采样器
+
+    Args:
+        waveform: (channels, samples) 波形
+        orig_sample_rate: 原采样率
+        sample_rate: 目标采样率
+        downmix: 是否混音为单声道
+        chunk_duration: 每块的输入时长(秒)
+
+    Returns:
+        重采样后的波形
+    """
+    if orig_sample_rate == sample_rate and (waveform.shape[0] == 1 or not downmix):
+        return waveform
+    waveform = waveform.float()
+    return _resample_frames(
+        lambda start, end: waveform[:, start:end],
+        waveform.shape[1],
+        waveform.shape[0],
+        orig_sample_rate,
+        sample_rate,
+        downmix,
+        chunk_duration,
+    )
+
+
+def probe_channels(audio_path: str) -> int:
+    """
+    用 ffprobe 读取第一条音频流的声道数
+
+    Args:
+        audio_path: 音频文件路径
+
+    Returns:
+        声道数
+    """
+    if shutil.which("ffprobe") is None:
+        raise RuntimeError("未找到 ffprobe,请安装 ffmpeg 或使用 --audio-backend torchaudio")
+
+    cmd = [
+        "ffprobe",
+        "-v",
+        "error",
+        "-select_streams",
+        "a:0",
+        "-show_entries",
+        "stream=channels",
+        "-of",
+        "csv=p=0",
+        str(audio_path),
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    output = result.stdout.strip()
+    if result.returncode != 0 or not output.isdigit():
+        message = result.stderr.strip() or "没有音频流"
+        raise RuntimeError(f"ffprobe 读取声道数失败: {message}")
+    return int(output)
+
+
+def decode_with_ffmpeg(
+    audio_path: str, sample_rate: int = 16000, channels: int = 1
+) -> torch.Tensor:
+    """
+    用 ffmpeg 子进程解码、混音并重采样,从管道流式读取 float32 采样到预分配的缓冲区
+
+    Args:
+        audio_path: 音频文件路径
+        sample_rate: 目标采样率
+        channels: 输出声道数,1 表示混音为单声道
+
+    Returns:
+        (channels, samples) 的波形
+    """
+    if shutil.which("ffmpeg") is None:
+        raise RuntimeError("未找到 ffmpeg,请安装 ffmpeg 或使用 --audio-backend torchaudio")
+
+    cmd = [
+        "ffmpeg",
+        "-nostdin",
+        "-loglevel",
+        "error",
+        "-threads",
+        "0",
+        "-i",
+        str(audio_path),
+        "-f",
+        "f32le",
+        "-ac",
+        str(channels),
+        "-ar",
+        str(sample_rate),
+        "-",
+    ]
+    # stderr 写入临时文件而不是管道: ffmpeg 输出大量警告时管道写满会阻塞,与读取 stdout 互相等待
+    with tempfile.TemporaryFile() as stderr:
+        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=stderr)
+        # 直接读入预分配的缓冲区,容量不足时按倍数扩容,避免逐块拼接字节串
+        buffer = np.empty(sample_rate * channels * 60, dtype=np.float32)
+        size = 0
+        with process.stdout:
+            while True:
+                if size == buffer.nbytes:
+                    buffer = np.resize(buffer, buffer.size * 2)
+                view = memoryview(buffer).cast("B")[size : min(size + (1 << 20), buffer.nbytes)]
+                read = process.stdout.readinto(view)
+                if not read:
+                    break
+                size += read
+        if process.wait() != 0:
+            stderr.seek(0)
+            message = stderr.read().decode(errors="replace").strip()
+            raise RuntimeError(f"ffmpeg 解码失败: {message}")
+
+    samples = torch.from_numpy(buffer[: size // 4])
+    # 多声道采样按帧交错存放
+    return samples.reshape(-1, channels).T.contiguous()
+
+
+class AudioSource:
+    """
+    按需读取的音频源
+
+    不把整个文件解码到内存,而是在需要时读取指定时间范围并转换为目标采样率的单声道。
+    PCM/浮点 WAV 文件通过内存映射读取,其他格式通过 torchaudio 按帧偏移读取。
+    """
+
+    def __init__(self, audio_path: str, sample_rate: int = 16000):
+        """
+        打开音频源
+
+        Args:
+            audio_path: 音频文件路径
+            sample_rate: 目标采样率
+        """
+        self.path = Path(audio_path)
+        if not self.path.exists():
+            raise FileNotFoundError(f"音频文件不存在: {self.path}")
+
+        self.sample_rate = sample_rate
+        self._memmap: Optional[np.memmap] = None
+
+        header = _parse_wav_header(self.path)
+        wav_format = header and _WAV_DTYPES.get((header[5], header[4]))
+        if header and wav_format:
+            offset, size, channels, sr, _, _ = header
+            dtype, self._bias, self._scale = wav_format
+            frames = size // (np.dtype(dtype).itemsize * channels)
+            self._memmap = np.memmap(
+                self.path, dtype=dtype, mode="r", offset=offset, shape=(frames, channels)
+            )
+            self.orig_sample_rate = sr
+            self.num_channels = channels
+            self.num_frames = frames
+        else:
+            info = torchaudio.info(str(self.path))
+            self.orig_sample_rate = info.sample_rate
+            self.num_channels = info.num_channels
+            self.num_frames = info.num_frames
+
+    @property
+    def is_memmap(self) -> bool:
+        """是否通过内存映射读取"""
+        return self._memmap is not None
+
+    @property
+    def duration(self) -> float:
+        """音频时长(秒)"""
+        return self.num_frames / self.orig_sample_rate
+
+    def read_frames(self, frame_offset: int, num_frames: int) -> torch.Tensor:
+        """
+        读取原始采样率下的多声道帧
+
+        Args:
+            frame_offset: 起始帧
+            num_frames: 帧数
+
+        Returns:
+            (channels, frames) 的 float32 波形
+        """
+        frame_offset = max(0, frame_offset)
+        num_frames = max(0, min(num_frames, self.num_frames - frame_offset))
+        if num_frames == 0:
+            return torch.zeros(self.num_channels, 0)
+
+        if self._memmap is not None:
+            data = np.asarray(self._memmap[frame_offset : frame_offset + num_frames], np.float32)
+            if self._bias:
+                data -= self._bias
+            if self._scale != 1.0:
+                data /= self._scale
+            return torch.from_numpy(data.T.copy())
+
+        waveform, _ = torchaudio.load(
+            str(self.path), frame_offset=frame_offset, num_frames=num_frames
+        )
+        return waveform
+
+    def read_segment(self, start: float, end: float) -> torch.Tensor:
+        """
+        读取指定时间范围,转换为目标采样率的单声道
+
+        Args:
+            start: 开始时间(秒)
+            end: 结束时间(秒)
+
+        Returns:
+            (1, samples) 的音频片段
+        """
+        start_frame = int(start * self.orig_sample_rate)
+        end_frame = int(end * self.orig_sample_rate)
+        waveform = self.read_frames(start_frame, end_frame - start_frame)
+        if waveform.shape[1] == 0:
+            return waveform[:1]
+        return resample(waveform, self.orig_sample_rate, self.sample_rate, downmix=True)
+
+    def read_all(
+        self, chunk_duration: float = RESAMPLE_CHUNK_DURATION, downmix: bool = True
+    ) -> torch.Tensor:
+        """
+        分块读取整个文件并转换为目标采样率的单声道
+
+        不会在内存中保留原采样率的完整多声道副本。
+
+        Args:
+            chunk_duration: 每块的输入时长(秒)
+            downmix: 是否混音为单声道,False 时保留各声道
+
+        Returns:
+            (1, samples) 的完整波形,不混音时为 (channels, samples)
+        """
+        return _resample_frames(
+            lambda start, end: self.read_frames(start, end - start),
+            self.num_frames,
+            self.num_channels,
+            self.orig_sample_rate,
+            self.sample_rate,
+            downmix,
+            chunk_duration,
+        )
+
 
 class AudioProcessor:
     """音频处理器"""
 
-    def __init__(self, sample_rate: int = 16000):
+    def __init__(self, sample_rate: int = 16000, backend: str = None):
         """
         初始化音频处理器
 
         Args:
             sample_rate: 目标采样率,Whisper 使用 16kHz
+            backend: 解码后端,torchaudio 或 ffmpeg,默认 config.AUDIO_BACKEND
         """
         self.sample_rate = sample_rate
+        self.backend = backend or config.AUDIO_BACKEND
+        if self.backend not in ("torchaudio", "ffmpeg"):
+            raise ValueError(f"不支持的音频解码后端: {self.backend}")
 
-    def load_audio(self, audio_path: str) -> tuple[torch.Tensor, int]:
+    def load_audio(self, audio_path: str, downmix: bool = True) -> tuple[torch.Tensor, int]:
         """
         加载音频文件
 
         Args:
             audio_path: 音频文件路径
+            downmix: 是否混音为单声道,False 时保留各声道(用于分声道说话人分离)
 
         Returns:
             (waveform, sample_rate): 音频波形和采样率
@@ -35,28 +438,81 @@ class AudioProcessor:
         if not audio_path.exists():
             raise FileNotFoundError(f"音频文件不存在: {audio_path}")
 
-        # 加载音频
-        waveform, sr = torchaudio.load(str(audio_path))
+        # ffmpeg 在子进程中完成解码、混音和重采样
+        if self.backend == "ffmpeg":
+            # 不混音时先用 ffprobe 读取声道数,按原声道数解码
+            with span("decode_audio", path=str(audio_path), backend="ffmpeg"):
+                channels = 1 if downmix else probe_channels(str(audio_path))
+                waveform = decode_with_ffmpeg(str(audio_path), self.sample_rate, channels)
+            return waveform, self.sample_rate
+
+        # PCM/浮点 WAV 通过内存映射分块混音和重采样,不生成原采样率的完整副本
+        source = AudioSource(str(audio_path), self.sample_rate)
+        if source.is_memmap:
+            with span("resample", orig_sr=source.orig_sample_rate, target_sr=self.sample_rate):
+                waveform = source.read_all(downmix=downmix)
+            return waveform, self.sample_rate
 
-        # 转换为单声道
-        if waveform.shape[0] > 1:
-            waveform = torch.mean(waveform, dim=0, keepdim=True)
+        # 加载音频
+        with span("decode_audio", path=str(audio_path)):
+            waveform, sr = torchaudio.load(str(audio_path))
 
-        # 重采样到目标采样率
-        if sr != self.sample_rate:
-            resampler = torchaudio.transforms.Resample(sr, self.sample_rate)
-            waveform = resampler(waveform)
+        # 转换为单声道并重采样到目标采样率
+        with span("resample", orig_sr=sr, target_sr=self.sample_rate):
+            waveform = resample(waveform, sr, self.sample_rate, downmix=downmix)
 
         return waveform, self.sample_rate
 
+    def open_audio(self, audio_path: str) -> AudioSource:
+        """
+        打开按需读取的音频源,内存占用与文件长度无关
+
+        Args:
+            audio_path: 音频文件路径
+
+        Returns:
+            音频源,可替代完整波形传给 extract_segment 和 get_duration
+        """
+        return AudioSource(audio_path, self.sample_rate)
+
+    def stream_audio(
+        self, audio_path: str, chunk_duration: float = 30.0, overlap: float = 1.0
+    ) -> Iterator[tuple[float, torch.Tensor]]:
+        """
+        以固定长度的块流式读取音频,峰值内存由块大小决定
+
+        Args:
+            audio_path: 音频文件路径
+            chunk_duration: 每块时长(秒)
+            overlap: 相邻块之间的重叠时长(秒)
+
+        Yields:
+            (start, chunk): 块的开始时间(秒)和目标采样率的单声道波形
+        """
+        if overlap >= chunk_duration:
+            raise ValueError("overlap 必须小于 chunk_duration")
+
+        source = self.open_audio(audio_path)
+        step = chunk_duration - overlap
+        start = 0.0
+        while start < source.duration:
+            yield start, source.read_segment(start, min(start + chunk_duration, source.duration))
+            if start + chunk_duration >= source.duration:
+                break
+            start += step
+
     def extract_segment(
-        self, waveform: torch.Tensor, start: float, end: float, sample_rate: int
+        self,
+        waveform: Union[torch.Tensor, AudioSource],
+        start: float,
+        end: float,
+        sample_rate: int,
     ) -> torch.Tensor:
         """
         提取音频片段
 
         Args:
-            waveform: 完整音频波形
+            waveform: 完整音频波形,或按需读取的音频源
             start: 开始时间(秒)
             end: 结束时间(秒)
             sample_rate: 采样率
@@ -64,6 +520,9 @@ class AudioProcessor:
         Returns:
             音频片段
         """
+        if isinstance(waveform, AudioSource):
+            return waveform.read_segment(start, end)
+
         start_sample = int(start * sample_rate)
         end_sample = int(end * sample_rate)
 
@@ -73,17 +532,19 @@ class AudioProcessor:
 
         return waveform[:, start_sample:end_sample]
 
-    def get_duration(self, waveform: torch.Tensor, sample_rate: int) -> float:
+    def get_duration(self, waveform: Union[torch.Tensor, AudioSource], sample_rate: int) -> float:
         """
         获取音频时长
 
         Args:
-            waveform: 音频波形
+            waveform: 音频波形,或按需读取的音频源
             sample_rate: 采样率
 
         Returns:
             时长(秒)
         """
+        if isinstance(waveform, AudioSource):
+            return waveform.duration
         return waveform.shape[1] / sample_rate
 
     def save_segment(self, waveform: torch.Tensor, output_path: str, sample_rate: int):
@@ -0,0 +1,243 @@
+"""
+批量处理模块
+把目录、通配符或清单文件中的音频分配给多个工作进程并行处理
+"""
+
+import glob
+import json
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import replace
+from pathlib import Path
+from typing import Any, Optional
+
+from .pipeline import PipelineOptions, process_audio, save_result
+from .resources import available_cores, configure_threads, split_cores
+
+logger = logging.getLogger("whisper_diarization")
+
+# 目录模式下识别的音频扩展名
+AUDIO_EXTENSIONS = {".wav", ".mp3", ".flac", ".m4a", ".ogg", ".opus", ".aac", ".wma"}
+
+# 输出目录中的汇总文件名
+SUMMARY_NAME = "summary.json"
+
+# 工作进程内的处理选项,由 _init_worker 设置
+_worker_options: Optional[PipelineOptions] = None
+
+
+def collect_inputs(spec: str) -> list[Path]:
+    """
+    解析批量输入
+
+    Args:
+        spec: 以下之一:
+            - 目录: 递归收集其中的音频文件
+            - 通配符: 如 "calls/**/*.wav"
+            - 清单文件 (.txt/.lst): 每行一个音频路径,相对路径相对清单所在目录,# 开头为注释
+
+    Returns:
+        排序后的音频文件路径列表
+    """
+    path = Path(spec)
+
+    if path.is_dir():
+        files = [p for p in path.rglob("*") if p.suffix.lower() in AUDIO_EXTENSIONS]
+    elif path.is_file() and path.suffix.lower() in {".txt", ".lst"}:
+        files = []
+        for line in path.read_text(encoding="utf-8").splitlines():
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            entry = Path(line)
+            files.append(entry if entry.is_absolute() else path.parent / entry)
+    else:
+        files = [Path(p) for p in glob.glob(spec, recursive=True)]
+
+    return sorted(p for p in files if p.is_file())
+
+
+def input_root(inputs: list[Path]) -> Path:
+    """输入文件的公共父目录,输出目录按相对它的路径组织"""
+    return Path(os.path.commonpath([p.resolve().parent for p in inputs]))
+
+
+def output_path_for(audio_path: Path, output_dir: Path, fmt: str, root: Path = None) -> Path:
+    """
+    返回音频文件对应的输出路径
+
+    输出在 output_dir 下保留输入相对 root 的目录结构,文件名保留音频扩展名
+    (a/x.wav -> a/x.wav.json),不同目录的同名文件和同名不同格式的文件不会相互覆盖。
+
+    Args:
+        audio_path: 音频文件路径
+        output_dir: 输出目录
+        fmt: 输出格式
+        root: 输入的公共父目录,默认为音频文件所在目录
+
+    Returns:
+        输出文件路径
+    """
+    audio_path = audio_path.resolve()
+    relative = audio_path.relative_to(root.resolve() if root else audio_path.parent)
+    return output_dir / relative.parent / f"{relative.name}.{fmt}"
+
+
+def _init_worker(options: PipelineOptions, threads: int) -> None:
+    """工作进程初始化: 设置线程数并保存处理选项"""
+    global _worker_options
+    _worker_options = options
+    configure_threads(threads)
+
+
+def _process_file(audio_path: str, output_path: str, fmt: str) -> dict[str, Any]:
+    """在工作进程中处理单个文件,模型在进程内首次使用时加载并复用"""
+    assert _worker_options is not None
+    start = time.perf_counter()
+    try:
+        output_data = process_audio(Path(audio_path), _worker_options)
+        _save_atomic(output_data, Path(output_path), fmt)
+    except Exception as e:
+        return {
+            "audio": audio_path,
+            "status": "error",
+            "error": str(e),
+            "elapsed": time.perf_counter() - start,
+        }
+
+    elapsed = time.perf_counter() - start
+    duration = output_data["duration"]
+    return {
+        "audio": audio_path,
+        "output": output_path,
+        "status": "ok",
+        "duration": duration,
+        "elapsed": elapsed,
+        "rtf": elapsed / duration if duration else None,
+    }
+
+
+def _describe(result: dict[str, Any]) -> str:
+    """单个文件处理完成的进度描述,时长为 0 的文件没有实时率"""
+    rtf = f"RTF {result['rtf']:.3f}" if result["rtf"] is not None else "RTF -"
+    return f"{result['audio']} ({result['elapsed']:.1f}s, {rtf})"
+
+
+def _save_atomic(output_data: dict[str, Any], output_path: Path, fmt: str) -> None:
+    """先写入临时文件再替换,中断时不会留下被续跑误认为已完成的半成品"""
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = output_path.with_name(f".{output_path.name}.{os.getpid()}.tmp")
+    try:
+        save_result(output_data, tmp_path, fmt)
+        os.replace(tmp_path, output_path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+
+def run_batch(
+    inputs: list[Path],
+    output_dir: Path,
+    fmt: str,
+    options: PipelineOptions,
+    workers: int = 1,
+    threads_per_worker: Optional[int] = None,
+) -> dict[str, Any]:
+    """
+    批量处理音频文件
+
+    输出已存在的文件会被跳过,因此中断后重新运行即可续跑。
+    每个工作进程持有自己的模型和线程预算。
+
+    Args:
+        inputs: 音频文件列表
+        output_dir: 输出目录
+        fmt: 输出格式 (json, text, srt)
+        options: 处理流程选项
+        workers: 工作进程数
+        threads_per_worker: 每个工作进程的 torch 线程数,默认平分 CPU 核心
+
+    Returns:
+        汇总信息,同时写入 output_dir/summary.json
+    """
+    if workers < 1:
+        raise ValueError(f"工作进程数必须至少为 1: {workers}")
+    output_dir.mkdir(parents=True, exist_ok=True)
+    if options.asr_workers > 1 or options.diarization_workers > 1:
+        # 批量模式已按文件并行,工作进程内不再启动识别或分离子进程
+        logger.warning("批量模式下忽略 --asr-workers 和 --diarization-workers,按文件分配工作进程")
+        options = replace(options, asr_workers=1, diarization_workers=1)
+    threads = threads_per_worker or min(split_cores(available_cores(), workers))
+
+    summary_path = output_dir / SUMMARY_NAME
+    root = input_root(inputs) if inputs else None
+    pending, skipped = [], []
+    for audio_path in inputs:
+        output_path = output_path_for(audio_path, output_dir, fmt, root)
+        if output_path == summary_path:
+            raise ValueError(f"{audio_path} 的输出与汇总文件 {summary_path} 同名,请重命名该文件")
+        if output_path.exists():
+            skipped.append(str(audio_path))
+        else:
+            pending.append((str(audio_path), str(output_path)))
+
+    logger.info(
+        f"批量处理: 共 {len(inputs)} 个文件, 待处理 {len(pending)} 个, "
+        f"跳过 {len(skipped)} 个已有结果的文件"
+    )
+    logger.info(f"工作进程: {workers} 个, 每个进程 {threads} 个线程")
+
+    results: list[dict[str, Any]] = []
+    start = time.perf_counter()
+
+    if pending:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(options, threads),
+        ) as executor:
+            futures = [
+                executor.submit(_process_file, audio, output, fmt) for audio, output in pending
+            ]
+            for n, future in enumerate(as_completed(futures), 1):
+                result = future.result()
+                results.append(result)
+                if result["status"] == "ok":
+                    logger.info(f"[{n}/{len(pending)}] {_describe(result)}")
+                else:
+                    logger.error(f"[{n}/{len(pending)}] {result['audio']} 失败: {result['error']}")
+
+    wall_time = time.perf_counter() - start
+    succeeded = [r for r in results if r["status"] == "ok"]
+    audio_duration = sum(r["duration"] for r in succeeded)
+
+    summary = {
+        "total": len(inputs),
+        "processed": len(succeeded),
+        "skipped": len(skipped),
+        "failed": len(results) - len(succeeded),
+        "workers": workers,
+        "threads_per_worker": threads,
+        "audio_duration": audio_duration,
+        "wall_time": wall_time,
+        # 聚合实时率 = 墙钟时间 / 音频总时长,越小越快
+        "rtf": wall_time / audio_duration if audio_duration else None,
+        "files": sorted(results, key=lambda r: r["audio"]),
+    }
+
+    with open(summary_path, "w", encoding="utf-8") as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+
+    if summary["rtf"] is not None:
+        logger.info(
+            f"批量处理完成: 成功 {summary['processed']} 个, 失败 {summary['failed']} 个, "
+            f"音频总时长 {audio_duration:.1f}s, 耗时 {wall_time:.1f}s, RTF {summary['rtf']:.3f}"
+        )
+    else:
+        logger.info(f"批量处理完成: 失败 {summary['failed']} 个, 没有新处理的文件")
+
+    return summary
@@ -0,0 +1,318 @@
+"""
+基准测试模块
+分阶段(加载、说话人分离、语音活动检测、语音识别、保存)测量耗时、实时率、峰值内存和片段吞吐量,
+输出 JSON 供性能回归跟踪
+
+用法:
+  python -m whisper_diarization.benchmark --whisper-model tiny --skip-diarization
+  python -m whisper_diarization.benchmark --synthetic-minutes 10 --offline --json bench.json
+  python -m whisper_diarization.benchmark --offline --asr-mode segments align
+"""
+
+import argparse
+import json
+import platform
+import tempfile
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Optional
+
+from . import config
+from .utils.memory import PeakMemorySampler
+
+DEFAULT_AUDIO = Path(__file__).resolve().parents[2] / "multi-speaker.wav"
+
+
+def make_synthetic_audio(source: Path, minutes: float, output_path: Path) -> Path:
+    """
+    把 source 循环拼接到指定时长,生成长音频测试输入
+
+    Args:
+        source: 源音频文件
+        minutes: 目标时长(分钟)
+        output_path: 输出 WAV 路径
+
+    Returns:
+        输出路径
+    """
+    import torchaudio
+
+    from .audio_processor import AudioProcessor
+
+    processor = AudioProcessor()
+    waveform, sample_rate = processor.load_audio(str(source))
+    target = int(minutes * 60 * sample_rate)
+    repeats = -(-target // waveform.shape[1])
+    waveform = waveform.repeat(1, repeats)[:, :target]
+    torchaudio.save(str(output_path), waveform, sample_rate)
+    return output_path
+
+
+def synthetic_segments(duration: float, turn: float = 5.0, speakers: int = 2) -> list[dict]:
+    """
+    生成固定长度、说话人轮流发言的片段,用于跳过说话人分离时测试识别阶段
+
+    Args:
+        duration: 音频时长(秒)
+        turn: 每个片段时长(秒)
+        speakers: 说话人数量
+
+    Returns:
+        说话人片段列表
+    """
+    segments = []
+    start, i = 0.0, 0
+    while start < duration:
+        end = min(start + turn, duration)
+        segments.append({"speaker": f"SPEAKER_{i % speakers:02d}", "start": start, "end": end})
+        start, i = end, i + 1
+    return segments
+
+
+class StageRecorder:
+    """记录各阶段的耗时、峰值内存和片段数"""
+
+    def __init__(self, duration: float = 0.0):
+        self.duration = duration
+        self.stages: dict[str, dict[str, Any]] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[dict[str, Any]]:
+        """
+        测量一个阶段
+
+        with 块中可向返回的字典写入 segments(该阶段处理的片段数)。
+        """
+        info: dict[str, Any] = {}
+        with PeakMemorySampler() as sampler:
+            start = time.perf_counter()
+            yield info
+            elapsed = time.perf_counter() - start
+
+        info["seconds"] = elapsed
+        info["rtf"] = elapsed / self.duration if self.duration else None
+        info["peak_rss_mb"] = sampler.peak / 2**20
+        info["rss_delta_mb"] = (sampler.peak - sampler.start) / 2**20
+        if info.get("segments") is not None:
+            info["segments_per_second"] = info["segments"] / elapsed if elapsed else None
+        self.stages[name] = info
+
+    def summary(self) -> dict[str, Any]:
+        """汇总全部阶段"""
+        total = sum(stage["seconds"] for stage in self.stages.values())
+        return {
+            "stages": self.stages,
+            "total_seconds": total,
+            "total_rtf": total / self.duration if self.duration else None,
+            "peak_rss_mb": max((s["peak_rss_mb"] for s in self.stages.values()), default=0.0),
+        }
+
+
+def run_benchmark(
+    audio_path: Path,
+    whisper_model: str = "tiny",
+    diarization: bool = True,
+    offline: bool = False,
+    hf_token: Optional[str] = None,
+    batch_size: int = 1,
+    vad: bool = False,
+    asr_backend: str = "whisper",
+    asr_mode: str = "segments",
+) -> dict[str, Any]:
+    """
+    对一个音频文件分阶段运行完整流程并记录性能指标
+
+    模型加载不计入各阶段,以便比较不同输入长度下的处理开销。
+
+    Args:
+        audio_path: 音频文件路径
+        whisper_model: Whisper 模型名称
+        diarization: 是否运行说话人分离,否则使用合成片段
+        offline: 说话人分离是否使用离线模型
+        hf_token: Hugging Face token
+        batch_size: 识别批量大小
+        vad: 识别前是否运行语音活动检测
+        asr_backend: 语音识别后端 (whisper, faster-whisper)
+        asr_mode: 识别方式: segments 逐片段识别; align 整段识别后按词级时间戳分配给片段
+
+    Returns:
+        基准测试结果字典
+    """
+    import torch
+
+    from .audio_processor import AudioProcessor
+    from .pipeline import save_result
+    from .speaker_diarization import SpeakerDiarization
+    from .speech_recognition import create_recognizer
+
+    recognizer = create_recognizer(whisper_model, asr_backend)
+    diarizer = SpeakerDiarization(hf_token=hf_token, offline=offline) if diarization else None
+
+    recorder = StageRecorder()
+    processor = AudioProcessor()
+
+    with recorder.stage("load"):
+        waveform, sample_rate = processor.load_audio(str(audio_path))
+    recorder.duration = processor.get_duration(waveform, sample_rate)
+    load = recorder.stages["load"]
+    load["rtf"] = load["seconds"] / recorder.duration
+
+    with recorder.stage("diarize") as info:
+        if diarizer is not None:
+            segments = diarizer.diarize(waveform, sample_rate)
+        else:
+            segments = synthetic_segments(recorder.duration)
+        info["segments"] = len(segments)
+        info["synthetic"] = diarizer is None
+
+    speech_segments = segments
+    if vad:
+        from .vad import VoiceActivityDetector
+
+        with recorder.stage("vad") as info:
+            detector = VoiceActivityDetector()
+            detector.analyze(waveform, sample_rate)
+            speech_segments, vad_stats = detector.filter_segments(segments)
+            info["segments"] = len(segments)
+            info["skipped_seconds"] = vad_stats["skipped_seconds"]
+            info["dropped"] = vad_stats["dropped"]
+
+    with recorder.stage("transcribe") as info:
+        if asr_mode == "align":
+            results = recognizer.transcribe_aligned(waveform, speech_segments, sample_rate)
+        else:
+            results = recognizer.transcribe_segments(
+                waveform,
+                speech_segments,
+                sample_rate,
+                batch_size=batch_size,
+                mel_cache=recognizer.create_mel_cache(waveform),
+            )
+        info["segments"] = len(results)
+
+    with recorder.stage("save") as info, tempfile.TemporaryDirectory() as tmp:
+        output_data = {
+            "audio_file": str(audio_path),
+            "duration": recorder.duration,
+            "speakers": len({s["speaker"] for s in segments}),
+            "segments": results,
+        }
+        save_result(output_data, Path(tmp) / "result.json", "json")
+        info["segments"] = len(results)
+
+    return {
+        "audio": str(audio_path),
+        "duration": recorder.duration,
+        "whisper_model": whisper_model,
+        "asr_backend": asr_backend,
+        "asr_mode": asr_mode,
+        "batch_size": batch_size,
+        "vad": vad,
+        "device": config.DEVICE,
+        "threads": torch.get_num_threads(),
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "torch": torch.__version__,
+        **recorder.summary(),
+    }
+
+
+def format_report(result: dict[str, Any]) -> str:
+    """把基准测试结果格式化为表格"""
+    lines = [
+        f"音频: {result['audio']} ({result['duration']:.2f}s)",
+        f"Whisper 模型: {result['whisper_model']} ({result['asr_backend']}), "
+        f"识别方式: {result['asr_mode']}, 设备: {result['device']}, 线程数: {result['threads']}",
+        f"{'stage':<12}{'seconds':>10}{'RTF':>10}{'peak MB':>10}{'seg/s':>10}",
+    ]
+    for name, stage in result["stages"].items():
+        rtf = f"{stage['rtf']:.3f}" if stage["rtf"] is not None else "-"
+        sps = stage.get("segments_per_second")
+        sps = f"{sps:.2f}" if sps is not None else "-"
+        lines.append(
+            f"{name:<12}{stage['seconds']:>10.3f}{rtf:>10}{stage['peak_rss_mb']:>10.1f}{sps:>10}"
+        )
+    lines.append(f"{'total':<12}{result['total_seconds']:>10.3f}{result['total_rtf']:>10.3f}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    """基准测试命令行入口"""
+    parser = argparse.ArgumentParser(description="分阶段性能基准测试")
+    parser.add_argument(
+        "--audio",
+        default=str(DEFAULT_AUDIO),
+        help="测试音频文件 (默认: 源码目录中的 multi-speaker.wav,安装后运行时需要指定)",
+    )
+    parser.add_argument(
+        "--synthetic-minutes",
+        type=float,
+        nargs="*",
+        default=[],
+        help="额外测试把音频循环拼接到指定分钟数的长输入,如 --synthetic-minutes 5 30",
+    )
+    parser.add_argument("--whisper-model", default="tiny", help="Whisper 模型 (默认: tiny)")
+    parser.add_argument(
+        "--asr-backend",
+        default="whisper",
+        choices=["whisper", "faster-whisper"],
+        help="语音识别后端 (默认: whisper)",
+    )
+    parser.add_argument("--batch-size", type=int, default=1, help="识别批量大小 (默认: 1)")
+    parser.add_argument(
+        "--asr-mode",
+        nargs="+",
+        default=["segments"],
+        choices=["segments", "align"],
+        help="识别方式,可指定多个依次对比: segments 逐片段识别; "
+        "align 整段识别后按词级时间戳分配给片段 (默认: segments)",
+    )
+    parser.add_argument(
+        "--skip-diarization",
+        action="store_true",
+        help="跳过说话人分离,使用固定长度的合成片段(无需 pyannote 模型)",
+    )
+    parser.add_argument("--vad", action="store_true", help="识别前运行语音活动检测,跳过静音片段")
+    parser.add_argument("--offline", action="store_true", help="说话人分离使用离线模型")
+    parser.add_argument("--hf-token", default=None, help="Hugging Face token")
+    parser.add_argument("--json", default=None, help="把结果写入 JSON 文件")
+    args = parser.parse_args(argv)
+    if not Path(args.audio).is_file():
+        parser.error(f"测试音频文件不存在: {args.audio},请用 --audio 指定")
+
+    inputs = [Path(args.audio)]
+    with tempfile.TemporaryDirectory() as tmp:
+        for minutes in args.synthetic_minutes:
+            inputs.append(
+                make_synthetic_audio(
+                    Path(args.audio), minutes, Path(tmp) / f"synthetic_{minutes:g}min.wav"
+                )
+            )
+
+        results = []
+        for audio_path in inputs:
+            for asr_mode in args.asr_mode:
+                result = run_benchmark(
+                    audio_path,
+                    whisper_model=args.whisper_model,
+                    diarization=not args.skip_diarization,
+                    offline=args.offline,
+                    hf_token=args.hf_token,
+                    batch_size=args.batch_size,
+                    vad=args.vad,
+                    asr_backend=args.asr_backend,
+                    asr_mode=asr_mode,
+                )
+                results.append(result)
+                print()
+                print(format_report(result))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"results": results}, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+结果缓存模块
+按音频内容哈希和相关配置缓存说话人分离结果和识别文本,
+重复处理同一文件(如只更换输出格式)时可直接复用
+"""
+
+import contextlib
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Optional
+
+from . import config
+
+
+def file_hash(path: Path, chunk_size: int = 1 << 20) -> str:
+    """
+    计算文件内容的 SHA-256 哈希,按块读取以避免整个文件进入内存
+
+    Args:
+        path: 文件路径
+        chunk_size: 每次读取的字节数
+
+    Returns:
+        十六进制哈希字符串
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def make_key(*parts: Any) -> str:
+    """
+    由任意可 JSON 序列化的参数生成缓存键
+
+    Args:
+        parts: 参与计算缓存键的参数
+
+    Returns:
+        十六进制哈希字符串
+    """
+    payload = json.dumps(parts, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """
+    磁盘结果缓存
+
+    每个条目保存为 <cache_dir>/<namespace>/<key>.json,读取时刷新修改时间,
+    总大小超过上限时按修改时间淘汰最久未使用的条目。
+    """
+
+    def __init__(self, cache_dir: Optional[Path] = None, max_bytes: Optional[int] = None):
+        """
+        初始化结果缓存
+
+        Args:
+            cache_dir: 缓存目录,默认 config.CACHE_DIR
+            max_bytes: 缓存总大小上限(字节),默认 config.CACHE_MAX_BYTES
+        """
+        self.cache_dir = Path(cache_dir or config.CACHE_DIR)
+        self.max_bytes = config.CACHE_MAX_BYTES if max_bytes is None else max_bytes
+
+    def _path(self, namespace: str, key: str) -> Path:
+        return self.cache_dir / namespace / f"{key}.json"
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        """
+        读取缓存条目
+
+        Args:
+            namespace: 命名空间,如 "diarization"、"transcripts"
+            key: 缓存键
+
+        Returns:
+            缓存的值,不存在或已损坏时返回 None
+        """
+        path = self._path(namespace, key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                value = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        # 刷新修改时间,用于 LRU 淘汰
+        with contextlib.suppress(OSError):
+            os.utime(path)
+        return value
+
+    def put(self, namespace: str, key: str, value: Any) -> None:
+        """
+        写入缓存条目,写入后按大小上限淘汰旧条目
+
+        Args:
+            namespace: 命名空间
+            key: 缓存键
+            value: 可 JSON 序列化的值
+        """
+        path = self._path(namespace, key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        # 先写临时文件再原子替换,避免并发进程读到半写入的条目
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(value, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+        self.evict()
+
+    def evict(self) -> int:
+        """
+        淘汰最久未使用的条目,直到总大小不超过上限
+
+        Returns:
+            淘汰的条目数
+        """
+        entries = []
+        total = 0
+        for path in self.cache_dir.glob("*/*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        removed = 0
+        for _, size, path in sorted(entries, key=lambda e: e[0]):
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        return removed
+
+    def clear(self) -> None:
+        """清空缓存"""
+        for path in self.cache_dir.glob("*/*.json"):
+            path.unlink(missing_ok=True)
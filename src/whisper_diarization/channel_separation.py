@@ -0,0 +1,159 @@
+"""
+分声道说话人分离模块
+电话录音通常把坐席和客户录在不同声道,按各声道的语音活动即可得到说话人片段,
+不需要运行 pyannote;声道之间串音严重(或实际是单声道)时返回 None,由调用方回退到常规分离
+"""
+
+from typing import Any, Optional
+
+import torch
+
+from . import config
+from .speaker_linking import SpeakerLinker
+from .vad import VoiceActivityDetector, frame_energy
+
+
+def analyze_channels(
+    waveform: torch.Tensor, sample_rate: int, dominance_db: float = None
+) -> tuple[torch.Tensor, float]:
+    """
+    计算各声道的逐帧说话掩码
+
+    每个声道先按自己的噪声底做能量语音检测;同一帧中比最响声道低 dominance_db 以上的声道
+    视为串音(对方声音漏入),不算在说话。
+
+    Args:
+        waveform: (channels, samples) 波形
+        sample_rate: 采样率
+        dominance_db: 与最响声道的最大能量差(dB),默认 config.CHANNEL_DOMINANCE_DB
+
+    Returns:
+        (active, frame_duration): (channels, n_frames) 布尔张量和帧长(秒)
+    """
+    dominance_db = config.CHANNEL_DOMINANCE_DB if dominance_db is None else dominance_db
+    vad = VoiceActivityDetector()
+    frame_length = max(int(round(vad.frame_duration * sample_rate)), 1)
+
+    masks = [vad.analyze(channel.unsqueeze(0), sample_rate) for channel in waveform]
+    energy = torch.stack([frame_energy(channel, frame_length) for channel in waveform])
+    loudest = energy.max(dim=0).values
+    active = torch.stack(masks) & (energy >= loudest - dominance_db)
+    return active, frame_length / sample_rate
+
+
+def crosstalk_ratio(active: torch.Tensor) -> float:
+    """
+    同时说话的帧占语音帧的比例
+
+    正常对话中抢话的比例很低;声道内容相同或串音严重时接近 1。
+
+    Args:
+        active: (channels, n_frames) 说话掩码
+
+    Returns:
+        比例,没有语音帧时为 0
+    """
+    speaking = active.sum(dim=0)
+    speech_frames = int((speaking > 0).sum())
+    if speech_frames == 0:
+        return 0.0
+    return int((speaking > 1).sum()) / speech_frames
+
+
+def channel_turns(
+    active: torch.Tensor,
+    frame_duration: float,
+    min_silence: float = None,
+    min_speech: float = None,
+    padding: float = None,
+) -> list[dict]:
+    """
+    把各声道的说话掩码转换为说话人片段
+
+    同一声道间隔短于 min_silence 的语音段合并,短于 min_speech 的语音段丢弃,
+    首尾各保留 padding 秒余量。
+
+    Args:
+        active: (channels, n_frames) 说话掩码
+        frame_duration: 帧长(秒)
+        min_silence: 合并语音段的最大静音间隔(秒),默认 config.CHANNEL_MIN_SILENCE
+        min_speech: 最短语音段时长(秒),默认 config.CHANNEL_MIN_SPEECH
+        padding: 首尾余量(秒),默认 config.VAD_PADDING
+
+    Returns:
+        按开始时间排序的片段列表,每个片段包含 speaker、start、end 和 channel
+    """
+    min_silence = config.CHANNEL_MIN_SILENCE if min_silence is None else min_silence
+    min_speech = config.CHANNEL_MIN_SPEECH if min_speech is None else min_speech
+    padding = config.VAD_PADDING if padding is None else padding
+    duration = active.shape[1] * frame_duration
+
+    segments = []
+    for channel, mask in enumerate(active):
+        # 掩码两端补 0 后做差分,+1 为语音段开始帧,-1 为结束帧
+        edges = torch.diff(torch.nn.functional.pad(mask.to(torch.int8), (1, 1)))
+        starts = torch.nonzero(edges == 1).flatten().tolist()
+        ends = torch.nonzero(edges == -1).flatten().tolist()
+
+        runs: list[list[int]] = []
+        for start, end in zip(starts, ends):
+            if runs and (start - runs[-1][1]) * frame_duration < min_silence:
+                runs[-1][1] = end
+            else:
+                runs.append([start, end])
+
+        for start, end in runs:
+            if (end - start) * frame_duration < min_speech:
+                continue
+            segments.append(
+                {
+                    "speaker": SpeakerLinker.label(channel),
+                    "start": max(0.0, start * frame_duration - padding),
+                    "end": min(duration, end * frame_duration + padding),
+                    "channel": channel,
+                }
+            )
+
+    segments.sort(key=lambda x: x["start"])
+    return segments
+
+
+def diarize_channels(
+    waveform: torch.Tensor, sample_rate: int, max_crosstalk: float = None
+) -> tuple[Optional[list[dict]], dict[str, Any]]:
+    """
+    按声道执行说话人分离: 每个声道是一个说话人
+
+    Args:
+        waveform: (channels, samples) 未混音的波形
+        sample_rate: 采样率
+        max_crosstalk: 同时说话帧比例的上限,默认 config.CHANNEL_MAX_CROSSTALK
+
+    Returns:
+        (segments, stats):
+        - segments: 说话人片段列表(含 channel 字段);单声道或串音比例超过上限时为 None
+        - stats: 声道数、同时说话的帧比例、各声道的说话时长
+    """
+    max_crosstalk = config.CHANNEL_MAX_CROSSTALK if max_crosstalk is None else max_crosstalk
+    channels = waveform.shape[0]
+    stats: dict[str, Any] = {"channels": channels, "crosstalk": None, "speech_seconds": []}
+    if channels < 2:
+        print("分声道说话人分离: 单声道音频")
+        return None, stats
+
+    active, frame_duration = analyze_channels(waveform, sample_rate)
+    stats["crosstalk"] = crosstalk_ratio(active)
+    stats["speech_seconds"] = (active.sum(dim=1) * frame_duration).tolist()
+    if stats["crosstalk"] > max_crosstalk:
+        print(
+            f"分声道说话人分离: 同时说话的帧占 {stats['crosstalk']:.1%},"
+            f"超过 {max_crosstalk:.0%},声道之间串音"
+        )
+        return None, stats
+
+    segments = channel_turns(active, frame_duration)
+    print(
+        f"✓ 分声道说话人分离: {channels} 个声道,共 {len(segments)} 个片段,"
+        f"同时说话的帧占 {stats['crosstalk']:.1%}"
+    )
+    return segments, stats
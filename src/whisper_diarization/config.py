@@ -3,6 +3,7 @@
 包含模型配置、路径配置等
 """
 
+import functools
 import os
 from pathlib import Path
 
@@ -17,18 +18,110 @@ HF_TOKEN = os.getenv("HF_TOKEN", "")
 # Whisper 模型配置
 WHISPER_MODEL = "medium"  # 可选: tiny, base, small, medium, large
 WHISPER_LANGUAGE = "zh"  # 中文
+WHISPER_BATCH_SIZE = 1  # 批量解码大小,1 表示逐个片段转录
+MERGE_MAX_GAP = 0.5  # 合并同一说话人相邻片段的最大间隔(秒)
+MEL_CACHE = True  # 对整个文件计算一次 log-mel 频谱,按片段切片使用
+
+# openai-whisper 加速: 对 Linear 层做动态 int8 量化(仅 CPU,量化模型缓存在 CACHE_DIR/models)、
+# 用 torch.compile 编译编码器(首次调用时编译,需要 C++ 编译器)
+WHISPER_QUANTIZE = False
+WHISPER_COMPILE = False
+
+# 语音识别后端: whisper(openai-whisper,PyTorch) 或 faster-whisper(CTranslate2,需安装 faster-whisper)
+ASR_BACKEND = "whisper"
+ASR_COMPUTE_TYPE = "int8"  # faster-whisper 的权重精度,CPU 上 int8 最快
 
 # pyannote.audio 模型配置
 DIARIZATION_MODEL = "pyannote/speaker-diarization-3.1"
 
-# 输出配置
-OUTPUT_DIR = Path("output")
-OUTPUT_DIR.mkdir(exist_ok=True)
+# 流水线模式: 说话人分离窗口时长、窗口重叠(秒)、待识别片段队列容量
+PIPELINE_WINDOW = 120.0
+PIPELINE_OVERLAP = 10.0
+PIPELINE_QUEUE_SIZE = 64
+
+# 跨窗口关联说话人时的余弦相似度阈值
+SPEAKER_LINK_THRESHOLD = 0.5
+
+# 跨文件说话人识别 (--speaker-index): 已登记说话人的索引目录、判定为同一人的余弦相似度阈值、
+# 建立 IVF 分区后每次搜索的分区数、登记时自动建立分区的最少向量数
+SPEAKER_INDEX_DIR = Path(os.getenv("WHISPER_DIARIZATION_SPEAKERS", "speakers"))
+SPEAKER_ID_THRESHOLD = 0.6
+SPEAKER_INDEX_NPROBE = 8
+SPEAKER_INDEX_IVF_MIN = 10000
+
+# 长音频分块说话人分离 (--diarization-chunk): 默认分块时长(秒)、
+# 全局聚类各分块说话人中心向量时的余弦相似度阈值
+DIARIZATION_CHUNK = 600.0
+SPEAKER_CLUSTER_THRESHOLD = 0.5
+
+# CPU 线程配置,None 表示自动(使用全部可用核心)
+# 可分别为说话人分离和语音识别阶段指定 intra-op 线程数
+NUM_THREADS = int(os.getenv("WHISPER_DIARIZATION_THREADS", "0")) or None
+INTEROP_THREADS = None
+DIARIZATION_THREADS = None
+ASR_THREADS = None
+
+# 单个文件的语音识别工作进程数,大于 1 时按片段分片并行识别(每个进程加载一份模型)
+ASR_WORKERS = 1
+
+# 音频解码后端: torchaudio(WAV 通过内存映射分块重采样) 或 ffmpeg(子进程解码并重采样)
+AUDIO_BACKEND = "torchaudio"
+
+# 语音活动检测 (--vad): 语音帧最低能量(dBFS)、高出噪声底的能量(dB)、帧长(秒)、
+# 片段内最短语音时长(秒)、裁剪后首尾保留的余量(秒)
+VAD_THRESHOLD_DB = -50.0
+VAD_MARGIN_DB = 12.0
+VAD_FRAME_DURATION = 0.03
+VAD_MIN_SPEECH = 0.2
+VAD_PADDING = 0.2
 
-# 设备配置 (自动检测 GPU)
-import torch
+# 分声道说话人分离 (--split-channels): 同一帧中与最响声道的能量差在该值(dB)以内的声道才算在说话、
+# 同时说话的帧占语音帧的比例上限(超过时视为声道串音,回退到 pyannote)、
+# 合并同一声道语音段的最大静音间隔(秒)、最短语音段时长(秒)
+CHANNEL_DOMINANCE_DB = 10.0
+CHANNEL_MAX_CROSSTALK = 0.3
+CHANNEL_MIN_SILENCE = 0.5
+CHANNEL_MIN_SPEECH = 0.3
 
-DEVICE = "cuda" if torch.cuda.is_available() else "cpu"
+# 实时流模式 (--live): 输入采样率、滚动说话人分离窗口时长、处理间隔、
+# 片段结束后等待确认的时长、最长片段时长、临时结果的输出间隔、最短片段时长(秒)
+LIVE_SAMPLE_RATE = 16000
+LIVE_WINDOW = 30.0
+LIVE_STEP = 2.0
+LIVE_SETTLE = 1.0
+LIVE_MAX_SEGMENT = 20.0
+LIVE_PARTIAL_INTERVAL = 2.0
+LIVE_MIN_SEGMENT = 0.5
+
+# 进程内模型缓存的最大模型数量
+MODEL_CACHE_SIZE = 4
+
+# 常驻工作进程的默认 Unix socket 路径
+WORKER_SOCKET = "/tmp/whisper-diarization.sock"
+
+# 结果缓存: 缓存目录和总大小上限(字节)
+CACHE_DIR = Path(
+    os.getenv("WHISPER_DIARIZATION_CACHE", "~/.cache/whisper-diarization")
+).expanduser()
+CACHE_MAX_BYTES = 1024 * 1024 * 1024
+
+# 输出配置: 未指定输出路径时的保存目录,在写入结果时创建
+OUTPUT_DIR = Path("output")
 
 # 日志配置
 LOG_LEVEL = "INFO"
+
+
+@functools.cache
+def _detect_device() -> str:
+    """检测计算设备 (自动检测 GPU),首次访问 DEVICE 时才导入 torch"""
+    import torch
+
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+
+def __getattr__(name: str):
+    # 设备配置延迟到首次使用时检测,导入本模块不会加载 torch
+    if name == "DEVICE":
+        return _detect_device()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
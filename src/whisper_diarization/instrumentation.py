@@ -0,0 +1,186 @@
+"""
+性能埋点模块
+记录各阶段和各片段的耗时 (span)、计数器和内存采样,
+通过回调向外暴露,并可导出为 JSON 或 Chrome trace 文件
+
+用法:
+    tracer = Tracer()
+    tracer.add_hook(lambda event: print(event["name"], event["duration"]))
+    set_tracer(tracer)
+    ...  # 运行处理流程
+    tracer.dump_chrome_trace("trace.json")  # 在 chrome://tracing 或 Perfetto 中查看
+"""
+
+import json
+import os
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from .utils.memory import current_rss
+
+Hook = Callable[[dict[str, Any]], None]
+
+
+class Tracer:
+    """埋点记录器"""
+
+    def __init__(self, sample_memory: bool = True):
+        """
+        初始化埋点记录器
+
+        Args:
+            sample_memory: 是否在每个 span 结束时采样 RSS
+        """
+        self.sample_memory = sample_memory
+        self.events: list[dict[str, Any]] = []
+        self.counters: dict[str, float] = {}
+        self.memory: list[dict[str, Any]] = []
+        self._hooks: list[Hook] = []
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+
+    def add_hook(self, hook: Hook) -> None:
+        """
+        注册回调,每个 span 结束时以事件字典调用
+
+        事件字典包含 name、start、end、duration(秒,相对 Tracer 创建时刻)、
+        thread、attrs,启用内存采样时还包含 rss(字节)。
+        """
+        self._hooks.append(hook)
+
+    def _now(self) -> float:
+        return time.perf_counter() - self._origin
+
+    @contextmanager
+    def span(self, name: str, **attrs: Any) -> Iterator[dict[str, Any]]:
+        """
+        记录一段代码的耗时
+
+        Args:
+            name: span 名称,如 "load"、"diarize"、"decode"
+            attrs: 附加属性,如片段序号、说话人;with 块中也可向返回的字典添加属性
+        """
+        start = self._now()
+        try:
+            yield attrs
+        finally:
+            end = self._now()
+            event = {
+                "name": name,
+                "start": start,
+                "end": end,
+                "duration": end - start,
+                "thread": threading.get_ident(),
+                "attrs": attrs,
+            }
+            if self.sample_memory:
+                event["rss"] = current_rss()
+
+            with self._lock:
+                self.events.append(event)
+                if self.sample_memory:
+                    self.memory.append({"time": end, "rss": event["rss"], "label": name})
+
+            for hook in self._hooks:
+                hook(event)
+
+    def count(self, name: str, value: float = 1) -> None:
+        """累加计数器"""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def sample(self, label: str = "") -> int:
+        """立即采样一次 RSS 并返回(字节)"""
+        rss = current_rss()
+        with self._lock:
+            self.memory.append({"time": self._now(), "rss": rss, "label": label})
+        return rss
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        """按 span 名称汇总次数、总耗时和最大耗时"""
+        stats: dict[str, dict[str, float]] = {}
+        for event in self.events:
+            item = stats.setdefault(event["name"], {"count": 0, "total": 0.0, "max": 0.0})
+            item["count"] += 1
+            item["total"] += event["duration"]
+            item["max"] = max(item["max"], event["duration"])
+        return stats
+
+    def to_dict(self) -> dict[str, Any]:
+        """导出全部记录"""
+        return {
+            "events": self.events,
+            "counters": self.counters,
+            "memory": self.memory,
+            "summary": self.summary(),
+            "peak_rss": max((m["rss"] for m in self.memory), default=0),
+        }
+
+    def dump_json(self, path: Path) -> None:
+        """导出为 JSON trace 文件"""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2, default=str)
+
+    def dump_chrome_trace(self, path: Path) -> None:
+        """导出为 Chrome trace 格式,可在 chrome://tracing 或 Perfetto 中查看"""
+        pid = os.getpid()
+        trace_events: list[dict[str, Any]] = [
+            {
+                "name": event["name"],
+                "ph": "X",
+                "ts": event["start"] * 1e6,
+                "dur": event["duration"] * 1e6,
+                "pid": pid,
+                "tid": event["thread"],
+                "args": event["attrs"],
+            }
+            for event in self.events
+        ]
+        trace_events.extend(
+            {
+                "name": "rss",
+                "ph": "C",
+                "ts": sample["time"] * 1e6,
+                "pid": pid,
+                "args": {"rss_mb": sample["rss"] / 2**20},
+            }
+            for sample in self.memory
+        )
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"traceEvents": trace_events, "otherData": {"counters": self.counters}},
+                f,
+                ensure_ascii=False,
+                default=str,
+            )
+
+
+_tracer: Optional[Tracer] = None
+
+
+def set_tracer(tracer: Optional[Tracer]) -> None:
+    """设置当前进程使用的埋点记录器,None 表示关闭埋点"""
+    global _tracer
+    _tracer = tracer
+
+
+def get_tracer() -> Optional[Tracer]:
+    """返回当前的埋点记录器"""
+    return _tracer
+
+
+def span(name: str, **attrs: Any) -> AbstractContextManager[Any]:
+    """在当前埋点记录器上记录 span,未启用埋点时不做任何事"""
+    if _tracer is None:
+        return nullcontext(attrs)
+    return _tracer.span(name, **attrs)
+
+
+def count(name: str, value: float = 1) -> None:
+    """在当前埋点记录器上累加计数器,未启用埋点时不做任何事"""
+    if _tracer is not None:
+        _tracer.count(name, value)
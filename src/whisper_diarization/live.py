@@ -0,0 +1,379 @@
+"""
+实时流输入模块
+从标准输入、命名管道或 TCP 连接读取原始 PCM 音频流,边接收边做说话人分离和语音识别:
+说话人分离在最近一段音频的滚动窗口上反复运行,各次结果通过说话人中心向量关联为一致的标签;
+已结束的说话人片段输出最终识别结果,仍在进行的片段定期输出临时结果
+
+用法:
+  arecord -f S16_LE -r 16000 -c 1 | python -m whisper_diarization --live - --offline
+  ffmpeg -i input.mp4 -f s16le -ac 1 -ar 16000 - | python -m whisper_diarization --live -
+"""
+
+import bisect
+import queue
+import socket
+import sys
+import threading
+import time
+from collections.abc import Iterator
+from typing import Any, BinaryIO, Callable, Optional
+
+import numpy as np
+import torch
+
+from . import config
+from .instrumentation import count, span
+from .speaker_linking import SpeakerLinker
+from .speech_recognition import FALLBACK_TEMPERATURES
+
+# 支持的 PCM 采样格式: numpy 类型和归一化系数
+PCM_FORMATS = {"s16le": (np.int16, 32768.0), "f32le": (np.float32, 1.0)}
+# 每次从输入流读取的时长(秒)
+READ_CHUNK_DURATION = 0.1
+
+
+def open_stream(source: str) -> BinaryIO:
+    """
+    打开实时音频输入
+
+    Args:
+        source: "-" 表示标准输入;"tcp://host:port" 表示监听该地址并接受一个连接
+            (可作为 RTP/WebSocket 网关的本地落地点);其他值视为命名管道或文件路径
+
+    Returns:
+        二进制读取流
+    """
+    if source == "-":
+        return sys.stdin.buffer
+
+    if source.startswith("tcp://"):
+        host, _, port = source[len("tcp://") :].rpartition(":")
+        server = socket.create_server((host or "127.0.0.1", int(port)))
+        print(f"等待音频流连接: {source}")
+        with server:
+            conn, address = server.accept()
+        print(f"✓ 已连接: {address[0]}:{address[1]}")
+        return conn.makefile("rb")
+
+    return open(source, "rb")  # noqa: SIM115
+
+
+def read_pcm(
+    stream: BinaryIO,
+    sample_rate: int = None,
+    fmt: str = "s16le",
+    chunk_duration: float = READ_CHUNK_DURATION,
+) -> Iterator[torch.Tensor]:
+    """
+    从流中逐块读取单声道 PCM 采样
+
+    管道和套接字上只读取当前已到达的数据,不等待凑满一块,以降低延迟。
+
+    Args:
+        stream: 二进制读取流
+        sample_rate: 采样率,默认 config.LIVE_SAMPLE_RATE
+        fmt: 采样格式,s16le 或 f32le
+        chunk_duration: 每次最多读取的时长(秒)
+
+    Yields:
+        (samples,) 的 float32 波形块,取值范围 [-1, 1]
+    """
+    if fmt not in PCM_FORMATS:
+        raise ValueError(f"不支持的 PCM 格式: {fmt},可选: {', '.join(PCM_FORMATS)}")
+    dtype, scale = PCM_FORMATS[fmt]
+    itemsize = np.dtype(dtype).itemsize
+    sample_rate = sample_rate or config.LIVE_SAMPLE_RATE
+    chunk_bytes = max(int(chunk_duration * sample_rate), 1) * itemsize
+    read = getattr(stream, "read1", stream.read)
+
+    leftover = b""
+    while True:
+        data = read(chunk_bytes)
+        if not data:
+            break
+        data = leftover + data
+        usable = len(data) // itemsize * itemsize
+        leftover = data[usable:]
+        if usable:
+            samples = np.frombuffer(data[:usable], dtype=dtype).astype(np.float32)
+            yield torch.from_numpy(samples / scale if scale != 1.0 else samples)
+
+
+class LiveTranscriber:
+    """
+    实时流说话人分离和语音识别引擎
+
+    每接收 step 秒新音频,对最近 window 秒做一次说话人分离。结束时间早于当前时刻
+    settle 秒的说话人片段视为已结束,识别后作为最终结果输出;仍在进行的片段
+    每 partial_interval 秒识别一次作为临时结果输出,超过 max_segment 秒时强制切分。
+    输出延迟约为 step + settle 加上一次分离和识别的耗时。
+
+    一次接收到较长的音频(处理落后于输入时的积压)时,按不超过 window - max_segment - settle 秒
+    的步长依次处理,保证尚未输出最终结果的音频始终留在窗口内,不会被跳过。
+    """
+
+    def __init__(
+        self,
+        diarizer,
+        recognizer,
+        sample_rate: int = None,
+        window: float = None,
+        step: float = None,
+        settle: float = None,
+        max_segment: float = None,
+        partial_interval: float = None,
+        min_segment: float = None,
+        language: str = None,
+        on_segment: Optional[Callable[[dict[str, Any]], None]] = None,
+    ):
+        """
+        初始化实时引擎
+
+        Args:
+            diarizer: SpeakerDiarization 实例
+            recognizer: SpeechRecognition 实例
+            sample_rate: 输入采样率,需与 Whisper 一致,默认 config.LIVE_SAMPLE_RATE
+            window: 滚动说话人分离窗口时长(秒),默认 config.LIVE_WINDOW
+            step: 两次处理之间至少接收的音频时长(秒),默认 config.LIVE_STEP
+            settle: 片段结束后等待确认的时长(秒),默认 config.LIVE_SETTLE
+            max_segment: 进行中片段的最长时长(秒),默认 config.LIVE_MAX_SEGMENT
+            partial_interval: 临时结果的最短输出间隔(秒),默认 config.LIVE_PARTIAL_INTERVAL,
+                0 表示不输出临时结果
+            min_segment: 短于该值(秒)的片段不识别,默认 config.LIVE_MIN_SEGMENT
+            language: 识别语言,默认 config.WHISPER_LANGUAGE
+            on_segment: 每输出一个临时或最终结果时调用,参数为带 final 字段的片段字典
+        """
+        self.diarizer = diarizer
+        self.recognizer = recognizer
+        self.sample_rate = sample_rate or config.LIVE_SAMPLE_RATE
+        self.window = window or config.LIVE_WINDOW
+        self.step = step or config.LIVE_STEP
+        self.settle = config.LIVE_SETTLE if settle is None else settle
+        self.max_segment = max_segment or config.LIVE_MAX_SEGMENT
+        self.partial_interval = (
+            config.LIVE_PARTIAL_INTERVAL if partial_interval is None else partial_interval
+        )
+        self.min_segment = config.LIVE_MIN_SEGMENT if min_segment is None else min_segment
+        self.language = language
+        self.on_segment = on_segment
+
+        if self.max_segment > 30.0:
+            raise ValueError("max_segment 不能超过 Whisper 的 30 秒窗口")
+        if self.window < self.max_segment + self.settle + self.step:
+            raise ValueError("window 必须不小于 max_segment + settle + step")
+
+        self.linker = SpeakerLinker(config.SPEAKER_LINK_THRESHOLD)
+        self.segments: list[dict[str, Any]] = []
+        self.latencies: list[float] = []
+
+        self._buffer = torch.zeros(0)
+        self._pending: list[torch.Tensor] = []
+        self._total = 0
+        # 已并入缓冲区的采样数,以及每次处理最多并入的采样数:
+        # 上次处理后未确认的音频不早于 max_segment + settle 秒前,窗口前移不超过余下的时长
+        self._processed = 0
+        self._max_advance = int((self.window - self.max_segment - self.settle) * self.sample_rate)
+        self._committed = 0.0
+        self._last_partial: Optional[float] = None
+        # 各输入块末尾的流时间和到达时刻,用于计算输出延迟
+        self._arrival_times: list[float] = []
+        self._arrival_clock: list[float] = []
+
+    @property
+    def now(self) -> float:
+        """已接收的音频时长(秒)"""
+        return self._total / self.sample_rate
+
+    @property
+    def num_speakers(self) -> int:
+        """已发现的说话人数量"""
+        return self.linker.num_speakers
+
+    def feed(self, samples: torch.Tensor) -> None:
+        """
+        接收一块音频,累计满 step 秒时处理一次,积压较多时分多次处理
+
+        Args:
+            samples: (samples,) 的 16kHz 单声道波形
+        """
+        samples = samples.reshape(-1)
+        if not samples.numel():
+            return
+        self._pending.append(samples)
+        self._total += samples.numel()
+        self._arrival_times.append(self.now)
+        self._arrival_clock.append(time.monotonic())
+
+        while (self._total - self._processed) / self.sample_rate >= self.step:
+            self._process(final=False)
+
+    def flush(self) -> None:
+        """输入结束: 把剩余的所有片段作为最终结果输出"""
+        while self._total - self._processed > self._max_advance:
+            self._process(final=False)
+        if self._total > 0:
+            self._process(final=True)
+
+    def run(self, stream: BinaryIO, fmt: str = "s16le") -> list[dict[str, Any]]:
+        """
+        处理整个输入流直到结束
+
+        读取在后台线程中进行,处理落后于输入时一次取出积压的全部音频,
+        按窗口允许的最大步长分几次处理完,而不是每个读取块处理一次,以尽快追上输入。
+
+        Args:
+            stream: 二进制读取流
+            fmt: PCM 采样格式
+
+        Returns:
+            全部最终结果片段
+        """
+        chunks: queue.Queue = queue.Queue()
+        errors: list[BaseException] = []
+
+        def reader() -> None:
+            try:
+                for chunk in read_pcm(stream, self.sample_rate, fmt):
+                    chunks.put(chunk)
+            except BaseException as e:
+                errors.append(e)
+            finally:
+                chunks.put(None)
+
+        thread = threading.Thread(target=reader, name="live-reader", daemon=True)
+        thread.start()
+
+        finished = False
+        while not finished:
+            batch = [chunks.get()]
+            while True:
+                try:
+                    batch.append(chunks.get_nowait())
+                except queue.Empty:
+                    break
+            if batch[-1] is None:
+                finished = True
+                batch.pop()
+            if batch:
+                self.feed(torch.cat(batch) if len(batch) > 1 else batch[0])
+
+        thread.join()
+        if errors:
+            raise errors[0]
+        self.flush()
+        return self.segments
+
+    def _consolidate(self) -> None:
+        """把新接收的音频并入缓冲区(最多 _max_advance 个采样),只保留最近 window 秒"""
+        taken, budget = [], self._max_advance
+        while self._pending and budget > 0:
+            chunk = self._pending[0]
+            if chunk.numel() > budget:
+                taken.append(chunk[:budget])
+                self._pending[0] = chunk[budget:]
+            else:
+                taken.append(self._pending.pop(0))
+            budget -= taken[-1].numel()
+        if taken:
+            keep = int(self.window * self.sample_rate)
+            self._buffer = torch.cat([self._buffer, *taken])[-keep:]
+            self._processed += self._max_advance - budget
+
+    def _process(self, final: bool) -> None:
+        """对当前窗口做说话人分离,输出已结束片段的最终结果和进行中片段的临时结果"""
+        self._consolidate()
+        now = self._processed / self.sample_rate
+        offset = now - self._buffer.numel() / self.sample_rate
+
+        with span("live_diarize", start=offset, end=now):
+            diarization, embeddings = self.diarizer.pipeline(
+                {"waveform": self._buffer[None], "sample_rate": self.sample_rate},
+                return_embeddings=True,
+            )
+        count("live_windows")
+        mapping = self.linker.link(list(diarization.labels()), embeddings)
+
+        horizon = now if final else now - self.settle
+        finished, partial = [], None
+        for turn, _, label in sorted(
+            diarization.itertracks(yield_label=True), key=lambda t: t[0].start
+        ):
+            start = max(offset + turn.start, self._committed)
+            end = min(offset + turn.end, now)
+            if end - start < self.min_segment:
+                continue
+
+            segment = {"speaker": mapping[label], "start": start, "end": end}
+            if end <= horizon:
+                finished.append(segment)
+            elif end - start >= self.max_segment:
+                # 过长的进行中片段在确认时刻切分,剩余部分在之后的窗口继续
+                segment["end"] = min(horizon, start + self.max_segment)
+                if segment["end"] - start >= self.min_segment:
+                    finished.append(segment)
+            else:
+                partial = segment
+
+        if finished:
+            texts = self._transcribe(finished, FALLBACK_TEMPERATURES)
+            for segment, text in zip(finished, texts):
+                self._committed = max(self._committed, segment["end"])
+                if text:
+                    self._emit({**segment, "text": text}, final=True)
+
+        if partial is not None and self.partial_interval > 0:
+            partial["start"] = max(partial["start"], self._committed)
+            due = self._last_partial is None or now - self._last_partial >= self.partial_interval
+            if due and partial["end"] - partial["start"] >= self.min_segment:
+                self._last_partial = now
+                text = self._transcribe([partial], (0.0,))[0]
+                if text:
+                    self._emit({**partial, "text": text}, final=False)
+
+        self._prune_arrivals(offset)
+
+    def _transcribe(self, segments: list[dict], temperatures: tuple) -> list[str]:
+        """批量识别缓冲区中的片段"""
+        offset = self._processed - self._buffer.numel()
+        audio = []
+        for segment in segments:
+            first = max(int(segment["start"] * self.sample_rate) - offset, 0)
+            last = max(int(segment["end"] * self.sample_rate) - offset, first)
+            audio.append(self._buffer[first:last])
+        with span("live_transcribe", segments=len(segments)):
+            return self.recognizer.transcribe_batch(audio, self.language, temperatures=temperatures)
+
+    def _emit(self, segment: dict[str, Any], final: bool) -> None:
+        """输出一个结果,记录从音频到达到输出的延迟"""
+        latency = self._latency(segment["end"])
+        result = {**segment, "final": final, "latency": latency}
+        if final:
+            self.segments.append(segment)
+            self.latencies.append(latency)
+            count("live_segments")
+        if self.on_segment is not None:
+            self.on_segment(result)
+
+    def _latency(self, stream_time: float) -> float:
+        """流时间 stream_time 处的音频到达后经过的时间(秒)"""
+        index = bisect.bisect_left(self._arrival_times, stream_time - 1e-9)
+        if index >= len(self._arrival_clock):
+            return 0.0
+        return time.monotonic() - self._arrival_clock[index]
+
+    def _prune_arrivals(self, before: float) -> None:
+        """丢弃已移出窗口的到达记录"""
+        index = bisect.bisect_left(self._arrival_times, before)
+        if index:
+            del self._arrival_times[:index]
+            del self._arrival_clock[:index]
+
+    def summary(self) -> dict[str, Any]:
+        """汇总处理结果和延迟"""
+        return {
+            "duration": self.now,
+            "speakers": len({s["speaker"] for s in self.segments}),
+            "segments": self.segments,
+            "latency_mean": float(np.mean(self.latencies)) if self.latencies else 0.0,
+            "latency_max": max(self.latencies, default=0.0),
+        }
@@ -0,0 +1,105 @@
+"""
+log-mel 频谱缓存模块
+对整个文件只做一次 STFT,按片段时间范围切片得到 Whisper 输入,
+说话人片段相互重叠或被多次识别时不再重复计算
+"""
+
+import threading
+
+import torch
+import whisper
+
+# 每块的 mel 帧数 (100 帧/秒,默认 5 分钟),按需计算
+MEL_CHUNK_FRAMES = 30000
+# 全零音频的 log10 能量下限,与 whisper.log_mel_spectrogram 的 clamp 一致
+LOG_FLOOR = -10.0
+
+
+class MelCache:
+    """
+    整个文件的 log-mel 频谱缓存
+
+    缓存的是未做动态范围裁剪的 log10 mel 能量;Whisper 按每段输入的最大值裁剪到 8 dB 范围,
+    因此切片时再按片段自身的最大值裁剪和归一化,结果与逐段计算一致
+    (只有片段首尾各两帧的 STFT 窗口会用到片段外的音频,且片段起点对齐到 10ms 的 mel 帧)。
+    频谱按块在首次访问时计算,流水线模式下计算量随识别进度分摊。
+    """
+
+    def __init__(
+        self, waveform: torch.Tensor, n_mels: int = 80, chunk_frames: int = MEL_CHUNK_FRAMES
+    ):
+        """
+        初始化 mel 缓存
+
+        Args:
+            waveform: (1, samples) 的 16kHz 完整波形
+            n_mels: mel 频带数,取 model.dims.n_mels
+            chunk_frames: 每块的 mel 帧数
+        """
+        self.audio = waveform.reshape(-1)
+        self.n_mels = n_mels
+        self.chunk_frames = chunk_frames
+        # 与 whisper.log_mel_spectrogram 一致: STFT 帧数减去最后一帧
+        self.num_frames = self.audio.shape[0] // whisper.audio.HOP_LENGTH
+        self._chunks: dict[int, torch.Tensor] = {}
+        self._lock = threading.Lock()
+        self._window = torch.hann_window(whisper.audio.N_FFT)
+        self._filters = whisper.audio.mel_filters("cpu", n_mels)
+
+    def _compute_chunk(self, index: int) -> torch.Tensor:
+        """计算第 index 块的 log10 mel 能量 (n_mels, frames)"""
+        hop, n_fft = whisper.audio.HOP_LENGTH, whisper.audio.N_FFT
+        first = index * self.chunk_frames
+        last = min(first + self.chunk_frames, self.num_frames)
+
+        # 第 f 帧以第 f * hop 个采样为中心;文件首尾与 torch.stft(center=True) 一样反射填充
+        lo = first * hop - n_fft // 2
+        hi = (last - 1) * hop + n_fft // 2
+        piece = self.audio[max(lo, 0) : min(hi, self.audio.shape[0])]
+        if lo < 0 or hi > self.audio.shape[0]:
+            pad = (max(-lo, 0), max(hi - self.audio.shape[0], 0))
+            piece = torch.nn.functional.pad(piece[None, None], pad, mode="reflect")[0, 0]
+
+        stft = torch.stft(piece, n_fft, hop, window=self._window, center=False, return_complex=True)
+        mel_spec = self._filters @ (stft.abs() ** 2)
+        return torch.clamp(mel_spec, min=1e-10).log10()
+
+    def _frames(self, first: int, last: int) -> torch.Tensor:
+        """返回 [first, last) 帧的 log10 mel 能量,按需计算所需的块"""
+        pieces = []
+        for index in range(first // self.chunk_frames, -(-last // self.chunk_frames)):
+            with self._lock:
+                chunk = self._chunks.get(index)
+                if chunk is None:
+                    chunk = self._chunks[index] = self._compute_chunk(index)
+            offset = index * self.chunk_frames
+            pieces.append(chunk[:, max(first - offset, 0) : last - offset])
+        if not pieces:
+            return torch.full((self.n_mels, 0), LOG_FLOOR)
+        return pieces[0] if len(pieces) == 1 else torch.cat(pieces, dim=1)
+
+    def segment(
+        self, start: float, end: float, num_frames: int = whisper.audio.N_FRAMES
+    ) -> torch.Tensor:
+        """
+        取片段的 Whisper 输入 mel
+
+        Args:
+            start: 开始时间(秒)
+            end: 结束时间(秒)
+            num_frames: 输出帧数,不足部分按静音填充,超出部分截断,默认 30 秒窗口
+
+        Returns:
+            (n_mels, num_frames) 归一化后的 log-mel 频谱
+        """
+        sample_rate = whisper.audio.SAMPLE_RATE
+        samples = int(end * sample_rate) - int(start * sample_rate)
+        first = min(round(start * sample_rate / whisper.audio.HOP_LENGTH), self.num_frames)
+        last = min(first + samples // whisper.audio.HOP_LENGTH, self.num_frames)
+        log_spec = self._frames(first, min(last, first + num_frames))
+
+        peak = log_spec.max().item() if log_spec.numel() else LOG_FLOOR
+        floor = max(peak - 8.0, LOG_FLOOR)
+        mel = torch.full((self.n_mels, num_frames), floor)
+        mel[:, : log_spec.shape[1]] = torch.clamp(log_spec, min=floor)
+        return (mel + 4.0) / 4.0
@@ -0,0 +1,138 @@
+"""
+模型注册表
+在进程内按 (模型名, 设备) 缓存已加载的模型,避免重复加载
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable
+
+from . import config
+
+_models: "OrderedDict[tuple, Any]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def get_model(key: tuple, loader: Callable[[], Any]) -> Any:
+    """
+    获取已缓存的模型,不存在时调用 loader 加载
+
+    缓存按最近使用顺序淘汰,最多保留 config.MODEL_CACHE_SIZE 个模型。
+
+    Args:
+        key: 缓存键,如 ("whisper", "medium", "cpu")
+        loader: 加载模型的无参函数
+
+    Returns:
+        模型实例
+    """
+    with _lock:
+        if key in _models:
+            _models.move_to_end(key)
+            return _models[key]
+
+        model = loader()
+        _models[key] = model
+        while len(_models) > config.MODEL_CACHE_SIZE:
+            _models.popitem(last=False)
+        return model
+
+
+def get_whisper_model(
+    name: str, device: str, quantize: bool = False, compile_model: bool = False
+) -> Any:
+    """
+    获取 Whisper 模型
+
+    Args:
+        name: Whisper 模型名称
+        device: 设备 (cpu/cuda)
+        quantize: 是否使用动态 int8 量化的模型(只支持 CPU,量化结果缓存在磁盘上)
+        compile_model: 是否用 torch.compile 编译编码器
+
+    Returns:
+        whisper.model.Whisper 实例
+    """
+
+    def load():
+        import whisper
+
+        from .quantization import compile_encoder, load_quantized_whisper
+
+        if quantize and device == "cpu":
+            model = load_quantized_whisper(name)
+        else:
+            if quantize:
+                print(f"⚠ 动态 int8 量化只支持 CPU,{device} 上使用原始模型")
+            model = whisper.load_model(name, device=device)
+        return compile_encoder(model) if compile_model else model
+
+    return get_model(("whisper", name, device, quantize, compile_model), load)
+
+
+def get_faster_whisper_model(name: str, device: str, compute_type: str) -> Any:
+    """
+    获取 faster-whisper (CTranslate2) 模型
+
+    Args:
+        name: Whisper 模型名称
+        device: 设备 (cpu/cuda)
+        compute_type: 权重和计算精度,如 int8、int8_float16、float32
+
+    Returns:
+        faster_whisper.WhisperModel 实例
+    """
+
+    def load():
+        import torch
+
+        try:
+            from faster_whisper import WhisperModel
+        except ImportError as e:
+            raise RuntimeError(
+                "faster-whisper 后端需要安装 faster-whisper: pip install 'whisper-diarization-demo[faster]'"
+            ) from e
+
+        # CTranslate2 使用自己的线程池,线程数与 torch 的设置保持一致
+        return WhisperModel(
+            name, device=device, compute_type=compute_type, cpu_threads=torch.get_num_threads()
+        )
+
+    return get_model(("faster-whisper", name, device, compute_type), load)
+
+
+def get_diarization_pipeline(name: str, use_auth_token: Any, device: str) -> Any:
+    """
+    获取 pyannote 说话人分离 pipeline
+
+    Args:
+        name: pyannote 模型名称
+        use_auth_token: Hugging Face token,离线模式为 False
+        device: 设备 (cpu/cuda)
+
+    Returns:
+        pyannote.audio.Pipeline 实例
+    """
+
+    def load():
+        import torch
+        from pyannote.audio import Pipeline
+
+        pipeline = Pipeline.from_pretrained(name, use_auth_token=use_auth_token)
+        if device == "cuda":
+            pipeline = pipeline.to(torch.device("cuda"))
+        return pipeline
+
+    return get_model(("pyannote", name, device), load)
+
+
+def is_loaded(key: tuple) -> bool:
+    """检查模型是否已在缓存中"""
+    with _lock:
+        return key in _models
+
+
+def clear() -> None:
+    """清空模型缓存"""
+    with _lock:
+        _models.clear()
@@ -0,0 +1,259 @@
+"""
+多进程语音识别模块
+把单个文件的说话人片段分片交给多个工作进程识别,每个进程持有自己的 Whisper 模型和线程预算;
+波形放在共享内存中,工作进程直接映射读取,不按片段序列化音频数据
+"""
+
+import atexit
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Callable, Optional
+
+import numpy as np
+import torch
+
+from .instrumentation import count
+from .resources import available_cores, configure_threads, split_cores
+from .speech_recognition import _OrderedEmitter, create_recognizer
+
+logger = logging.getLogger("whisper_diarization")
+
+# 每个工作进程平均分到的任务数,任务越小负载越均衡,但每个任务有调度开销
+TASKS_PER_WORKER = 4
+
+# 工作进程内的识别器和当前映射的共享内存,由 _init_worker 和 _attach 设置
+_worker_recognizer: Any = None
+_worker_audio: dict[str, Any] = {}
+
+
+def _init_worker(factory: Callable[..., Any], recognizer_options: dict, threads: int) -> None:
+    """工作进程初始化: 设置线程数并加载识别模型"""
+    global _worker_recognizer
+    configure_threads(threads)
+    _worker_recognizer = factory(**recognizer_options)
+
+
+def _attach(shm_name: str, num_samples: int, mel_cache: bool) -> tuple[torch.Tensor, Any]:
+    """映射父进程的共享内存波形,同一文件的后续任务复用映射和 mel 缓存"""
+    if _worker_audio.get("name") != shm_name:
+        previous = _worker_audio.pop("shm", None)
+        _worker_audio.clear()
+        if previous is not None:
+            previous.close()
+        shm = SharedMemory(name=shm_name)
+        samples = np.ndarray((1, num_samples), dtype=np.float32, buffer=shm.buf)
+        waveform = torch.from_numpy(samples)
+        _worker_audio.update(
+            name=shm_name,
+            shm=shm,
+            waveform=waveform,
+            mel_cache=_worker_recognizer.create_mel_cache(waveform) if mel_cache else None,
+        )
+    return _worker_audio["waveform"], _worker_audio["mel_cache"]
+
+
+def _transcribe_task(
+    shm_name: str,
+    num_samples: int,
+    sample_rate: int,
+    segments: list[dict],
+    batch_size: int,
+    merge_gap: Optional[float],
+    mel_cache: bool,
+) -> list[str]:
+    """在工作进程中识别一组连续的片段,返回与输入顺序一致的文本"""
+    waveform, cache = _attach(shm_name, num_samples, mel_cache)
+    results = _worker_recognizer.transcribe_segments(
+        waveform,
+        segments,
+        sample_rate,
+        batch_size=batch_size,
+        merge_gap=merge_gap,
+        mel_cache=cache,
+    )
+    return [result["text"] for result in results]
+
+
+def split_tasks(segments: list[dict], num_tasks: int) -> list[list[int]]:
+    """
+    按音频时长把片段切分为若干组连续的片段
+
+    Args:
+        segments: 片段列表
+        num_tasks: 目标任务数
+
+    Returns:
+        每个任务包含的片段下标(连续且按原顺序)
+    """
+    if not segments:
+        return []
+    total = sum(s["end"] - s["start"] for s in segments)
+    target = total / max(num_tasks, 1)
+
+    tasks: list[list[int]] = [[]]
+    filled = 0.0
+    for i, segment in enumerate(segments):
+        if tasks[-1] and filled >= target:
+            tasks.append([])
+            filled = 0.0
+        tasks[-1].append(i)
+        filled += segment["end"] - segment["start"]
+    return tasks
+
+
+class ParallelTranscriber:
+    """
+    多进程语音识别器
+
+    工作进程池在多次调用之间保持,模型只在各进程启动时加载一次。
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        threads_per_worker: Optional[int] = None,
+        factory: Callable[..., Any] = create_recognizer,
+        **recognizer_options: Any,
+    ):
+        """
+        启动工作进程池
+
+        Args:
+            workers: 工作进程数
+            threads_per_worker: 每个进程的 torch 线程数,默认平分 CPU 核心
+            factory: 在工作进程中创建识别器的函数,默认 create_recognizer
+            recognizer_options: 传给 factory 的参数(model_name、backend、quantize 等)
+        """
+        self.workers = workers
+        self.threads = threads_per_worker or min(split_cores(available_cores(), workers))
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(factory, recognizer_options, self.threads),
+        )
+
+    def __enter__(self) -> "ParallelTranscriber":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """关闭工作进程池"""
+        self._executor.shutdown()
+
+    def transcribe_segments(
+        self,
+        waveform: torch.Tensor,
+        segments: list,
+        sample_rate: int,
+        batch_size: int = 1,
+        merge_gap: Optional[float] = None,
+        mel_cache: bool = True,
+        on_segment: Optional[Callable[[dict], None]] = None,
+    ) -> list:
+        """
+        多进程识别片段,结果按原顺序返回
+
+        片段按时长切分为连续的分组,分组数为工作进程数的数倍,空闲进程依次领取。
+        合并模式 (merge_gap) 只在同一分组内合并片段。
+
+        Args:
+            waveform: (1, samples) 的 16kHz 完整波形
+            segments: 片段列表,每个片段包含 start 和 end 时间
+            sample_rate: 采样率
+            batch_size: 工作进程内的批量解码大小
+            merge_gap: 合并同一说话人相邻片段的最大间隔(秒),None 表示不合并
+            mel_cache: 工作进程是否对映射的波形使用 log-mel 缓存
+            on_segment: 每个片段识别完成时以结果调用,按片段顺序回调
+
+        Returns:
+            带有转录文本的片段列表
+        """
+        tasks = split_tasks(segments, self.workers * TASKS_PER_WORKER)
+        texts: list[str] = [""] * len(segments)
+        emitter = _OrderedEmitter(segments, on_segment)
+
+        samples = waveform.reshape(-1).to(torch.float32).numpy()
+        shm = SharedMemory(create=True, size=max(samples.nbytes, 1))
+        try:
+            np.ndarray(samples.shape, dtype=np.float32, buffer=shm.buf)[:] = samples
+            logger.info(
+                f"多进程识别: {len(segments)} 个片段分为 {len(tasks)} 组, "
+                f"{self.workers} 个进程 x {self.threads} 线程"
+            )
+
+            futures = {
+                self._executor.submit(
+                    _transcribe_task,
+                    shm.name,
+                    samples.shape[0],
+                    sample_rate,
+                    [segments[i] for i in task],
+                    batch_size,
+                    merge_gap,
+                    mel_cache,
+                ): task
+                for task in tasks
+            }
+            pending = set(futures)
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    task = futures[future]
+                    for i, text in zip(task, future.result()):
+                        texts[i] = text
+                        emitter.done(i, text)
+                    count("segments_transcribed", len(task))
+        finally:
+            shm.close()
+            shm.unlink()
+
+        results = []
+        for segment, text in zip(segments, texts):
+            result = segment.copy()
+            result["text"] = text
+            results.append(result)
+        return results
+
+
+_transcribers: dict[tuple, ParallelTranscriber] = {}
+_lock = threading.Lock()
+
+
+def get_parallel_transcriber(
+    workers: int, threads_per_worker: Optional[int] = None, **recognizer_options: Any
+) -> ParallelTranscriber:
+    """
+    获取进程内复用的多进程识别器,配置变化时关闭旧的工作进程池
+
+    Args:
+        workers: 工作进程数
+        threads_per_worker: 每个进程的线程数
+        recognizer_options: 传给 create_recognizer 的参数
+
+    Returns:
+        多进程识别器
+    """
+    key = (workers, threads_per_worker, tuple(sorted(recognizer_options.items())))
+    with _lock:
+        if key not in _transcribers:
+            shutdown()
+            _transcribers[key] = ParallelTranscriber(
+                workers, threads_per_worker, **recognizer_options
+            )
+        return _transcribers[key]
+
+
+def shutdown() -> None:
+    """关闭所有工作进程池"""
+    while _transcribers:
+        _, transcriber = _transcribers.popitem()
+        transcriber.close()
+
+
+atexit.register(shutdown)
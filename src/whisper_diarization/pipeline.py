@@ -0,0 +1,658 @@
+"""
+处理流程模块
+串联音频加载、说话人分离、语音识别和结果保存,供命令行、常驻进程等入口复用
+"""
+
+import logging
+import queue
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from . import config
+from .audio_processor import AudioProcessor
+from .cache import ResultCache, file_hash, make_key
+from .channel_separation import diarize_channels
+from .instrumentation import count, span
+from .resources import split_cores, stage_threads
+from .speaker_diarization import SpeakerDiarization
+from .speech_recognition import SpeechRecognition, _OrderedEmitter, create_recognizer
+from .utils.formatters import format_time, save_json, save_jsonl, save_srt, save_text
+from .vad import VoiceActivityDetector
+
+logger = logging.getLogger("whisper_diarization")
+
+
+@dataclass
+class PipelineOptions:
+    """处理流程选项"""
+
+    whisper_model: str = config.WHISPER_MODEL
+    # 语音识别后端: whisper 或 faster-whisper
+    asr_backend: str = config.ASR_BACKEND
+    # whisper 后端: 动态 int8 量化(仅 CPU)、torch.compile 编译编码器
+    quantize: bool = config.WHISPER_QUANTIZE
+    compile_model: bool = config.WHISPER_COMPILE
+    hf_token: Optional[str] = None
+    offline: bool = False
+    batch_size: int = config.WHISPER_BATCH_SIZE
+    merge_gap: Optional[float] = None
+    # 对整个文件计算一次 log-mel 频谱并按片段切片(低内存模式下不使用)
+    mel_cache: bool = config.MEL_CACHE
+    low_memory: bool = False
+    # 音频解码后端: torchaudio 或 ffmpeg
+    audio_backend: str = config.AUDIO_BACKEND
+    # 执行模式: sequential(先分离后逐片段识别)、pipelined(分离与识别并发)
+    # 或 align(整段识别后按词级时间戳分配给说话人片段)
+    mode: str = "sequential"
+    # 结果缓存: 是否启用、缓存目录(默认 config.CACHE_DIR)
+    use_cache: bool = True
+    cache_dir: Optional[str] = None
+    # 长音频分块说话人分离: 分块时长(秒,None 表示整段分离)、并行处理分块的进程数
+    diarization_chunk: Optional[float] = None
+    diarization_workers: int = 1
+    # 说话人索引目录: 设置后把匿名说话人映射为已登记的身份(流水线模式下不使用)
+    speaker_index: Optional[str] = None
+    # 分声道说话人分离: 多声道录音(如电话录音)每个声道作为一个说话人,串音时回退到 pyannote
+    split_channels: bool = False
+    # 各阶段的 intra-op 线程数,None 表示使用进程级设置
+    diarization_threads: Optional[int] = config.DIARIZATION_THREADS
+    asr_threads: Optional[int] = config.ASR_THREADS
+    # 单个文件的语音识别工作进程数,大于 1 时各进程的线程数为 asr_threads(默认平分核心)
+    asr_workers: int = config.ASR_WORKERS
+    # 识别前用语音活动检测裁剪片段首尾静音、丢弃不含语音的片段
+    vad: bool = False
+
+
+def process_audio(
+    audio_path: Path,
+    options: PipelineOptions,
+    on_segment: Optional[Callable[[dict], None]] = None,
+) -> dict[str, Any]:
+    """
+    对单个音频文件执行说话人分离和语音识别
+
+    模型通过进程内注册表获取,同一进程重复调用时不会重新加载。
+    启用缓存时,说话人分离结果和识别文本按音频内容哈希分别缓存,
+    命中的阶段会被跳过,对应的模型也不会加载。
+
+    Args:
+        audio_path: 音频文件路径
+        options: 处理流程选项
+        on_segment: 每个片段识别完成时以结果调用,用于增量输出(SegmentWriter.write_segment)
+
+    Returns:
+        输出数据字典 (audio_file、duration、speakers、segments、statistics、timestamp),
+        启用说话人索引时另含 identities (匿名标签到已登记身份和相似度的映射)
+    """
+    cache = ResultCache(options.cache_dir) if options.use_cache else None
+    audio_hash = file_hash(audio_path) if cache is not None else ""
+
+    diarization_key = _diarization_cache_key(audio_hash, options)
+    cached = cache.get("diarization", diarization_key) if cache is not None else None
+
+    segments: Optional[list[dict]] = None
+    embeddings: Optional[dict[str, Any]] = None
+    results: Optional[list[dict]] = None
+    waveform = None
+    sample_rate = 0
+
+    if cached is not None:
+        logger.info("[1-2/4] 使用缓存的说话人分离结果")
+        count("cache_hits")
+        duration = cached["duration"]
+        segments = cached["segments"]
+        embeddings = cached.get("embeddings")
+    else:
+        # 1. 加载音频
+        logger.info("[1/4] 加载音频文件...")
+        waveform, sample_rate, duration = _load_audio(audio_path, options)
+
+        if options.mode == "pipelined":
+            logger.info("[2-3/4] 流水线模式: 说话人分离与语音识别并发执行...")
+            if options.diarization_chunk:
+                logger.warning("流水线模式已按窗口分离,忽略分块说话人分离")
+            if options.speaker_index:
+                logger.warning("流水线模式下不使用说话人索引")
+            if options.split_channels:
+                logger.warning("流水线模式下不使用分声道说话人分离")
+            diarizer = SpeakerDiarization(hf_token=options.hf_token, offline=options.offline)
+            recognizer = _create_recognizer(options)
+            with stage_threads(_pipelined_threads(options)), span("diarize_and_transcribe"):
+                segments, results = _diarize_and_transcribe_pipelined(
+                    waveform, sample_rate, diarizer, recognizer, options, on_segment
+                )
+        else:
+            # 2. 说话人分离
+            if _split_channels(options):
+                # 各声道是不同的说话人时按声道的语音活动得到片段,不加载 pyannote
+                logger.info("[2/4] 按声道执行说话人分离...")
+                with span("diarize_channels"):
+                    segments, _ = diarize_channels(waveform, sample_rate)
+                if segments is None:
+                    logger.warning("声道未分离,回退到常规说话人分离")
+                    waveform = _downmix(waveform)
+                elif options.speaker_index:
+                    logger.warning("分声道说话人分离的结果没有中心向量,不使用说话人索引")
+
+        if segments is None:
+            logger.info("[2/4] 执行说话人分离...")
+            diarizer = SpeakerDiarization(hf_token=options.hf_token, offline=options.offline)
+            # 身份识别需要分离同时返回各说话人的中心向量
+            identify = _identify_speakers(options)
+            extra = {"return_embeddings": True} if identify else {}
+            with stage_threads(options.diarization_threads), span("diarize"):
+                if options.diarization_chunk:
+                    # 分块分离后全局聚类,低内存模式下分块从文件按需读取
+                    diarized = diarizer.diarize_chunked(
+                        waveform,
+                        sample_rate,
+                        chunk=options.diarization_chunk,
+                        workers=options.diarization_workers,
+                        **extra,
+                    )
+                elif options.low_memory:
+                    # pyannote 按滑动窗口从文件裁剪读取,无需完整波形
+                    diarized = diarizer.diarize(str(audio_path), **extra)
+                else:
+                    diarized = diarizer.diarize(waveform, sample_rate, **extra)
+            if identify:
+                segments, embeddings = diarized
+                embeddings = {label: list(map(float, v)) for label, v in embeddings.items()}
+            else:
+                segments = diarized
+
+        if cache is not None:
+            entry = {"duration": duration, "segments": [_turn(s) for s in segments]}
+            if embeddings is not None:
+                entry["embeddings"] = embeddings
+            cache.put("diarization", diarization_key, entry)
+
+    identities = None
+    if embeddings is not None:
+        from .speaker_index import identify_speakers, open_index
+
+        with span("identify_speakers", speakers=len(embeddings)):
+            segments, identities = identify_speakers(
+                segments, embeddings, open_index(options.speaker_index)
+            )
+        for label, identity in identities.items():
+            logger.info(f"说话人识别: {label} -> {identity['name']} ({identity['score']:.2f})")
+
+    transcripts_key = _transcripts_cache_key(audio_hash, options, segments)
+    if results is None and cache is not None:
+        results = cache.get("transcripts", transcripts_key)
+        if results is not None:
+            logger.info("[3/4] 使用缓存的识别结果")
+            count("cache_hits")
+            if on_segment is not None:
+                for result in results:
+                    on_segment(result)
+
+    if results is None:
+        # 3. 语音识别
+        logger.info("[3/4] 执行语音识别...")
+        if waveform is None:
+            waveform, sample_rate, _ = _load_audio(audio_path, options)
+        if segments and "channel" in segments[0]:
+            # 分声道模式: 各声道只识别本声道的语音段,片段已由语音检测得到,不再裁剪;
+            # 各声道依次识别,流式输出经 _OrderedEmitter 按全局时间顺序回调
+            emit = None
+            if on_segment is not None:
+                emitter = _OrderedEmitter(segments, on_segment)
+                position = {_segment_key(s): i for i, s in enumerate(segments)}
+
+                def emit(result: dict) -> None:
+                    emitter.done(position[_segment_key(result)], result["text"])
+
+            results = []
+            for channel in sorted({s["channel"] for s in segments}):
+                with span("transcribe_channel", channel=channel):
+                    results.extend(
+                        _transcribe(
+                            waveform[channel : channel + 1],
+                            [s for s in segments if s["channel"] == channel],
+                            sample_rate,
+                            options,
+                            emit,
+                        )
+                    )
+            results.sort(key=lambda r: r["start"])
+        else:
+            if _split_channels(options):
+                waveform = _downmix(waveform)
+            speech_segments = segments
+            if options.vad:
+                vad = _analyze_speech(waveform, sample_rate)
+                with span("vad"):
+                    speech_segments, vad_stats = vad.filter_segments(segments)
+                _report_vad(vad_stats)
+            results = _transcribe(waveform, speech_segments, sample_rate, options, on_segment)
+
+    if cache is not None:
+        cache.put(
+            "transcripts", transcripts_key, [{**_turn(r), "text": r["text"]} for r in results]
+        )
+
+    # 显示统计信息
+    stats = SpeakerDiarization.get_speaker_statistics(segments)
+    logger.info("说话人统计:")
+    for speaker, info in stats.items():
+        logger.info(
+            f"  {speaker}: {info['segment_count']} 个片段, "
+            f"总时长 {format_time(info['total_duration'])}"
+        )
+
+    output = {
+        "audio_file": str(audio_path.absolute()),
+        "duration": duration,
+        "speakers": len(stats),
+        "segments": results,
+        "statistics": stats,
+        "timestamp": datetime.now().isoformat(),
+    }
+    if identities is not None:
+        output["identities"] = identities
+    return output
+
+
+def _transcribe(
+    waveform,
+    speech_segments: list[dict],
+    sample_rate: int,
+    options: PipelineOptions,
+    on_segment: Optional[Callable[[dict], None]],
+) -> list[dict]:
+    """按处理选项识别说话人片段: 对齐模式、多进程识别或单进程逐片段识别"""
+    if options.mode == "align":
+        # 对齐模式: 整段按 30 秒窗口识别,词按时间戳分配给说话人片段
+        if options.asr_workers > 1:
+            logger.warning("对齐模式下不使用多进程识别")
+        recognizer = _create_recognizer(options)
+        with (
+            stage_threads(options.asr_threads),
+            span("transcribe", segments=len(speech_segments), mode="align"),
+        ):
+            return recognizer.transcribe_aligned(
+                waveform, speech_segments, sample_rate, on_segment=on_segment
+            )
+
+    if options.asr_workers > 1 and not options.low_memory:
+        # 多进程识别: 各进程持有自己的模型,通过共享内存读取波形
+        with span("transcribe", segments=len(speech_segments), workers=options.asr_workers):
+            return _get_parallel_transcriber(options).transcribe_segments(
+                waveform,
+                speech_segments,
+                sample_rate,
+                batch_size=options.batch_size,
+                merge_gap=options.merge_gap,
+                mel_cache=options.mel_cache,
+                on_segment=on_segment,
+            )
+
+    if options.asr_workers > 1:
+        logger.warning("低内存模式下不使用多进程识别")
+    recognizer = _create_recognizer(options)
+    with (
+        stage_threads(options.asr_threads),
+        span("transcribe", segments=len(speech_segments)),
+    ):
+        return recognizer.transcribe_segments(
+            waveform,
+            speech_segments,
+            sample_rate,
+            batch_size=options.batch_size,
+            merge_gap=options.merge_gap,
+            mel_cache=_create_mel_cache(recognizer, waveform, options),
+            on_segment=on_segment,
+        )
+
+
+def enroll_speaker(audio_path: Path, name: str, index_dir, options: PipelineOptions) -> None:
+    """
+    从一段录音登记说话人: 取说话总时长最长的说话人的中心向量存入说话人索引
+
+    登记的向量数达到 config.SPEAKER_INDEX_IVF_MIN 且尚未建立 IVF 分区时自动建立分区。
+
+    Args:
+        audio_path: 登记用的音频文件(以被登记人的讲话为主)
+        name: 说话人名称
+        index_dir: 说话人索引目录
+        options: 处理流程选项(音频后端、分块说话人分离等)
+    """
+    from .speaker_index import SpeakerIndex, dominant_embedding
+
+    waveform, sample_rate, _ = _load_audio(audio_path, options)
+    if _split_channels(options):
+        waveform = _downmix(waveform)
+    diarizer = SpeakerDiarization(hf_token=options.hf_token, offline=options.offline)
+    with stage_threads(options.diarization_threads), span("diarize"):
+        if options.diarization_chunk:
+            segments, embeddings = diarizer.diarize_chunked(
+                waveform,
+                sample_rate,
+                chunk=options.diarization_chunk,
+                workers=options.diarization_workers,
+                return_embeddings=True,
+            )
+        elif options.low_memory:
+            segments, embeddings = diarizer.diarize(str(audio_path), return_embeddings=True)
+        else:
+            segments, embeddings = diarizer.diarize(waveform, sample_rate, return_embeddings=True)
+
+    index = SpeakerIndex(index_dir)
+    index.add(name, dominant_embedding(segments, embeddings))
+    if index.centroids is None and len(index) >= config.SPEAKER_INDEX_IVF_MIN:
+        logger.info(f"说话人索引已有 {len(index)} 个向量,建立 IVF 分区...")
+        index.build_ivf()
+
+
+def _identify_speakers(options: PipelineOptions) -> bool:
+    """是否在说话人分离后按说话人索引识别身份(需要分离返回中心向量)"""
+    return bool(options.speaker_index) and options.mode != "pipelined"
+
+
+def _pipelined_threads(options: PipelineOptions) -> int:
+    """
+    流水线模式下两个阶段并发执行,共享进程级 intra-op 线程池,
+    因此每个阶段的并行区域使用分到的核心数,避免两个阶段同时占满所有核心造成过度订阅
+    """
+    import torch
+
+    if options.diarization_threads or options.asr_threads:
+        return max(options.diarization_threads or 1, options.asr_threads or 1)
+    return split_cores(torch.get_num_threads(), 2)[0]
+
+
+def _load_audio(audio_path: Path, options: PipelineOptions) -> tuple[Any, int, float]:
+    """加载音频,低内存模式下返回按需读取的音频源,分声道模式下保留各声道的完整波形"""
+    processor = AudioProcessor(backend=options.audio_backend)
+    with span("load", path=str(audio_path), low_memory=options.low_memory):
+        if _split_channels(options):
+            if options.low_memory:
+                logger.warning("分声道说话人分离需要完整的多声道波形,加载时不使用低内存模式")
+            waveform, sample_rate = processor.load_audio(str(audio_path), downmix=False)
+        elif options.low_memory:
+            waveform = processor.open_audio(str(audio_path))
+            sample_rate = processor.sample_rate
+        else:
+            waveform, sample_rate = processor.load_audio(str(audio_path))
+    duration = processor.get_duration(waveform, sample_rate)
+    logger.info(f"音频时长: {format_time(duration)}")
+    return waveform, sample_rate, duration
+
+
+def _create_recognizer(options: PipelineOptions) -> SpeechRecognition:
+    """按处理选项创建语音识别器"""
+    return create_recognizer(
+        options.whisper_model,
+        options.asr_backend,
+        quantize=options.quantize,
+        compile_model=options.compile_model,
+    )
+
+
+def _get_parallel_transcriber(options: PipelineOptions):
+    """按处理选项获取多进程识别器,工作进程池在同一进程内复用"""
+    from .parallel_asr import get_parallel_transcriber
+
+    return get_parallel_transcriber(
+        options.asr_workers,
+        options.asr_threads,
+        model_name=options.whisper_model,
+        backend=options.asr_backend,
+        quantize=options.quantize,
+        compile_model=options.compile_model,
+    )
+
+
+def _create_mel_cache(recognizer: SpeechRecognition, waveform, options: PipelineOptions):
+    """按选项为完整波形创建 log-mel 缓存,低内存模式下返回 None"""
+    if not options.mel_cache or options.low_memory:
+        return None
+    return recognizer.create_mel_cache(waveform)
+
+
+def _analyze_speech(waveform, sample_rate: int) -> VoiceActivityDetector:
+    """对整个音频计算语音掩码"""
+    vad = VoiceActivityDetector()
+    with span("vad_analyze"):
+        vad.analyze(waveform, sample_rate)
+    return vad
+
+
+def _report_vad(stats: dict[str, Any]) -> None:
+    """记录语音活动检测节省的识别时长"""
+    count("vad_segments_dropped", stats["dropped"])
+    count("vad_seconds_skipped", stats["skipped_seconds"])
+    ratio = stats["skipped_seconds"] / stats["input_seconds"] if stats["input_seconds"] else 0.0
+    logger.info(
+        f"语音活动检测: 丢弃 {stats['dropped']}/{stats['segments']} 个片段, "
+        f"裁剪 {stats['trimmed']} 个片段, 跳过 {format_time(stats['skipped_seconds'])} "
+        f"({ratio:.1%}) 的音频"
+    )
+
+
+def _turn(segment: dict) -> dict:
+    """只保留说话人片段的 speaker/start/end 字段(以及分声道模式下的 channel 字段)"""
+    turn = {"speaker": segment["speaker"], "start": segment["start"], "end": segment["end"]}
+    if "channel" in segment:
+        turn["channel"] = segment["channel"]
+    return turn
+
+
+def _segment_key(segment: dict) -> tuple:
+    """分声道模式下唯一标识一个片段的 (声道, 开始, 结束)"""
+    return segment["channel"], segment["start"], segment["end"]
+
+
+def _split_channels(options: PipelineOptions) -> bool:
+    """是否按声道执行说话人分离(流水线模式按窗口分离,不使用)"""
+    return options.split_channels and options.mode != "pipelined"
+
+
+def _downmix(waveform):
+    """把分声道模式加载的多声道波形混音为单声道(回退到常规说话人分离时使用)"""
+    return waveform.mean(dim=0, keepdim=True) if waveform.shape[0] > 1 else waveform
+
+
+def _diarization_cache_key(audio_hash: str, options: PipelineOptions) -> str:
+    """说话人分离结果的缓存键: 音频内容 + 解码后端 + 分离模型 + 分窗/分块参数"""
+    windows = (
+        (config.PIPELINE_WINDOW, config.PIPELINE_OVERLAP) if options.mode == "pipelined" else None
+    )
+    # 对齐模式与顺序模式的说话人分离相同,共用缓存
+    mode = "sequential" if options.mode == "align" else options.mode
+    parts = [audio_hash, options.audio_backend, config.DIARIZATION_MODEL, mode, windows]
+    if options.diarization_chunk and options.mode != "pipelined":
+        parts.append((options.diarization_chunk, config.SPEAKER_CLUSTER_THRESHOLD))
+    if _identify_speakers(options):
+        # 缓存中另存各说话人的中心向量,与不含向量的结果区分
+        parts.append("embeddings")
+    if _split_channels(options):
+        # 分声道结果取决于声道判定参数和每个声道的语音检测参数
+        parts.append(
+            (
+                "channels",
+                config.CHANNEL_DOMINANCE_DB,
+                config.CHANNEL_MAX_CROSSTALK,
+                config.CHANNEL_MIN_SILENCE,
+                config.CHANNEL_MIN_SPEECH,
+                _vad_params(),
+            )
+        )
+    return make_key(*parts)
+
+
+def _transcripts_cache_key(audio_hash: str, options: PipelineOptions, segments: list[dict]) -> str:
+    """识别结果的缓存键: 音频内容 + 识别后端和模型 + 语言和提示 + 识别方式 + 语音检测参数 + 片段"""
+    language = config.WHISPER_LANGUAGE
+    backend = options.asr_backend
+    if backend != "whisper":
+        backend = (backend, config.ASR_COMPUTE_TYPE)
+    elif options.quantize and config.DEVICE == "cpu":
+        backend = (backend, "qint8")
+    return make_key(
+        audio_hash,
+        backend,
+        options.whisper_model,
+        language,
+        SpeechRecognition._default_prompt(language),
+        options.mode == "align",
+        options.batch_size > 1,
+        options.merge_gap,
+        # 多进程识别时合并只在同一分组内进行
+        options.merge_gap is not None and options.asr_workers > 1,
+        options.mel_cache and not options.low_memory,
+        _vad_params() if options.vad else None,
+        [_turn(s) for s in segments],
+    )
+
+
+def _vad_params() -> tuple:
+    """影响语音活动检测结果的配置"""
+    return (
+        config.VAD_THRESHOLD_DB,
+        config.VAD_MARGIN_DB,
+        config.VAD_FRAME_DURATION,
+        config.VAD_MIN_SPEECH,
+        config.VAD_PADDING,
+    )
+
+
+def _diarize_and_transcribe_pipelined(
+    waveform,
+    sample_rate: int,
+    diarizer: SpeakerDiarization,
+    recognizer: SpeechRecognition,
+    options: PipelineOptions,
+    on_segment: Optional[Callable[[dict], None]] = None,
+) -> tuple[list[dict], list[dict]]:
+    """
+    流水线模式: 说话人分离在后台线程中按窗口产出片段,放入有界队列,
+    主线程同时从队列取出片段进行识别,总耗时接近两者中较慢的一方
+
+    Returns:
+        (segments, results): 说话人片段和带识别文本的片段,均按开始时间排序
+    """
+    vad = _analyze_speech(waveform, sample_rate) if options.vad else None
+    mel_cache = _create_mel_cache(recognizer, waveform, options)
+    vad_stats: dict[str, Any] = {}
+
+    turns: queue.Queue = queue.Queue(maxsize=config.PIPELINE_QUEUE_SIZE)
+    done = object()
+    errors: list[BaseException] = []
+    # 识别出错时通知后台线程停止,避免其永远阻塞在已满的队列上(常驻工作进程中会逐个任务泄漏线程)
+    stop = threading.Event()
+
+    def put(item) -> bool:
+        """放入队列,识别已停止时放弃并返回 False"""
+        while not stop.is_set():
+            try:
+                turns.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce() -> None:
+        try:
+            for finalized in diarizer.diarize_windows(waveform, sample_rate):
+                for turn in finalized:
+                    if not put(turn):
+                        return
+        except BaseException as e:
+            errors.append(e)
+        finally:
+            put(done)
+
+    producer = threading.Thread(target=produce, name="diarization", daemon=True)
+    producer.start()
+
+    segments: list[dict] = []
+    results: list[dict] = []
+    finished = False
+    try:
+        while not finished:
+            # 阻塞等待至少一个片段,再取出队列中已就绪的片段一起识别
+            batch = [turns.get()]
+            while len(batch) < max(options.batch_size, 1) and not turns.empty():
+                batch.append(turns.get())
+            if batch[-1] is done:
+                finished = True
+                batch.pop()
+            if not batch:
+                continue
+
+            segments.extend(batch)
+            if vad is not None:
+                batch, stats = vad.filter_segments(batch)
+                for key, value in stats.items():
+                    vad_stats[key] = vad_stats.get(key, 0) + value
+                if not batch:
+                    continue
+            results.extend(
+                recognizer.transcribe_segments(
+                    waveform,
+                    batch,
+                    sample_rate,
+                    batch_size=options.batch_size,
+                    merge_gap=options.merge_gap,
+                    mel_cache=mel_cache,
+                    on_segment=on_segment,
+                )
+            )
+    finally:
+        stop.set()
+        producer.join()
+
+    if errors:
+        raise errors[0]
+    if vad_stats:
+        _report_vad(vad_stats)
+
+    segments.sort(key=lambda x: x["start"])
+    results.sort(key=lambda x: x["start"])
+    return segments, results
+
+
+def resolve_output_path(output: Optional[str], fmt: str) -> Path:
+    """
+    确定输出路径,未指定时保存到 output 目录(不存在时创建)
+
+    Args:
+        output: 用户指定的输出路径
+        fmt: 输出格式 (json, jsonl, text, srt)
+
+    Returns:
+        输出文件路径
+    """
+    if output:
+        return Path(output)
+    config.OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return config.OUTPUT_DIR / f"result_{timestamp}.{fmt}"
+
+
+def save_result(output_data: dict[str, Any], output_path: Path, fmt: str) -> None:
+    """
+    按格式保存结果
+
+    Args:
+        output_data: process_audio 返回的输出数据
+        output_path: 输出文件路径
+        fmt: 输出格式 (json, jsonl, text, srt)
+    """
+    with span("save", format=fmt):
+        if fmt == "json":
+            save_json(output_data, output_path)
+        elif fmt == "jsonl":
+            save_jsonl(output_data, output_path)
+        elif fmt == "text":
+            save_text(output_data, output_path)
+        elif fmt == "srt":
+            save_srt(output_data, output_path)
+        else:
+            raise ValueError(f"不支持的输出格式: {fmt}")
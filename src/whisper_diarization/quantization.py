@@ -0,0 +1,108 @@
+"""
+Whisper 模型加速模块
+对 openai-whisper 模型的 Linear 层做动态 int8 量化,或用 torch.compile 编译编码器;
+量化后的模型缓存在磁盘上,转换只需进行一次
+"""
+
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Optional
+
+import torch
+import whisper
+
+from . import config
+
+
+def quantize_dynamic_whisper(model: Any) -> Any:
+    """
+    对 Whisper 模型的全部 Linear 层做动态 int8 量化
+
+    Whisper 使用只在前向时转换权重精度的 nn.Linear 子类,量化按精确类型匹配不会替换它们;
+    FP32 推理时两者等价,因此先把它们还原为 nn.Linear 再量化。
+    权重量化为 int8,激活在运行时按批动态量化,只支持 CPU。
+
+    Args:
+        model: CPU 上的 whisper.model.Whisper 实例
+
+    Returns:
+        量化后的模型(原模型的 Linear 层被替换)
+    """
+    for module in model.modules():
+        if type(module) is whisper.model.Linear:
+            module.__class__ = torch.nn.Linear
+    return torch.ao.quantization.quantize_dynamic(
+        model, qconfig_spec={torch.nn.Linear}, dtype=torch.qint8, inplace=True
+    )
+
+
+def quantized_model_path(name: str, cache_dir: Optional[Path] = None) -> Path:
+    """
+    量化模型的缓存文件路径
+
+    量化模型以完整模块保存,文件名包含 whisper 和 torch 版本,版本变化时重新转换。
+
+    Args:
+        name: Whisper 模型名称
+        cache_dir: 缓存目录,默认 config.CACHE_DIR / "models"
+
+    Returns:
+        缓存文件路径
+    """
+    cache_dir = Path(cache_dir or config.CACHE_DIR / "models")
+    return cache_dir / f"whisper-{name}-qint8-{whisper.__version__}-torch{torch.__version__}.pt"
+
+
+def load_quantized_whisper(name: str, cache_dir: Optional[Path] = None) -> Any:
+    """
+    加载动态量化的 Whisper 模型,磁盘缓存不存在时转换并保存
+
+    Args:
+        name: Whisper 模型名称
+        cache_dir: 缓存目录,默认 config.CACHE_DIR / "models"
+
+    Returns:
+        CPU 上的量化模型
+    """
+    path = quantized_model_path(name, cache_dir)
+    if path.exists():
+        print(f"加载已量化的模型: {path}")
+        try:
+            return torch.load(path, map_location="cpu", weights_only=False)
+        except Exception as e:
+            print(f"⚠ 量化模型缓存损坏,重新转换: {e}")
+
+    print(f"正在对 Whisper 模型做动态 int8 量化: {name}")
+    model = quantize_dynamic_whisper(whisper.load_model(name, device="cpu"))
+
+    # 先写临时文件再原子替换,避免并发进程读到半写入的文件
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    os.close(fd)
+    try:
+        torch.save(model, tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    print(f"✓ 量化模型已保存到: {path}")
+    return model
+
+
+def compile_encoder(model: Any) -> Any:
+    """
+    用 torch.compile 编译 Whisper 编码器
+
+    编码器的输入固定为 30 秒 mel 窗口,编译一次即可复用。解码器每步长度不同,
+    并且 whisper 每次解码都会重新挂载 kv cache 钩子,编译会反复失效,因此保持 eager 执行。
+
+    Args:
+        model: whisper.model.Whisper 实例
+
+    Returns:
+        编码器被替换为编译模块的原模型
+    """
+    model.encoder = torch.compile(model.encoder, dynamic=False)
+    return model
@@ -0,0 +1,89 @@
+"""
+CPU 资源管理模块
+配置 torch 的 intra-op / inter-op 线程数,并在各处理阶段之间分配 CPU 核心
+"""
+
+import logging
+import os
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Optional
+
+logger = logging.getLogger("whisper_diarization")
+
+
+def available_cores() -> int:
+    """返回当前进程可用的 CPU 核心数(考虑 CPU 亲和性限制)"""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def split_cores(total: int, parts: int) -> list[int]:
+    """
+    把 total 个核心尽量平均地分给 parts 个并发任务,每个任务至少 1 个
+
+    Args:
+        total: 核心总数
+        parts: 并发任务数
+
+    Returns:
+        每个任务分到的核心数
+
+    Examples:
+        >>> split_cores(10, 3)
+        [4, 3, 3]
+    """
+    if parts <= 0:
+        return []
+    base, extra = divmod(max(total, parts), parts)
+    return [base + 1 if i < extra else base for i in range(parts)]
+
+
+def configure_threads(threads: Optional[int] = None, interop_threads: Optional[int] = None) -> int:
+    """
+    设置进程级 torch 线程数
+
+    inter-op 线程数只能在进程中第一次并行计算之前设置,之后的设置会被忽略并给出警告。
+
+    Args:
+        threads: intra-op 线程数,默认使用全部可用核心
+        interop_threads: inter-op 线程数,默认保持 torch 的设置
+
+    Returns:
+        实际使用的 intra-op 线程数
+    """
+    import torch
+
+    threads = threads or available_cores()
+    torch.set_num_threads(threads)
+
+    if interop_threads:
+        try:
+            torch.set_num_interop_threads(interop_threads)
+        except RuntimeError:
+            logger.warning("inter-op 线程数只能在并行计算开始前设置,已忽略 --interop-threads")
+
+    return threads
+
+
+@contextmanager
+def stage_threads(threads: Optional[int]) -> Iterator[None]:
+    """
+    在一个处理阶段内临时使用指定的 intra-op 线程数,结束后恢复
+
+    Args:
+        threads: 本阶段线程数,None 表示不修改
+    """
+    import torch
+
+    if not threads:
+        yield
+        return
+
+    previous = torch.get_num_threads()
+    torch.set_num_threads(threads)
+    try:
+        yield
+    finally:
+        torch.set_num_threads(previous)
@@ -0,0 +1,85 @@
+"""
+片段合并模块
+在语音识别前合并同一说话人的相邻短片段,并按 Whisper 的 30 秒窗口打包
+识别后再根据词级时间戳把文本拆分回原始片段
+"""
+
+from typing import Any
+
+
+def merge_segments(
+    segments: list[dict], max_gap: float = 0.5, max_duration: float = 30.0
+) -> list[dict]:
+    """
+    合并同一说话人相邻且间隔较短的片段
+
+    Args:
+        segments: 按开始时间排序的说话人片段列表
+        max_gap: 允许合并的最大间隔(秒)
+        max_duration: 合并后片段的最大时长(秒),默认为 Whisper 的 30 秒窗口
+
+    Returns:
+        合并后的片段组列表,每组包含:
+        - speaker: 说话人标识
+        - start: 开始时间(秒)
+        - end: 结束时间(秒)
+        - members: 组内原始片段在 segments 中的索引
+    """
+    groups: list[dict[str, Any]] = []
+
+    for i, segment in enumerate(segments):
+        last = groups[-1] if groups else None
+        if (
+            last is not None
+            and last["speaker"] == segment["speaker"]
+            and segment["start"] - last["end"] <= max_gap
+            and max(last["end"], segment["end"]) - last["start"] <= max_duration
+        ):
+            last["end"] = max(last["end"], segment["end"])
+            last["members"].append(i)
+        else:
+            groups.append(
+                {
+                    "speaker": segment["speaker"],
+                    "start": segment["start"],
+                    "end": segment["end"],
+                    "members": [i],
+                }
+            )
+
+    return groups
+
+
+def split_words(words: list[dict], members: list[dict], offset: float = 0.0) -> list[str]:
+    """
+    根据词级时间戳把合并片段的识别结果拆分回原始片段
+
+    每个词按其中点时间归入包含该时刻的片段,落在片段间隙中的词归入最近的片段。
+
+    Args:
+        words: Whisper 输出的词列表,每个词包含 word、start、end(相对合并片段开头)
+        members: 组内原始片段列表(绝对时间)
+        offset: 合并片段在完整音频中的开始时间(秒)
+
+    Returns:
+        与 members 顺序一致的文本列表
+    """
+    pieces: list[list[str]] = [[] for _ in members]
+    if not members:
+        return []
+
+    for word in words:
+        midpoint = offset + (word["start"] + word["end"]) / 2
+
+        best, best_distance = 0, float("inf")
+        for i, member in enumerate(members):
+            if member["start"] <= midpoint <= member["end"]:
+                best = i
+                break
+            distance = min(abs(midpoint - member["start"]), abs(midpoint - member["end"]))
+            if distance < best_distance:
+                best, best_distance = i, distance
+
+        pieces[best].append(word["word"])
+
+    return ["".join(piece).strip() for piece in pieces]
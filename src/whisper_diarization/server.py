@@ -0,0 +1,145 @@
+"""
+常驻工作进程
+通过 Unix socket 接收任务,模型常驻内存,避免每次调用都重新加载
+"""
+
+import json
+import logging
+import os
+import socket
+import socketserver
+from dataclasses import replace
+from pathlib import Path
+from typing import Any
+
+from . import config
+from .pipeline import PipelineOptions, process_audio, resolve_output_path, save_result
+from .speaker_diarization import SpeakerDiarization
+from .speech_recognition import create_recognizer
+
+logger = logging.getLogger("whisper_diarization")
+
+# 任务中允许覆盖的处理选项
+_JOB_OPTIONS = (
+    "whisper_model",
+    "asr_backend",
+    "quantize",
+    "compile_model",
+    "batch_size",
+    "merge_gap",
+    "mel_cache",
+    "low_memory",
+    "audio_backend",
+    "vad",
+    "mode",
+    "asr_workers",
+    "diarization_chunk",
+    "diarization_workers",
+    "speaker_index",
+    "split_channels",
+)
+
+
+def run_job(job: dict[str, Any], defaults: PipelineOptions) -> dict[str, Any]:
+    """
+    执行一个任务
+
+    Args:
+        job: 任务字典,必须包含 audio,可选 output、format 及 _JOB_OPTIONS 中的选项
+        defaults: 工作进程的默认处理选项
+
+    Returns:
+        结果字典,包含 output(输出路径)、duration、speakers
+    """
+    audio_path = Path(job["audio"])
+    if not audio_path.exists():
+        raise FileNotFoundError(f"音频文件不存在: {audio_path}")
+
+    fmt = job.get("format", "json")
+    overrides = {key: job[key] for key in _JOB_OPTIONS if key in job}
+    options = replace(defaults, **overrides)
+
+    output_data = process_audio(audio_path, options)
+    output_path = resolve_output_path(job.get("output"), fmt)
+    save_result(output_data, output_path, fmt)
+
+    return {
+        "output": str(output_path),
+        "duration": output_data["duration"],
+        "speakers": output_data["speakers"],
+    }
+
+
+class _JobHandler(socketserver.StreamRequestHandler):
+    """每行一个 JSON 任务,每行返回一个 JSON 结果"""
+
+    def handle(self) -> None:
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                job = json.loads(line)
+                logger.info(f"收到任务: {job.get('audio')}")
+                response = {"status": "ok", **run_job(job, self.server.defaults)}
+            except Exception as e:
+                logger.error(f"任务失败: {e}", exc_info=True)
+                response = {"status": "error", "error": str(e)}
+
+            self.wfile.write((json.dumps(response, ensure_ascii=False) + "\n").encode("utf-8"))
+            self.wfile.flush()
+
+
+class WorkerServer(socketserver.UnixStreamServer):
+    """常驻工作进程服务器,任务按到达顺序串行执行"""
+
+    def __init__(self, socket_path: str, defaults: PipelineOptions):
+        self.defaults = defaults
+        super().__init__(socket_path, _JobHandler)
+
+
+def serve(socket_path: str, defaults: PipelineOptions) -> None:
+    """
+    预加载模型并在 Unix socket 上持续接收任务
+
+    Args:
+        socket_path: Unix socket 路径
+        defaults: 默认处理选项(预加载的模型由此决定)
+    """
+    # 预热: 加载模型到进程内注册表
+    SpeakerDiarization(hf_token=defaults.hf_token, offline=defaults.offline)
+    create_recognizer(
+        defaults.whisper_model,
+        defaults.asr_backend,
+        quantize=defaults.quantize,
+        compile_model=defaults.compile_model,
+    )
+
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+
+    with WorkerServer(socket_path, defaults) as server:
+        logger.info(f"工作进程已就绪,监听: {socket_path}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            logger.info("工作进程退出")
+        finally:
+            os.unlink(socket_path)
+
+
+def submit_job(job: dict[str, Any], socket_path: str = config.WORKER_SOCKET) -> dict[str, Any]:
+    """
+    向常驻工作进程提交任务并等待结果
+
+    Args:
+        job: 任务字典,参见 run_job
+        socket_path: Unix socket 路径
+
+    Returns:
+        工作进程返回的结果字典,status 为 ok 或 error
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(socket_path)
+        sock.sendall((json.dumps(job, ensure_ascii=False) + "\n").encode("utf-8"))
+        with sock.makefile("rb") as f:
+            return json.loads(f.readline())
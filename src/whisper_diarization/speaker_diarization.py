@@ -4,11 +4,22 @@
 支持离线模式:可从本地加载模型或在线下载
 """
 
+import multiprocessing
+from collections.abc import Iterator
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 from pathlib import Path
+from typing import TYPE_CHECKING, Any, Optional, Union
 
 from . import config
+import numpy as np
 import torch
-from pyannote.audio import Pipeline
+
+from .instrumentation import count, span
+from .model_registry import get_diarization_pipeline
+from .speaker_linking import SpeakerLinker, cluster_speakers
+
+if TYPE_CHECKING:
+    from .audio_processor import AudioSource
 
 
 class SpeakerDiarization:
@@ -24,6 +35,8 @@ class SpeakerDiarization:
             local_model_path: 本地模型路径(离线模式使用)
         """
         self.offline = offline
+        self.hf_token = hf_token
+        self.local_model_path = local_model_path
 
         # 确定模型目录
         if local_model_path:
@@ -54,9 +67,10 @@ class SpeakerDiarization:
 
             try:
                 # 从项目目录加载(不需要 token)
-                self.pipeline = Pipeline.from_pretrained(
+                self.pipeline = get_diarization_pipeline(
                     "pyannote/speaker-diarization-3.1",
-                    use_auth_token=False,  # 离线模式不需要 token
+                    False,  # 离线模式不需要 token
+                    config.DEVICE,
                 )
             except Exception as e:
                 print(f"❌ 从项目目录加载模型失败: {e}")
@@ -85,34 +99,50 @@ class SpeakerDiarization:
             print(f"正在加载说话人分离模型: {config.DIARIZATION_MODEL}")
             print(f"使用设备: {config.DEVICE}")
 
-            # 加载预训练模型
-            self.pipeline = Pipeline.from_pretrained(
-                config.DIARIZATION_MODEL, use_auth_token=self.hf_token
+            # 加载预训练模型(同一进程内复用已加载的 pipeline,并移到指定设备)
+            self.pipeline = get_diarization_pipeline(
+                config.DIARIZATION_MODEL, self.hf_token, config.DEVICE
             )
 
-        # 将模型移到指定设备
-        if config.DEVICE == "cuda":
-            self.pipeline = self.pipeline.to(torch.device("cuda"))
-
         print("✓ 说话人分离模型加载完成!")
 
-    def diarize(self, audio_path: str) -> list[dict]:
+    def diarize(
+        self,
+        audio: Union[str, torch.Tensor],
+        sample_rate: Optional[int] = None,
+        return_embeddings: bool = False,
+    ) -> Union[list[dict], tuple[list[dict], dict[str, np.ndarray]]]:
         """
         执行说话人分离
 
         Args:
-            audio_path: 音频文件路径
+            audio: 音频文件路径,或已由 AudioProcessor 加载的波形 (channel, time)
+            sample_rate: 波形采样率,传入波形时必须提供
+            return_embeddings: 是否同时返回各说话人的中心向量(用于跨文件身份识别)
 
         Returns:
             说话人片段列表,每个片段包含:
             - speaker: 说话人标识
             - start: 开始时间(秒)
             - end: 结束时间(秒)
+            return_embeddings 为 True 时返回 (片段列表, 说话人标签到中心向量的映射)
         """
-        print(f"开始说话人分离: {audio_path}")
+        if isinstance(audio, torch.Tensor):
+            if sample_rate is None:
+                raise ValueError("传入波形时必须提供 sample_rate")
+            print(f"开始说话人分离: 内存波形 ({audio.shape[-1] / sample_rate:.2f}s)")
+            # 直接复用已加载的波形,避免 pyannote 重新解码和重采样
+            audio_input = {"waveform": audio, "sample_rate": sample_rate}
+        else:
+            print(f"开始说话人分离: {audio}")
+            audio_input = audio
 
         # 执行分离
-        diarization = self.pipeline(audio_path)
+        with span("pyannote"):
+            if return_embeddings:
+                diarization, centroids = self.pipeline(audio_input, return_embeddings=True)
+            else:
+                diarization = self.pipeline(audio_input)
 
         # 转换结果为列表格式
         segments = []
@@ -126,9 +156,242 @@ class SpeakerDiarization:
         speakers = {seg["speaker"] for seg in segments}
         print(f"✓ 检测到 {len(speakers)} 个说话人,共 {len(segments)} 个片段")
 
+        if return_embeddings:
+            return segments, dict(zip(diarization.labels(), np.asarray(centroids)))
+        return segments
+
+    def diarize_windows(
+        self,
+        waveform: Union[torch.Tensor, "AudioSource"],
+        sample_rate: int,
+        window: float = None,
+        overlap: float = None,
+    ) -> Iterator[list[dict]]:
+        """
+        按滑动窗口执行说话人分离,逐窗口产出已确定的说话人片段
+
+        相邻窗口重叠 overlap 秒,以重叠区中点为分界,每个窗口只产出分界之间的片段。
+        跨越分界的片段会暂存,与下一窗口中的延续部分合并后再产出。
+        各窗口的局部说话人通过中心向量关联为全局一致的标签。
+
+        Args:
+            waveform: 完整音频波形,或按需读取的音频源
+            sample_rate: 采样率
+            window: 窗口时长(秒),默认 config.PIPELINE_WINDOW
+            overlap: 窗口重叠时长(秒),默认 config.PIPELINE_OVERLAP
+
+        Yields:
+            每个窗口新确定的说话人片段列表(按开始时间排序)
+        """
+        from .audio_processor import AudioProcessor
+
+        window = window or config.PIPELINE_WINDOW
+        overlap = config.PIPELINE_OVERLAP if overlap is None else overlap
+        if overlap >= window:
+            raise ValueError("overlap 必须小于 window")
+
+        processor = AudioProcessor(sample_rate=sample_rate)
+        duration = processor.get_duration(waveform, sample_rate)
+        linker = SpeakerLinker(config.SPEAKER_LINK_THRESHOLD)
+
+        # 跨越窗口分界、等待与下一窗口合并的片段
+        pending: dict[str, dict] = {}
+        boundary = 0.0
+        start = 0.0
+        while boundary < duration:
+            end = min(start + window, duration)
+            is_last = end >= duration
+            next_boundary = duration if is_last else end - overlap / 2
+
+            chunk = processor.extract_segment(waveform, start, end, sample_rate)
+            with span("diarize_window", start=start, end=end):
+                diarization, embeddings = self.pipeline(
+                    {"waveform": chunk, "sample_rate": sample_rate}, return_embeddings=True
+                )
+            count("diarization_windows")
+            mapping = linker.link(list(diarization.labels()), embeddings)
+
+            finalized = []
+            continued: dict[str, dict] = {}
+            for turn, _, label in sorted(
+                diarization.itertracks(yield_label=True), key=lambda t: t[0].start
+            ):
+                turn_start = max(start + turn.start, boundary)
+                turn_end = min(start + turn.end, next_boundary)
+                if turn_end - turn_start <= 0:
+                    continue
+
+                speaker = mapping[label]
+                segment = {"speaker": speaker, "start": turn_start, "end": turn_end}
+
+                # 与上一窗口暂存的同一说话人片段首尾相接时合并
+                previous = pending.pop(speaker, None)
+                if previous is not None and turn_start <= boundary + 1e-3:
+                    previous["end"] = turn_end
+                    segment = previous
+                elif previous is not None:
+                    finalized.append(previous)
+
+                if not is_last and turn_end >= next_boundary - 1e-3:
+                    continued[speaker] = segment
+                else:
+                    finalized.append(segment)
+
+            # 没有延续的暂存片段在本窗口确定
+            finalized.extend(pending.values())
+            pending = continued
+
+            finalized.sort(key=lambda x: x["start"])
+            print(
+                f"窗口 [{start:.1f}s - {end:.1f}s]: 确定 {len(finalized)} 个片段, "
+                f"累计 {linker.num_speakers} 个说话人"
+            )
+            yield finalized
+
+            boundary = next_boundary
+            start = end - overlap
+
+    def diarize_chunked(
+        self,
+        waveform: Union[torch.Tensor, "AudioSource"],
+        sample_rate: int,
+        chunk: float = None,
+        workers: int = 1,
+        threshold: float = None,
+        return_embeddings: bool = False,
+    ) -> Union[list[dict], tuple[list[dict], dict[str, np.ndarray]]]:
+        """
+        长音频分块说话人分离
+
+        按固定时长把音频切成互不重叠的分块,各分块独立执行说话人分离并保留局部说话人的
+        中心向量,最后对全部中心向量做全局聚类,得到整个文件一致的说话人标签。
+        内存占用只与分块时长有关;workers 大于 1 时分块在多个进程中并行处理。
+
+        Args:
+            waveform: 完整音频波形,或按需读取的音频源(分块按需读取)
+            sample_rate: 采样率
+            chunk: 分块时长(秒),默认 config.DIARIZATION_CHUNK
+            workers: 并行处理分块的进程数,每个进程加载一份模型
+            threshold: 全局聚类的余弦相似度阈值,默认 config.SPEAKER_CLUSTER_THRESHOLD
+            return_embeddings: 是否同时返回各全局说话人的中心向量(成员中心向量按时长加权平均)
+
+        Returns:
+            说话人片段列表(按开始时间排序),格式与 diarize 相同
+        """
+        from .audio_processor import AudioProcessor
+
+        chunk = chunk or config.DIARIZATION_CHUNK
+        threshold = config.SPEAKER_CLUSTER_THRESHOLD if threshold is None else threshold
+        processor = AudioProcessor(sample_rate=sample_rate)
+        duration = processor.get_duration(waveform, sample_rate)
+
+        bounds = []
+        start = 0.0
+        while start < duration:
+            bounds.append((start, min(start + chunk, duration)))
+            start += chunk
+        print(f"开始分块说话人分离: {duration:.1f}s, {len(bounds)} 个分块, {workers} 个进程")
+
+        def read(index: int) -> torch.Tensor:
+            return processor.extract_segment(waveform, *bounds[index], sample_rate)
+
+        if workers > 1 and len(bounds) > 1:
+            results = self._diarize_chunks_parallel(read, len(bounds), sample_rate, workers)
+        else:
+            results = []
+            for index, (chunk_start, chunk_end) in enumerate(bounds):
+                with span("diarize_chunk", start=chunk_start, end=chunk_end):
+                    results.append(_diarize_chunk(self.pipeline, read(index), sample_rate))
+                count("diarization_chunks")
+
+        # 全局聚类: 每个分块的每个局部说话人是一个待聚类的中心向量,按说话时长加权
+        keys, embeddings, groups, weights = [], [], [], []
+        for index, (turns, labels, centroids) in enumerate(results):
+            speech = dict.fromkeys(labels, 0.0)
+            for turn_start, turn_end, label in turns:
+                speech[label] += turn_end - turn_start
+            for label, centroid in zip(labels, centroids):
+                keys.append((index, label))
+                embeddings.append(centroid)
+                groups.append(index)
+                weights.append(speech[label])
+        if not keys:
+            # 所有分块都没有说话人(如静音文件)
+            print("✓ 检测到 0 个说话人,共 0 个片段")
+            return ([], {}) if return_embeddings else []
+        with span("cluster_speakers", centroids=len(keys)):
+            clusters = cluster_speakers(
+                np.asarray(embeddings).reshape(len(keys), -1), groups, threshold, weights
+            )
+        mapping = {key: SpeakerLinker.label(c) for key, c in zip(keys, clusters)}
+
+        segments = []
+        for index, (turns, _, _) in enumerate(results):
+            offset = bounds[index][0]
+            for turn_start, turn_end, label in turns:
+                segments.append(
+                    {
+                        "speaker": mapping[(index, label)],
+                        "start": offset + turn_start,
+                        "end": offset + turn_end,
+                    }
+                )
+        segments = _merge_at_boundaries(segments, [b[0] for b in bounds[1:]])
+
+        print(
+            f"✓ 检测到 {len(set(clusters))} 个说话人(分块局部说话人 {len(keys)} 个),"
+            f"共 {len(segments)} 个片段"
+        )
+        if return_embeddings:
+            centroids: dict[str, np.ndarray] = {}
+            for key, embedding, weight in zip(keys, embeddings, weights):
+                vector = np.nan_to_num(np.asarray(embedding, dtype=np.float64))
+                norm = np.linalg.norm(vector)
+                if norm > 0:
+                    speaker = mapping[key]
+                    centroids[speaker] = centroids.get(speaker, 0) + vector / norm * weight
+            return segments, {
+                speaker: vector / (np.linalg.norm(vector) or 1.0)
+                for speaker, vector in centroids.items()
+            }
         return segments
 
-    def get_speaker_statistics(self, segments: list[dict]) -> dict:
+    def _diarize_chunks_parallel(
+        self, read, num_chunks: int, sample_rate: int, workers: int
+    ) -> list[tuple]:
+        """在工作进程中处理分块,同时在途的分块不超过 2 * workers 个以限制内存"""
+        from .resources import available_cores, split_cores
+
+        threads = min(split_cores(available_cores(), workers))
+        options = {
+            "hf_token": self.hf_token,
+            "offline": self.offline,
+            "local_model_path": self.local_model_path,
+        }
+        results: list[Any] = [None] * num_chunks
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_chunk_worker,
+            initargs=(type(self), options, threads),
+        ) as executor:
+            pending: dict = {}
+            next_index = 0
+            while next_index < num_chunks or pending:
+                while next_index < num_chunks and len(pending) < 2 * workers:
+                    future = executor.submit(
+                        _diarize_chunk_in_worker, read(next_index), sample_rate
+                    )
+                    pending[future] = next_index
+                    next_index += 1
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    results[pending.pop(future)] = future.result()
+                    count("diarization_chunks")
+        return results
+
+    @staticmethod
+    def get_speaker_statistics(segments: list[dict]) -> dict:
         """
         获取说话人统计信息
 
@@ -151,3 +414,65 @@ class SpeakerDiarization:
             stats[speaker]["segment_count"] += 1
 
         return stats
+
+
+# 分块之间首尾相接的判定容差(秒),pyannote 的帧分辨率约为 17ms
+_BOUNDARY_TOLERANCE = 0.1
+
+# 工作进程内的说话人分离器,由 _init_chunk_worker 创建
+_worker_diarizer: Optional[SpeakerDiarization] = None
+
+
+def _diarize_chunk(pipeline: Any, chunk: torch.Tensor, sample_rate: int) -> tuple:
+    """
+    对一个分块执行说话人分离
+
+    Returns:
+        (turns, labels, centroids): 片段 (start, end, 局部标签) 列表(相对分块开头)、
+        局部说话人标签和对应的中心向量
+    """
+    diarization, centroids = pipeline(
+        {"waveform": chunk, "sample_rate": sample_rate}, return_embeddings=True
+    )
+    turns = [
+        (turn.start, turn.end, label)
+        for turn, _, label in sorted(
+            diarization.itertracks(yield_label=True), key=lambda t: t[0].start
+        )
+    ]
+    return turns, list(diarization.labels()), np.asarray(centroids)
+
+
+def _init_chunk_worker(cls: type, options: dict, threads: int) -> None:
+    """工作进程初始化: 设置线程数并加载说话人分离模型"""
+    from .resources import configure_threads
+
+    global _worker_diarizer
+    configure_threads(threads)
+    _worker_diarizer = cls(**options)
+
+
+def _diarize_chunk_in_worker(chunk: torch.Tensor, sample_rate: int) -> tuple:
+    """在工作进程中处理一个分块"""
+    return _diarize_chunk(_worker_diarizer.pipeline, chunk, sample_rate)
+
+
+def _merge_at_boundaries(segments: list[dict], boundaries: list[float]) -> list[dict]:
+    """合并在分块边界处被切断的同一说话人片段"""
+    segments = sorted(segments, key=lambda x: (x["start"], x["end"]))
+    absorbed: set[int] = set()
+    for boundary in boundaries:
+        # 边界两侧分别以边界结束、以边界开始的片段
+        before = [
+            s
+            for s in segments
+            if id(s) not in absorbed and abs(s["end"] - boundary) <= _BOUNDARY_TOLERANCE
+        ]
+        after = [s for s in segments if abs(s["start"] - boundary) <= _BOUNDARY_TOLERANCE]
+        for left in before:
+            right = next((s for s in after if s["speaker"] == left["speaker"]), None)
+            if right is not None:
+                left["end"] = right["end"]
+                absorbed.add(id(right))
+                after.remove(right)
+    return [s for s in segments if id(s) not in absorbed]
@@ -0,0 +1,407 @@
+"""
+说话人索引模块
+保存已登记说话人的嵌入向量,按余弦相似度把说话人分离得到的匿名说话人映射为已登记的身份
+
+索引目录包含:
+- embeddings.<n>.npy: 第 n 代 (n, dim) L2 归一化的 float32 矩阵,以内存映射方式读取
+- centroids.<n>.npy: 第 n 代 IVF 分区的中心向量(可选),矩阵按分区顺序存放,每个分区是连续的行
+- index.json: 当前代数、矩阵和分区中心的文件名、每行对应的说话人名称、维度和各分区的起始行
+
+每次保存写入新一代的矩阵文件,最后原子替换 index.json 作为唯一的提交点,
+读取方总是看到同一代的矩阵、名称和分区;保留上一代文件供正在打开索引的读取方使用。
+"""
+
+import json
+import os
+import re
+import tempfile
+from pathlib import Path
+from typing import Any, Optional, Union
+
+import numpy as np
+
+from . import config
+
+INDEX_VERSION = 2
+
+# 按代保存的数据文件名;版本 1 的索引没有代数,视为第 0 代
+_GENERATION_FILE = re.compile(r"(embeddings|centroids)(?:\.(\d+))?\.npy")
+
+# 进程内打开的索引: 目录 -> (index.json 修改时间, 索引)
+_OPEN_INDEXES: dict[Path, tuple[float, "SpeakerIndex"]] = {}
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    """L2 归一化,零向量保持为零"""
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+
+def _atomic_write(path: Path, write) -> None:
+    """先写临时文件再原子替换,避免并发读取到半写入的文件"""
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def spherical_kmeans(
+    vectors: np.ndarray, k: int, iterations: int = 10, seed: int = 0, batch: int = 8192
+) -> np.ndarray:
+    """
+    球面 k-means: 以余弦相似度聚类 L2 归一化的向量
+
+    Args:
+        vectors: (n, dim) 归一化向量
+        k: 簇数
+        iterations: 迭代次数
+        seed: 随机种子
+        batch: 分配步骤每批计算的向量数,限制相似度矩阵的内存
+
+    Returns:
+        (k, dim) 归一化的簇中心
+    """
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), size=k, replace=False)].copy()
+    for _ in range(iterations):
+        assignments = assign_lists(vectors, centroids, batch)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignments, vectors)
+        # 空簇用随机向量重新初始化
+        empty = np.bincount(assignments, minlength=k) == 0
+        sums[empty] = vectors[rng.choice(len(vectors), size=int(empty.sum()))]
+        centroids = _normalize(sums)
+    return centroids
+
+
+def assign_lists(vectors: np.ndarray, centroids: np.ndarray, batch: int = 8192) -> np.ndarray:
+    """把向量分配到最相似的簇中心"""
+    assignments = np.empty(len(vectors), dtype=np.int64)
+    for start in range(0, len(vectors), batch):
+        chunk = np.asarray(vectors[start : start + batch])
+        assignments[start : start + batch] = np.argmax(chunk @ centroids.T, axis=1)
+    return assignments
+
+
+class SpeakerIndex:
+    """
+    已登记说话人的嵌入向量索引
+
+    默认对全部向量做矩阵乘法精确搜索;登记的向量较多时可建立 IVF 分区,
+    搜索时只计算与查询最接近的 nprobe 个分区。
+    """
+
+    def __init__(self, path: Union[str, Path] = None):
+        """
+        打开索引目录,目录不存在时为空索引(首次保存时创建)
+
+        Args:
+            path: 索引目录,默认 config.SPEAKER_INDEX_DIR
+        """
+        self.path = Path(path or config.SPEAKER_INDEX_DIR)
+        self.names: list[str] = []
+        self.embeddings: Optional[np.ndarray] = None
+        self.centroids: Optional[np.ndarray] = None
+        self.offsets: Optional[list[int]] = None
+        self.generation = 0
+
+        manifest = self.path / "index.json"
+        if manifest.exists():
+            meta = json.loads(manifest.read_text(encoding="utf-8"))
+            self.names = meta["names"]
+            self.offsets = meta.get("offsets")
+            self.generation = meta.get("generation", 0)
+            if self.names:
+                embeddings = meta.get("embeddings", "embeddings.npy")
+                self.embeddings = np.load(self.path / embeddings, mmap_mode="r")
+            if self.offsets is not None:
+                self.centroids = np.load(self.path / meta.get("centroids", "centroids.npy"))
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @property
+    def speakers(self) -> list[str]:
+        """已登记的说话人名称(去重,按首次登记的顺序)"""
+        return list(dict.fromkeys(self.names))
+
+    def add(self, name: str, embeddings: np.ndarray) -> None:
+        """
+        登记一个说话人的一个或多个嵌入向量并保存
+
+        Args:
+            name: 说话人名称
+            embeddings: (dim,) 或 (n, dim) 嵌入向量
+        """
+        vectors = np.atleast_2d(np.asarray(embeddings, dtype=np.float32))
+        self.extend([name] * len(vectors), vectors)
+
+    def extend(self, names: list[str], embeddings: np.ndarray) -> None:
+        """
+        批量登记嵌入向量并保存(每次保存都重写矩阵,大量登记时应合并为一次调用)
+
+        已建立 IVF 分区时,新向量分配到现有分区;分区数随规模增长后可调用 build_ivf 重建。
+
+        Args:
+            names: 每个向量对应的说话人名称
+            embeddings: (n, dim) 嵌入向量
+        """
+        vectors = _normalize(np.atleast_2d(np.asarray(embeddings, dtype=np.float32)))
+        if len(names) != len(vectors):
+            raise ValueError(f"名称数 {len(names)} 与向量数 {len(vectors)} 不一致")
+        if not np.all(np.linalg.norm(vectors, axis=1) > 0):
+            raise ValueError("嵌入向量不能为零或 NaN")
+        if self.embeddings is not None and vectors.shape[1] != self.embeddings.shape[1]:
+            raise ValueError(
+                f"嵌入向量维度 {vectors.shape[1]} 与索引维度 {self.embeddings.shape[1]} 不一致"
+            )
+
+        names = self.names + list(names)
+        matrix = vectors if self.embeddings is None else np.concatenate([self.embeddings, vectors])
+        if self.centroids is not None:
+            matrix, names = self._partition(matrix, names, self.centroids)
+        self._save(matrix, names)
+
+    def build_ivf(self, nlist: int = None, iterations: int = 10, sample: int = 50000) -> None:
+        """
+        建立 IVF 分区并按分区顺序重写矩阵
+
+        Args:
+            nlist: 分区数,默认约为 sqrt(n)
+            iterations: k-means 迭代次数
+            sample: 训练簇中心时最多使用的向量数
+        """
+        if not self.names:
+            return
+        matrix = np.asarray(self.embeddings)
+        nlist = min(nlist or max(1, int(np.sqrt(len(matrix)))), len(matrix))
+        rng = np.random.default_rng(0)
+        training = matrix
+        if len(matrix) > sample:
+            training = matrix[np.sort(rng.choice(len(matrix), size=sample, replace=False))]
+        centroids = spherical_kmeans(training, nlist, iterations)
+        matrix, names = self._partition(matrix, self.names, centroids)
+        self.centroids = centroids
+        self._save(matrix, names)
+
+    def _partition(
+        self, matrix: np.ndarray, names: list[str], centroids: np.ndarray
+    ) -> tuple[np.ndarray, list[str]]:
+        """按分区重排矩阵,记录各分区的起始行"""
+        assignments = assign_lists(matrix, centroids)
+        order = np.argsort(assignments, kind="stable")
+        counts = np.bincount(assignments, minlength=len(centroids))
+        self.offsets = [0, *np.cumsum(counts).tolist()]
+        return matrix[order], [names[i] for i in order]
+
+    def _save(self, matrix: np.ndarray, names: list[str]) -> None:
+        """
+        写入新一代的矩阵和分区中心,再原子替换清单提交,最后以内存映射方式重新打开
+
+        清单替换之前的中断只会留下未被引用的数据文件,不影响当前的索引。
+        """
+        self.path.mkdir(parents=True, exist_ok=True)
+        generation = self.generation + 1
+        embeddings = f"embeddings.{generation}.npy"
+        _atomic_write(self.path / embeddings, lambda f: np.save(f, matrix))
+        meta = {
+            "version": INDEX_VERSION,
+            "generation": generation,
+            "dim": int(matrix.shape[1]),
+            "names": names,
+            "embeddings": embeddings,
+            "centroids": None,
+            "offsets": None,
+        }
+        if self.centroids is not None:
+            meta["centroids"] = f"centroids.{generation}.npy"
+            meta["offsets"] = self.offsets
+            _atomic_write(self.path / meta["centroids"], lambda f: np.save(f, self.centroids))
+        _atomic_write(
+            self.path / "index.json",
+            lambda f: f.write(json.dumps(meta, ensure_ascii=False).encode("utf-8")),
+        )
+        self.generation = generation
+        self.names = names
+        self.embeddings = np.load(self.path / embeddings, mmap_mode="r")
+        self._remove_stale_generations()
+
+    def _remove_stale_generations(self) -> None:
+        """删除上一代之前的数据文件(上一代可能仍在被刚读取旧清单的读取方打开)"""
+        for path in self.path.iterdir():
+            match = _GENERATION_FILE.fullmatch(path.name)
+            if match and int(match.group(2) or 0) < self.generation - 1:
+                path.unlink(missing_ok=True)
+
+    def search(self, queries: np.ndarray, k: int = 5, nprobe: int = None) -> list[list[tuple]]:
+        """
+        查询与每个向量最相似的已登记说话人
+
+        Args:
+            queries: (dim,) 或 (q, dim) 查询向量
+            k: 每个查询最多返回的说话人数(同一说话人只返回最高分)
+            nprobe: IVF 分区的搜索数,默认 config.SPEAKER_INDEX_NPROBE;没有分区时精确搜索
+
+        Returns:
+            每个查询的 [(说话人名称, 余弦相似度), ...],按相似度降序
+        """
+        queries = _normalize(np.atleast_2d(np.nan_to_num(np.asarray(queries, dtype=np.float32))))
+        if not self.names:
+            return [[] for _ in queries]
+
+        results = []
+        if self.centroids is None:
+            scores = queries @ self.embeddings.T
+            for row in scores:
+                results.append(self._top(row, np.arange(len(row)), k))
+            return results
+
+        nprobe = min(nprobe or config.SPEAKER_INDEX_NPROBE, len(self.centroids))
+        lists = np.argsort(-(queries @ self.centroids.T), axis=1)[:, :nprobe]
+        for query, probe in zip(queries, lists):
+            # 每个分区在矩阵中是连续的行,直接对切片做矩阵乘法
+            rows, scores = [], []
+            for j in probe:
+                start, end = self.offsets[j], self.offsets[j + 1]
+                if end > start:
+                    rows.append(np.arange(start, end))
+                    scores.append(self.embeddings[start:end] @ query)
+            if not rows:
+                results.append([])
+                continue
+            results.append(self._top(np.concatenate(scores), np.concatenate(rows), k))
+        return results
+
+    def _top(self, scores: np.ndarray, rows: np.ndarray, k: int) -> list[tuple]:
+        """取分数最高的 k 个不同说话人"""
+        # 同一说话人可能有多个向量,多取一些候选后去重
+        candidates = min(len(scores), k * 4)
+        top = np.argpartition(-scores, candidates - 1)[:candidates]
+        top = top[np.argsort(-scores[top])]
+        best: dict[str, float] = {}
+        for i in top:
+            best.setdefault(self.names[rows[i]], float(scores[i]))
+            if len(best) >= k:
+                break
+        return list(best.items())
+
+    def identify(
+        self, embeddings: dict[str, np.ndarray], threshold: float = None, nprobe: int = None
+    ) -> dict[str, tuple[str, float]]:
+        """
+        把一个文件中的匿名说话人映射为已登记的身份
+
+        同一文件中的不同匿名说话人不会映射到同一个身份(按相似度从高到低贪心匹配)。
+
+        Args:
+            embeddings: 匿名说话人标签到中心向量的映射
+            threshold: 余弦相似度阈值,默认 config.SPEAKER_ID_THRESHOLD
+            nprobe: IVF 分区的搜索数
+
+        Returns:
+            匹配成功的匿名标签到 (身份, 相似度) 的映射
+        """
+        threshold = config.SPEAKER_ID_THRESHOLD if threshold is None else threshold
+        labels = list(embeddings)
+        if not labels or not self.names:
+            return {}
+        matches = self.search(np.stack([embeddings[label] for label in labels]), nprobe=nprobe)
+
+        pairs = sorted(
+            (
+                (score, label, name)
+                for label, found in zip(labels, matches)
+                for name, score in found
+            ),
+            reverse=True,
+        )
+        mapping: dict[str, tuple[str, float]] = {}
+        used: set[str] = set()
+        for score, label, name in pairs:
+            if score < threshold:
+                break
+            if label in mapping or name in used:
+                continue
+            mapping[label] = (name, score)
+            used.add(name)
+        return mapping
+
+
+def open_index(path: Union[str, Path] = None) -> SpeakerIndex:
+    """
+    获取进程内复用的说话人索引,索引文件在其他进程中更新(如新登记说话人)后重新打开
+
+    Args:
+        path: 索引目录,默认 config.SPEAKER_INDEX_DIR
+
+    Returns:
+        说话人索引
+    """
+    path = Path(path or config.SPEAKER_INDEX_DIR).resolve()
+    manifest = path / "index.json"
+    mtime = manifest.stat().st_mtime_ns if manifest.exists() else 0
+    cached = _OPEN_INDEXES.get(path)
+    if cached is None or cached[0] != mtime:
+        cached = _OPEN_INDEXES[path] = (mtime, SpeakerIndex(path))
+    return cached[1]
+
+
+def dominant_embedding(segments: list[dict], embeddings: dict[str, Any]) -> np.ndarray:
+    """
+    取说话总时长最长的说话人的中心向量,用于从一段录音登记说话人
+
+    Args:
+        segments: 说话人分离得到的片段列表
+        embeddings: 说话人标签到中心向量的映射
+
+    Returns:
+        中心向量
+    """
+    speech: dict[str, float] = {}
+    for segment in segments:
+        if segment["speaker"] in embeddings:
+            speech[segment["speaker"]] = (
+                speech.get(segment["speaker"], 0.0) + segment["end"] - segment["start"]
+            )
+    if not speech:
+        raise ValueError("录音中没有检测到说话人")
+    return np.asarray(embeddings[max(speech, key=speech.get)], dtype=np.float32)
+
+
+def identify_speakers(
+    segments: list[dict],
+    embeddings: dict[str, Any],
+    index: SpeakerIndex,
+    threshold: float = None,
+) -> tuple[list[dict], dict[str, dict]]:
+    """
+    说话人分离后的身份识别: 把匹配成功的匿名说话人替换为登记的名称
+
+    Args:
+        segments: 说话人分离得到的片段列表
+        embeddings: 匿名说话人标签到中心向量的映射
+        index: 说话人索引
+        threshold: 余弦相似度阈值,默认 config.SPEAKER_ID_THRESHOLD
+
+    Returns:
+        (替换标签后的片段列表, 匿名标签到 {"name", "score"} 的映射)
+    """
+    valid = {
+        label: np.asarray(vector, dtype=np.float32)
+        for label, vector in embeddings.items()
+        if np.linalg.norm(np.nan_to_num(np.asarray(vector, dtype=np.float32))) > 0
+    }
+    mapping = index.identify(valid, threshold)
+    identities = {label: {"name": name, "score": score} for label, (name, score) in mapping.items()}
+    renamed = [
+        {**segment, "speaker": mapping[segment["speaker"]][0]}
+        if segment["speaker"] in mapping
+        else segment
+        for segment in segments
+    ]
+    return renamed, identities
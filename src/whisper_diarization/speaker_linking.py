@@ -0,0 +1,165 @@
+"""
+说话人关联模块
+分窗口做说话人分离时,各窗口的说话人标签相互独立,
+这里根据说话人中心向量把窗口内的局部标签映射为全局一致的标签:
+在线逐窗口关联 (SpeakerLinker),或对全部分块的中心向量做全局聚类 (cluster_speakers)
+"""
+
+from typing import Optional
+
+import numpy as np
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    """L2 归一化,零向量保持为零"""
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+
+class SpeakerLinker:
+    """在线说话人关联器"""
+
+    def __init__(self, threshold: float = 0.5):
+        """
+        初始化说话人关联器
+
+        Args:
+            threshold: 余弦相似度阈值,低于该值视为新说话人
+        """
+        self.threshold = threshold
+        self._centroids: list[np.ndarray] = []
+        self._counts: list[int] = []
+
+    @property
+    def num_speakers(self) -> int:
+        """已发现的全局说话人数量"""
+        return len(self._centroids)
+
+    @staticmethod
+    def label(index: int) -> str:
+        """全局说话人标签"""
+        return f"SPEAKER_{index:02d}"
+
+    def link(self, labels: list[str], embeddings: np.ndarray) -> dict[str, str]:
+        """
+        把一个窗口的局部说话人映射到全局说话人
+
+        同一窗口内的不同局部说话人不会映射到同一个全局说话人。
+        匹配成功的全局中心向量按出现次数滑动平均更新。
+
+        Args:
+            labels: 窗口内的局部说话人标签
+            embeddings: (len(labels), dim) 与 labels 对应的中心向量
+
+        Returns:
+            局部标签到全局标签的映射
+        """
+        mapping: dict[str, str] = {}
+        if not labels:
+            return mapping
+
+        local = _normalize(np.nan_to_num(np.asarray(embeddings, dtype=np.float32)))
+        valid = np.linalg.norm(local, axis=1) > 0
+
+        if self._centroids:
+            similarity = local @ _normalize(np.stack(self._centroids)).T
+            similarity[~valid] = -np.inf
+        else:
+            similarity = np.full((len(labels), 0), -np.inf)
+
+        # 贪心匹配: 每次取相似度最高的 (局部, 全局) 对
+        used_local: set[int] = set()
+        used_global: set[int] = set()
+        for flat in np.argsort(-similarity, axis=None):
+            i, j = np.unravel_index(flat, similarity.shape)
+            if similarity[i, j] < self.threshold:
+                break
+            if i in used_local or j in used_global:
+                continue
+            used_local.add(int(i))
+            used_global.add(int(j))
+            mapping[labels[i]] = self.label(int(j))
+            self._update(int(j), local[i])
+
+        # 未匹配的局部说话人注册为新的全局说话人
+        for i, label in enumerate(labels):
+            if i not in used_local:
+                self._centroids.append(local[i].copy())
+                self._counts.append(1 if valid[i] else 0)
+                mapping[label] = self.label(len(self._centroids) - 1)
+
+        return mapping
+
+    def _update(self, index: int, embedding: np.ndarray) -> None:
+        """用新的中心向量更新全局中心向量"""
+        count = self._counts[index]
+        self._centroids[index] = (self._centroids[index] * count + embedding) / (count + 1)
+        self._counts[index] = count + 1
+
+
+def cluster_speakers(
+    embeddings: np.ndarray,
+    groups: list[int],
+    threshold: float = 0.5,
+    weights: Optional[list[float]] = None,
+) -> list[int]:
+    """
+    对各分块的说话人中心向量做全局凝聚聚类
+
+    每次合并中心向量余弦相似度最高的两个簇,直到最高相似度低于阈值。
+    同一分块内的说话人已由 pyannote 判定为不同的人,不会被合并到同一个簇;
+    无效(零或 NaN)的中心向量各自单独成簇。
+
+    Args:
+        embeddings: (n, dim) 中心向量
+        groups: 每个中心向量所属的分块编号
+        threshold: 余弦相似度阈值,低于该值的簇不再合并
+        weights: 每个中心向量的权重(如说话时长),用于计算簇中心,默认相同
+
+    Returns:
+        每个中心向量的全局说话人编号,按首次出现的顺序从 0 编号
+    """
+    n = len(groups)
+    if n == 0:
+        return []
+    vectors = _normalize(np.nan_to_num(np.asarray(embeddings, dtype=np.float64).reshape(n, -1)))
+    valid = np.linalg.norm(vectors, axis=1) > 0
+    weights = np.ones(n) if weights is None else np.asarray(weights, dtype=np.float64)
+
+    # 簇的加权向量和、包含的分块和成员;合并后的簇占用编号较小的位置
+    sums = vectors * weights[:, None]
+    cluster_groups = [{g} for g in groups]
+    members = [[i] for i in range(n)]
+    active = valid.copy()
+
+    group_ids = np.asarray(groups)
+    similarity = vectors @ vectors.T
+    similarity[np.equal.outer(group_ids, group_ids) | ~np.outer(active, active)] = -np.inf
+
+    while True:
+        flat = int(np.argmax(similarity))
+        i, j = divmod(flat, n)
+        if similarity[i, j] < threshold:
+            break
+        i, j = min(i, j), max(i, j)
+        sums[i] += sums[j]
+        cluster_groups[i] |= cluster_groups[j]
+        members[i].extend(members[j])
+        active[j] = False
+        similarity[j, :] = -np.inf
+        similarity[:, j] = -np.inf
+
+        # 更新合并后的簇与其他簇的相似度,含有相同分块的簇之间不能合并
+        row = _normalize(sums) @ _normalize(sums[i])
+        for k in range(n):
+            if k == i or not active[k] or cluster_groups[i] & cluster_groups[k]:
+                row[k] = -np.inf
+        similarity[i, :] = row
+        similarity[:, i] = row
+
+    labels = [0] * n
+    clusters = sorted((sorted(m) for k, m in enumerate(members) if active[k] or not valid[k]))
+    for label, cluster in enumerate(clusters):
+        for index in cluster:
+            labels[index] = label
+    return labels
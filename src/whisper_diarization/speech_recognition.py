@@ -3,31 +3,150 @@
 使用 OpenAI Whisper 进行中文语音识别
 """
 
+from typing import Callable, Optional
+
 from . import config
 import torch
 import whisper
 
+from .instrumentation import count, span
+from .mel_cache import MelCache
+from .model_registry import get_faster_whisper_model, get_whisper_model
+
+
+# 与 whisper.transcribe 默认值一致的温度回退参数
+FALLBACK_TEMPERATURES = (0.0, 0.2, 0.4, 0.6, 0.8, 1.0)
+COMPRESSION_RATIO_THRESHOLD = 2.4
+LOGPROB_THRESHOLD = -1.0
+NO_SPEECH_THRESHOLD = 0.6
+
+
+def _is_silence(result) -> bool:
+    """判断解码结果是否为静音: 无语音概率高且平均对数概率低,此时输出空文本"""
+    return result.no_speech_prob > NO_SPEECH_THRESHOLD and result.avg_logprob < LOGPROB_THRESHOLD
+
+
+def _needs_fallback(result) -> bool:
+    """
+    判断解码结果是否需要用更高温度重新解码,判定为静音的结果不回退
+
+    与 openai-whisper 20240927 起的 transcribe 一致(更早的版本只看 no_speech_prob):
+    静音判定同时要求平均对数概率低,与输出空文本的条件相同。无语音概率高但解码置信的结果
+    只在压缩比过高(重复输出)时回退,因为这种结果的文本会被保留,不回退就会输出重复的幻觉文本;
+    其余置信的结果本来就不满足回退条件,不会额外解码。
+    """
+    if _is_silence(result):
+        return False
+    return (
+        result.compression_ratio > COMPRESSION_RATIO_THRESHOLD
+        or result.avg_logprob < LOGPROB_THRESHOLD
+    )
+
+
+def _as_audio(audio_input):
+    """把 (1, samples) 张量视图压成一维,不复制数据;其他输入原样返回"""
+    if isinstance(audio_input, torch.Tensor):
+        return audio_input.reshape(-1) if audio_input.dim() > 1 else audio_input
+    return audio_input
+
+
+def log_mel_batch(audio: torch.Tensor, n_mels: int = 80) -> torch.Tensor:
+    """
+    对一批等长音频计算 log-mel 频谱
+
+    与 whisper.log_mel_spectrogram 逐条计算的结果一致(动态范围按每条音频各自的最大值裁剪),
+    但整个批次只做一次 STFT 和一次矩阵乘法。
+
+    Args:
+        audio: (batch, samples) 的 16kHz 音频
+        n_mels: mel 频带数
+
+    Returns:
+        (batch, n_mels, frames) 的 log-mel 频谱
+    """
+    window = torch.hann_window(whisper.audio.N_FFT, device=audio.device)
+    stft = torch.stft(
+        audio, whisper.audio.N_FFT, whisper.audio.HOP_LENGTH, window=window, return_complex=True
+    )
+    magnitudes = stft[..., :-1].abs() ** 2
+
+    filters = whisper.audio.mel_filters(audio.device, n_mels)
+    mel_spec = filters @ magnitudes
+
+    log_spec = torch.clamp(mel_spec, min=1e-10).log10()
+    log_spec = torch.maximum(log_spec, log_spec.amax(dim=(-2, -1), keepdim=True) - 8.0)
+    return (log_spec + 4.0) / 4.0
+
+
+class _OrderedEmitter:
+    """按片段顺序回调已完成的识别结果,先完成的后续片段暂存到前面的片段完成为止"""
+
+    def __init__(self, segments: list, callback: Optional[Callable[[dict], None]]):
+        self.segments = segments
+        self.callback = callback
+        self._done: dict[int, str] = {}
+        self._next = 0
+
+    def done(self, index: int, text: str) -> None:
+        """标记第 index 个片段已完成"""
+        if self.callback is None:
+            return
+        self._done[index] = text
+        while self._next in self._done:
+            self.callback({**self.segments[self._next], "text": self._done.pop(self._next)})
+            self._next += 1
+
 
 class SpeechRecognition:
-    """语音识别器"""
+    """语音识别器 (openai-whisper 后端)"""
+
+    backend = "whisper"
 
-    def __init__(self, model_name: str = None):
+    def __init__(self, model_name: str = None, quantize: bool = None, compile_model: bool = None):
         """
         初始化语音识别器
 
         Args:
             model_name: Whisper 模型名称 (tiny, base, small, medium, large)
+            quantize: 是否对 Linear 层做动态 int8 量化(仅 CPU),默认 config.WHISPER_QUANTIZE
+            compile_model: 是否用 torch.compile 编译编码器,默认 config.WHISPER_COMPILE
         """
         self.model_name = model_name or config.WHISPER_MODEL
+        self.quantize = config.WHISPER_QUANTIZE if quantize is None else quantize
+        self.compile_model = config.WHISPER_COMPILE if compile_model is None else compile_model
 
         print(f"正在加载 Whisper 模型: {self.model_name}")
         print(f"使用设备: {config.DEVICE}")
 
-        # 加载模型
-        self.model = whisper.load_model(self.model_name, device=config.DEVICE)
+        # 加载模型(同一进程内复用已加载的模型)
+        self.model = get_whisper_model(
+            self.model_name,
+            config.DEVICE,
+            quantize=self.quantize,
+            compile_model=self.compile_model,
+        )
 
         print("Whisper 模型加载完成!")
 
+    @staticmethod
+    def _default_prompt(language: str, initial_prompt: str = None) -> str:
+        """返回初始提示,中文默认引导输出简体中文"""
+        if initial_prompt is None and language == "zh":
+            return "以下是普通话的句子。"
+        return initial_prompt
+
+    def create_mel_cache(self, waveform: torch.Tensor) -> MelCache:
+        """
+        为完整波形创建 log-mel 频谱缓存,传给 transcribe_segments 后各片段直接切片使用
+
+        Args:
+            waveform: (1, samples) 的 16kHz 完整波形
+
+        Returns:
+            与模型 mel 频带数一致的 MelCache
+        """
+        return MelCache(waveform, n_mels=self.model.dims.n_mels)
+
     def transcribe(self, audio_input, language: str = None, initial_prompt: str = None) -> str:
         """
         转录音频为文字
@@ -45,13 +164,11 @@ class SpeechRecognition:
         """
         language = language or config.WHISPER_LANGUAGE
 
-        # 如果是 torch.Tensor,转换为 numpy array
-        if isinstance(audio_input, torch.Tensor):
-            audio_input = audio_input.squeeze().cpu().numpy()
+        # torch.Tensor 直接交给 Whisper,不经过 numpy 转换
+        audio_input = _as_audio(audio_input)
 
         # 设置中文简体提示
-        if initial_prompt is None and language == "zh":
-            initial_prompt = "以下是普通话的句子。"  # 引导输出简体中文
+        initial_prompt = self._default_prompt(language, initial_prompt)
 
         # 执行转录
         result = self.model.transcribe(
@@ -60,40 +177,595 @@ class SpeechRecognition:
 
         return result["text"].strip()
 
-    def transcribe_segments(self, waveform: torch.Tensor, segments: list, sample_rate: int) -> list:
+    def transcribe_words(
+        self, audio_input, language: str = None, initial_prompt: str = None
+    ) -> list[dict]:
+        """
+        转录音频并返回词级时间戳
+
+        Args:
+            audio_input: 音频输入 (numpy array 或 torch.Tensor)
+            language: 语言代码,默认为中文 "zh"
+            initial_prompt: 初始提示,用于引导模型输出简体中文
+
+        Returns:
+            词列表,每个词包含 word、start、end(相对音频开头,秒)
+        """
+        language = language or config.WHISPER_LANGUAGE
+        audio_input = _as_audio(audio_input)
+
+        initial_prompt = self._default_prompt(language, initial_prompt)
+
+        result = self.model.transcribe(
+            audio_input,
+            language=language,
+            initial_prompt=initial_prompt,
+            word_timestamps=True,
+            verbose=False,
+        )
+
+        return [word for segment in result["segments"] for word in segment.get("words", [])]
+
+    def transcribe_batch(
+        self,
+        audio_inputs: list,
+        language: str = None,
+        initial_prompt: str = None,
+        temperatures: tuple = (0.0,),
+    ) -> list[str]:
+        """
+        批量转录多个不超过 30 秒的音频片段
+
+        每个片段补齐到 Whisper 的 30 秒窗口后堆叠成一个 mel 批次,
+        编码器和解码器对整个批次只做一次前向计算。
+        默认只使用贪心解码,给出多个温度时按 transcribe_mels 的规则回退。
+
+        Args:
+            audio_inputs: 音频片段列表 (numpy array 或 torch.Tensor)
+            language: 语言代码,默认为中文 "zh"
+            initial_prompt: 初始提示,用于引导模型输出简体中文
+            temperatures: 依次尝试的解码温度
+
+        Returns:
+            与输入顺序一致的识别文本列表
+        """
+        if not audio_inputs:
+            return []
+
+        language = language or config.WHISPER_LANGUAGE
+        initial_prompt = self._default_prompt(language, initial_prompt)
+
+        # 各片段(通常是完整波形的视图)直接拷入预分配的 30 秒批次缓冲区,
+        # 补零部分即缓冲区的初始值,然后对整个批次计算一次 log-mel 频谱
+        with span("mel", batch=len(audio_inputs)):
+            batch = torch.zeros(
+                len(audio_inputs), whisper.audio.N_SAMPLES, device=self.model.device
+            )
+            for row, audio in zip(batch, audio_inputs):
+                audio = _as_audio(audio)
+                if not isinstance(audio, torch.Tensor):
+                    audio = torch.from_numpy(audio)
+                audio = audio[: whisper.audio.N_SAMPLES]
+                row[: audio.shape[0]].copy_(audio)
+            mel = log_mel_batch(batch, n_mels=self.model.dims.n_mels)
+
+        return self.transcribe_mels(mel, language, initial_prompt, temperatures)
+
+    def transcribe_mels(
+        self,
+        mels: torch.Tensor,
+        language: str = None,
+        initial_prompt: str = None,
+        temperatures: tuple = (0.0,),
+    ) -> list[str]:
+        """
+        转录预先计算好的 30 秒 log-mel 频谱批次
+
+        编码器对整个批次只运行一次。给出多个温度时,与 whisper.transcribe 一样,
+        压缩比过高或平均对数概率过低的结果会用下一个温度重新解码,只重解码未通过的片段。
+
+        Args:
+            mels: (batch, n_mels, 3000) 的 log-mel 频谱,如 MelCache.segment 的结果
+            language: 语言代码,默认为中文 "zh"
+            initial_prompt: 初始提示,用于引导模型输出简体中文
+            temperatures: 依次尝试的解码温度,默认只做贪心解码
+
+        Returns:
+            与输入顺序一致的识别文本列表
+        """
+        if len(mels) == 0:
+            return []
+
+        language = language or config.WHISPER_LANGUAGE
+        initial_prompt = self._default_prompt(language, initial_prompt)
+
+        fp16 = self.model.device.type == "cuda"
+        mels = mels.to(self.model.device)
+
+        # 先单独运行编码器,whisper.decode 接收编码结果时会跳过编码
+        with span("encode", batch=len(mels)), torch.no_grad():
+            audio_features = self.model.embed_audio(mels.half() if fp16 else mels)
+
+        decoded: list = [None] * len(mels)
+        pending = list(range(len(mels)))
+        for temperature in temperatures:
+            options = whisper.DecodingOptions(
+                language=language,
+                prompt=initial_prompt,
+                without_timestamps=True,
+                fp16=fp16,
+                temperature=temperature,
+            )
+            with span("decode", batch=len(pending), temperature=temperature):
+                results = whisper.decode(self.model, audio_features[pending], options)
+
+            retry = []
+            for i, result in zip(pending, results):
+                decoded[i] = result
+                if _needs_fallback(result):
+                    retry.append(i)
+            pending = retry
+            if not pending:
+                break
+
+        texts = []
+        for result in decoded:
+            # 与 whisper.transcribe 一致: 判定为静音的片段输出空文本
+            if _is_silence(result):
+                texts.append("")
+            else:
+                texts.append(result.text.strip())
+        return texts
+
+    def transcribe_segments(
+        self,
+        waveform: torch.Tensor,
+        segments: list,
+        sample_rate: int,
+        batch_size: int = 1,
+        merge_gap: Optional[float] = None,
+        mel_cache: Optional[MelCache] = None,
+        on_segment: Optional[Callable[[dict], None]] = None,
+    ) -> list:
         """
         对多个音频片段进行转录
 
         Args:
-            waveform: 完整音频波形
+            waveform: 完整音频波形,或 AudioProcessor.open_audio 返回的按需读取音频源
             segments: 片段列表,每个片段包含 start 和 end 时间
             sample_rate: 采样率
+            batch_size: 批量解码大小,大于 1 时将不超过 30 秒的片段打包批量解码
+            merge_gap: 合并同一说话人相邻片段的最大间隔(秒),None 表示不合并
+            mel_cache: 整个文件的 log-mel 缓存,不超过 30 秒的片段直接切片使用,
+                不再逐片段计算 STFT;None 表示逐片段计算
+            on_segment: 每个片段识别完成时以结果调用,按片段顺序回调,用于增量输出
 
         Returns:
             带有转录文本的片段列表
         """
         from .audio_processor import AudioProcessor
 
+        if merge_gap is not None:
+            return self._transcribe_segments_merged(
+                waveform, segments, sample_rate, batch_size, merge_gap, mel_cache, on_segment
+            )
+
+        if batch_size > 1:
+            return self._transcribe_segments_batched(
+                waveform, segments, sample_rate, batch_size, mel_cache, on_segment
+            )
+
         processor = AudioProcessor(sample_rate=sample_rate)
         results = []
 
         total = len(segments)
         for i, segment in enumerate(segments, 1):
             print(f"正在转录片段 {i}/{total} ({segment['speaker']})")
+            duration = segment["end"] - segment["start"]
 
-            # 提取音频片段
-            audio_segment = processor.extract_segment(
-                waveform, segment["start"], segment["end"], sample_rate
-            )
+            if mel_cache is not None and duration <= whisper.audio.CHUNK_LENGTH:
+                # 从整个文件的 mel 缓存切片,按 whisper.transcribe 的温度回退解码
+                with span("mel_slice", segment=i - 1):
+                    mel = mel_cache.segment(segment["start"], segment["end"])
+                with span(
+                    "transcribe_segment",
+                    segment=i - 1,
+                    speaker=segment["speaker"],
+                    duration=duration,
+                ):
+                    (text,) = self.transcribe_mels(mel[None], temperatures=FALLBACK_TEMPERATURES)
+            else:
+                # 提取音频片段
+                with span("extract", segment=i - 1):
+                    audio_segment = processor.extract_segment(
+                        waveform, segment["start"], segment["end"], sample_rate
+                    )
 
-            # 转录
-            text = self.transcribe(audio_segment)
+                # 转录
+                with span(
+                    "transcribe_segment",
+                    segment=i - 1,
+                    speaker=segment["speaker"],
+                    duration=duration,
+                ):
+                    text = self.transcribe(audio_segment)
+            count("segments_transcribed")
+            count("audio_seconds_transcribed", segment["end"] - segment["start"])
 
             # 添加转录结果
             result = segment.copy()
             result["text"] = text
             results.append(result)
+            if on_segment is not None:
+                on_segment(result)
+
+            print(f"  [{segment['start']:.2f}s - {segment['end']:.2f}s] {text}")
+
+        return results
 
+    def _transcribe_segments_batched(
+        self,
+        waveform: torch.Tensor,
+        segments: list,
+        sample_rate: int,
+        batch_size: int,
+        mel_cache: Optional[MelCache] = None,
+        on_segment: Optional[Callable[[dict], None]] = None,
+    ) -> list:
+        """批量模式: 短片段按 batch_size 打包解码,超过 30 秒的片段逐个转录"""
+        from .audio_processor import AudioProcessor
+
+        processor = AudioProcessor(sample_rate=sample_rate)
+        texts: list[str] = [""] * len(segments)
+        emitter = _OrderedEmitter(segments, on_segment)
+
+        short, long = [], []
+        for i, segment in enumerate(segments):
+            if segment["end"] - segment["start"] <= whisper.audio.CHUNK_LENGTH:
+                short.append(i)
+            else:
+                long.append(i)
+
+        total = len(segments)
+        for offset in range(0, len(short), batch_size):
+            batch = short[offset : offset + batch_size]
+            print(f"正在批量转录片段 {offset + 1}-{offset + len(batch)}/{len(short)}")
+            if mel_cache is not None:
+                with span("mel_slice", segments=batch):
+                    mels = torch.stack(
+                        [mel_cache.segment(segments[i]["start"], segments[i]["end"]) for i in batch]
+                    )
+                with span("transcribe_batch", segments=batch):
+                    batch_texts = self.transcribe_mels(mels)
+            else:
+                with span("extract", segments=batch):
+                    audio_segments = [
+                        processor.extract_segment(
+                            waveform, segments[i]["start"], segments[i]["end"], sample_rate
+                        )
+                        for i in batch
+                    ]
+                with span("transcribe_batch", segments=batch):
+                    batch_texts = self.transcribe_batch(audio_segments)
+            for i, text in zip(batch, batch_texts):
+                texts[i] = text
+                emitter.done(i, text)
+            count("segments_transcribed", len(batch))
+            count("batches_decoded")
+
+        for n, i in enumerate(long, 1):
+            segment = segments[i]
+            print(f"正在转录长片段 {n}/{len(long)} ({segment['speaker']})")
+            with span("extract", segment=i):
+                audio_segment = processor.extract_segment(
+                    waveform, segment["start"], segment["end"], sample_rate
+                )
+            with span(
+                "transcribe_segment",
+                segment=i,
+                speaker=segment["speaker"],
+                duration=segment["end"] - segment["start"],
+            ):
+                texts[i] = self.transcribe(audio_segment)
+            emitter.done(i, texts[i])
+            count("segments_transcribed")
+
+        results = []
+        for segment, text in zip(segments, texts):
+            result = segment.copy()
+            result["text"] = text
+            results.append(result)
             print(f"  [{segment['start']:.2f}s - {segment['end']:.2f}s] {text}")
 
+        print(f"✓ 共转录 {total} 个片段 (批量 {len(short)} 个, 逐个 {len(long)} 个)")
         return results
+
+    def _transcribe_segments_merged(
+        self,
+        waveform: torch.Tensor,
+        segments: list,
+        sample_rate: int,
+        batch_size: int,
+        merge_gap: float,
+        mel_cache: Optional[MelCache] = None,
+        on_segment: Optional[Callable[[dict], None]] = None,
+    ) -> list:
+        """合并模式: 同一说话人的相邻片段打包到 30 秒窗口内识别,再按词级时间戳拆回"""
+        from .audio_processor import AudioProcessor
+        from .segment_merger import merge_segments, split_words
+
+        processor = AudioProcessor(sample_rate=sample_rate)
+        groups = merge_segments(segments, merge_gap, whisper.audio.CHUNK_LENGTH)
+        print(f"片段合并: {len(segments)} 个片段合并为 {len(groups)} 组")
+
+        texts: list[str] = [""] * len(segments)
+        emitter = _OrderedEmitter(segments, on_segment)
+
+        # 未发生合并的片段沿用普通(或批量)转录流程,内层按 singles 的顺序回调
+        singles = [group["members"][0] for group in groups if len(group["members"]) == 1]
+        pending_singles = iter(singles)
+        single_results = self.transcribe_segments(
+            waveform,
+            [segments[i] for i in singles],
+            sample_rate,
+            batch_size=batch_size,
+            mel_cache=mel_cache,
+            on_segment=lambda result: emitter.done(next(pending_singles), result["text"]),
+        )
+        for i, result in zip(singles, single_results):
+            texts[i] = result["text"]
+
+        merged = [group for group in groups if len(group["members"]) > 1]
+        for n, group in enumerate(merged, 1):
+            members = [segments[i] for i in group["members"]]
+            print(f"正在转录合并片段 {n}/{len(merged)} ({group['speaker']}, {len(members)} 个片段)")
+
+            with span("extract", segments=group["members"]):
+                audio_segment = processor.extract_segment(
+                    waveform, group["start"], group["end"], sample_rate
+                )
+            with span(
+                "transcribe_merged",
+                segments=group["members"],
+                speaker=group["speaker"],
+                duration=group["end"] - group["start"],
+            ):
+                words = self.transcribe_words(audio_segment)
+            count("segments_transcribed", len(members))
+            count("merged_groups_decoded")
+
+            for i, text in zip(group["members"], split_words(words, members, group["start"])):
+                texts[i] = text
+                emitter.done(i, text)
+
+        results = []
+        for segment, text in zip(segments, texts):
+            result = segment.copy()
+            result["text"] = text
+            results.append(result)
+
+        return results
+
+    def transcribe_aligned(
+        self,
+        waveform,
+        segments: list,
+        sample_rate: int,
+        on_segment: Optional[Callable[[dict], None]] = None,
+    ) -> list:
+        """
+        整段识别后按词级时间戳把文本分配给说话人片段 (对齐模式)
+
+        整个文件按 Whisper 的 30 秒窗口依次解码,前一窗口的文本作为后一窗口的上下文;
+        说话人频繁切换时,解码次数由片段数变为窗口数。
+
+        Args:
+            waveform: 完整音频波形,或 AudioProcessor.open_audio 返回的按需读取音频源
+            segments: 片段列表,每个片段包含 start 和 end 时间
+            sample_rate: 采样率
+            on_segment: 每个片段完成时以结果调用,按片段顺序回调
+
+        Returns:
+            带有转录文本的片段列表
+        """
+        from .alignment import assign_words
+
+        if not isinstance(waveform, torch.Tensor):
+            # 整段解码需要完整波形
+            waveform = waveform.read_all()
+        duration = waveform.shape[-1] / sample_rate
+
+        print(f"对齐模式: 整段识别 {duration:.1f} 秒音频并分配到 {len(segments)} 个片段")
+        with span("transcribe_words", duration=duration):
+            words = self.transcribe_words(waveform)
+        count("words_aligned", len(words))
+
+        with span("align", words=len(words), segments=len(segments)):
+            texts = assign_words(words, segments)
+
+        results = []
+        for segment, text in zip(segments, texts):
+            result = segment.copy()
+            result["text"] = text
+            results.append(result)
+            count("segments_transcribed")
+            if on_segment is not None:
+                on_segment(result)
+            print(
+                f"  [{segment['start']:.2f}s - {segment['end']:.2f}s] {segment['speaker']}: {text}"
+            )
+
+        return results
+
+
+class FasterWhisperRecognition(SpeechRecognition):
+    """
+    基于 faster-whisper (CTranslate2) 的语音识别器
+
+    CPU 上默认加载 int8 量化权重,对外接口与 SpeechRecognition 相同。
+    CTranslate2 自行计算特征,因此不使用 mel 缓存(transcribe_segments 忽略 mel_cache),
+    批量接口逐个片段解码。
+    """
+
+    backend = "faster-whisper"
+
+    def __init__(self, model_name: str = None, compute_type: str = None):
+        """
+        初始化语音识别器
+
+        Args:
+            model_name: Whisper 模型名称 (tiny, base, small, medium, large)
+            compute_type: 权重和计算精度,默认 config.ASR_COMPUTE_TYPE
+        """
+        self.model_name = model_name or config.WHISPER_MODEL
+        self.compute_type = compute_type or config.ASR_COMPUTE_TYPE
+
+        print(f"正在加载 faster-whisper 模型: {self.model_name} ({self.compute_type})")
+        print(f"使用设备: {config.DEVICE}")
+
+        self.model = get_faster_whisper_model(self.model_name, config.DEVICE, self.compute_type)
+
+        print("faster-whisper 模型加载完成!")
+
+    def create_mel_cache(self, waveform: torch.Tensor) -> None:
+        """CTranslate2 后端不接收预计算的 mel,始终返回 None"""
+        return None
+
+    def _segments(
+        self,
+        audio_input,
+        language: str = None,
+        initial_prompt: str = None,
+        temperatures: tuple = FALLBACK_TEMPERATURES,
+        word_timestamps: bool = False,
+    ) -> list:
+        """调用 faster-whisper 转录并取出全部结果片段"""
+        language = language or config.WHISPER_LANGUAGE
+        initial_prompt = self._default_prompt(language, initial_prompt)
+
+        # 连续的张量视图转换为 numpy 时共享内存,不复制
+        audio = _as_audio(audio_input)
+        if isinstance(audio, torch.Tensor):
+            audio = audio.numpy()
+
+        # 与 openai-whisper 的默认行为一致: 贪心解码并按温度回退
+        segments, _ = self.model.transcribe(
+            audio,
+            language=language,
+            initial_prompt=initial_prompt,
+            beam_size=1,
+            temperature=list(temperatures),
+            compression_ratio_threshold=COMPRESSION_RATIO_THRESHOLD,
+            log_prob_threshold=LOGPROB_THRESHOLD,
+            no_speech_threshold=NO_SPEECH_THRESHOLD,
+            word_timestamps=word_timestamps,
+        )
+        return list(segments)
+
+    def transcribe(self, audio_input, language: str = None, initial_prompt: str = None) -> str:
+        """
+        转录音频为文字
+
+        Args:
+            audio_input: 音频输入 (文件路径、numpy array 或 torch.Tensor)
+            language: 语言代码,默认为中文 "zh"
+            initial_prompt: 初始提示,用于引导模型输出简体中文
+
+        Returns:
+            识别的文本
+        """
+        segments = self._segments(audio_input, language, initial_prompt)
+        return "".join(segment.text for segment in segments).strip()
+
+    def transcribe_words(
+        self, audio_input, language: str = None, initial_prompt: str = None
+    ) -> list[dict]:
+        """
+        转录音频并返回词级时间戳
+
+        Args:
+            audio_input: 音频输入 (numpy array 或 torch.Tensor)
+            language: 语言代码,默认为中文 "zh"
+            initial_prompt: 初始提示,用于引导模型输出简体中文
+
+        Returns:
+            词列表,每个词包含 word、start、end(相对音频开头,秒)
+        """
+        segments = self._segments(audio_input, language, initial_prompt, word_timestamps=True)
+        return [
+            {"word": word.word, "start": word.start, "end": word.end}
+            for segment in segments
+            for word in segment.words or []
+        ]
+
+    def transcribe_batch(
+        self,
+        audio_inputs: list,
+        language: str = None,
+        initial_prompt: str = None,
+        temperatures: tuple = (0.0,),
+    ) -> list[str]:
+        """
+        转录多个不超过 30 秒的音频片段,逐个解码
+
+        Args:
+            audio_inputs: 音频片段列表 (numpy array 或 torch.Tensor)
+            language: 语言代码,默认为中文 "zh"
+            initial_prompt: 初始提示,用于引导模型输出简体中文
+            temperatures: 依次尝试的解码温度
+
+        Returns:
+            与输入顺序一致的识别文本列表
+        """
+        texts = []
+        for audio in audio_inputs:
+            segments = self._segments(audio, language, initial_prompt, temperatures)
+            texts.append("".join(segment.text for segment in segments).strip())
+        return texts
+
+    def transcribe_segments(
+        self,
+        waveform: torch.Tensor,
+        segments: list,
+        sample_rate: int,
+        batch_size: int = 1,
+        merge_gap: Optional[float] = None,
+        mel_cache: Optional[MelCache] = None,
+        on_segment: Optional[Callable[[dict], None]] = None,
+    ) -> list:
+        """
+        对多个音频片段进行转录,参数与 SpeechRecognition.transcribe_segments 相同
+
+        CTranslate2 自行计算特征,忽略 mel_cache,片段始终以波形交给 transcribe/transcribe_batch。
+        """
+        return super().transcribe_segments(
+            waveform, segments, sample_rate, batch_size, merge_gap, None, on_segment
+        )
+
+
+# 可选的语音识别后端
+ASR_BACKENDS = {"whisper": SpeechRecognition, "faster-whisper": FasterWhisperRecognition}
+
+
+def create_recognizer(
+    model_name: str = None, backend: str = None, quantize: bool = None, compile_model: bool = None
+) -> SpeechRecognition:
+    """
+    按后端名称创建语音识别器
+
+    Args:
+        model_name: Whisper 模型名称
+        backend: 后端名称 (whisper, faster-whisper),默认 config.ASR_BACKEND
+        quantize: whisper 后端是否使用动态 int8 量化,默认 config.WHISPER_QUANTIZE
+        compile_model: whisper 后端是否编译编码器,默认 config.WHISPER_COMPILE
+
+    Returns:
+        语音识别器
+    """
+    backend = backend or config.ASR_BACKEND
+    if backend not in ASR_BACKENDS:
+        raise ValueError(f"不支持的语音识别后端: {backend},可选: {', '.join(ASR_BACKENDS)}")
+    if backend == "whisper":
+        return SpeechRecognition(model_name, quantize=quantize, compile_model=compile_model)
+    # faster-whisper 的量化由 compute_type 决定
+    return ASR_BACKENDS[backend](model_name=model_name)
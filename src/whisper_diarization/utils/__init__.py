@@ -1,11 +1,24 @@
 """工具模块初始化"""
 
-from .formatters import format_time, save_json, save_srt, save_text
+from .formatters import (
+    SegmentWriter,
+    format_time,
+    open_segment_writer,
+    save_json,
+    save_jsonl,
+    save_srt,
+    save_text,
+)
 from .logger import setup_logger
+from .metrics import character_error_rate
 
 __all__ = [
+    "SegmentWriter",
+    "character_error_rate",
     "format_time",
+    "open_segment_writer",
     "save_json",
+    "save_jsonl",
     "save_text",
     "save_srt",
     "setup_logger",
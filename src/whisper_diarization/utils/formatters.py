@@ -4,8 +4,10 @@
 """
 
 import json
+import time
+from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Any
+from typing import Any, Optional, TextIO
 
 
 def format_time(seconds: float) -> str:
@@ -40,6 +42,20 @@ def save_json(data: dict[str, Any], output_path: Path) -> None:
         json.dump(data, f, ensure_ascii=False, indent=2)
 
 
+def save_jsonl(data: dict[str, Any], output_path: Path) -> None:
+    """
+    保存为 JSON Lines 格式: 每行一个片段,最后一行为汇总信息
+
+    Args:
+        data: 要保存的数据
+        output_path: 输出文件路径
+    """
+    with JsonLinesWriter(output_path, data.get("audio_file")) as writer:
+        for segment in data["segments"]:
+            writer.write_segment(segment)
+        writer.finalize(data)
+
+
 def save_text(data: dict[str, Any], output_path: Path) -> None:
     """
     保存为纯文本格式
@@ -80,3 +96,144 @@ def save_srt(data: dict[str, Any], output_path: Path) -> None:
 
             # 文本 (包含说话人标识)
             f.write(f"[{segment['speaker']}] {segment['text']}\n\n")
+
+
+class SegmentWriter(ABC):
+    """
+    增量输出写入器
+
+    每识别完一个片段就追加写入,按时间间隔刷新到磁盘,处理结束时写入汇总信息。
+    长音频处理过程中即可查看已完成的部分,结果不必全部保留在内存中才能输出。
+    """
+
+    def __init__(
+        self, output_path: Path, audio_file: Optional[str] = None, flush_interval: float = 5.0
+    ):
+        """
+        打开输出文件
+
+        Args:
+            output_path: 输出文件路径
+            audio_file: 音频文件路径,写入文件头
+            flush_interval: 刷新到磁盘的最长间隔(秒),0 表示每个片段都刷新
+        """
+        self.output_path = Path(output_path)
+        self.audio_file = audio_file
+        self.flush_interval = flush_interval
+        self.count = 0
+        self._file: TextIO = open(self.output_path, "w", encoding="utf-8")  # noqa: SIM115
+        self._last_flush = time.monotonic()
+        self._write_header()
+
+    def __enter__(self) -> "SegmentWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _write_header(self) -> None:  # noqa: B027
+        """写入文件头(可选,默认不写)"""
+
+    @abstractmethod
+    def _write_segment(self, segment: dict[str, Any]) -> None:
+        """写入一个片段"""
+
+    def _write_summary(self, data: dict[str, Any]) -> None:  # noqa: B027
+        """写入汇总信息(可选,默认不写)"""
+
+    def write_segment(self, segment: dict[str, Any]) -> None:
+        """
+        追加一个已识别的片段
+
+        Args:
+            segment: 包含 speaker、start、end、text 的片段
+        """
+        self.count += 1
+        self._write_segment(segment)
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self) -> None:
+        """把已写入的内容刷新到磁盘"""
+        self._file.flush()
+        self._last_flush = time.monotonic()
+
+    def finalize(self, data: dict[str, Any]) -> None:
+        """
+        写入汇总信息并关闭文件
+
+        Args:
+            data: process_audio 返回的输出数据
+        """
+        self._write_summary(data)
+        self.close()
+
+    def close(self) -> None:
+        """关闭文件"""
+        if not self._file.closed:
+            self._file.close()
+
+
+class JsonLinesWriter(SegmentWriter):
+    """JSON Lines 写入器: 每行一个片段,最后一行为汇总信息"""
+
+    def _write_segment(self, segment: dict[str, Any]) -> None:
+        record = {"type": "segment", **segment}
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def _write_summary(self, data: dict[str, Any]) -> None:
+        summary = {key: value for key, value in data.items() if key != "segments"}
+        record = {"type": "summary", **summary, "segment_count": self.count}
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+class TextWriter(SegmentWriter):
+    """纯文本写入器: 总时长和说话人数在处理结束后写在末尾"""
+
+    def _write_header(self) -> None:
+        if self.audio_file:
+            self._file.write(f"音频文件: {self.audio_file}\n")
+        self._file.write("=" * 60 + "\n\n")
+
+    def _write_segment(self, segment: dict[str, Any]) -> None:
+        self._file.write(f"[{segment['speaker']}] ")
+        self._file.write(f"{format_time(segment['start'])} --> {format_time(segment['end'])}\n")
+        self._file.write(f"{segment['text']}\n\n")
+
+    def _write_summary(self, data: dict[str, Any]) -> None:
+        self._file.write("=" * 60 + "\n")
+        self._file.write(f"总时长: {format_time(data['duration'])}\n")
+        self._file.write(f"说话人数: {data['speakers']}\n")
+
+
+class SrtWriter(SegmentWriter):
+    """SRT 字幕写入器"""
+
+    def _write_segment(self, segment: dict[str, Any]) -> None:
+        start = format_time(segment["start"]).replace(".", ",")
+        end = format_time(segment["end"]).replace(".", ",")
+        self._file.write(f"{self.count}\n{start} --> {end}\n")
+        self._file.write(f"[{segment['speaker']}] {segment['text']}\n\n")
+
+
+_WRITERS = {"jsonl": JsonLinesWriter, "text": TextWriter, "srt": SrtWriter}
+
+
+def open_segment_writer(
+    output_path: Path, fmt: str, audio_file: Optional[str] = None, flush_interval: float = 5.0
+) -> SegmentWriter:
+    """
+    按格式创建增量输出写入器
+
+    Args:
+        output_path: 输出文件路径
+        fmt: 输出格式 (jsonl, text, srt);JSON 需要完整结果,不支持增量写入
+        audio_file: 音频文件路径
+        flush_interval: 刷新到磁盘的最长间隔(秒)
+
+    Returns:
+        写入器
+    """
+    if fmt not in _WRITERS:
+        raise ValueError(f"格式 {fmt} 不支持增量写入,可选: {', '.join(_WRITERS)}")
+    return _WRITERS[fmt](output_path, audio_file, flush_interval)
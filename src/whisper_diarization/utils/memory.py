@@ -0,0 +1,74 @@
+"""
+内存统计工具
+读取进程常驻内存 (RSS),并在后台线程中采样一段代码执行期间的峰值
+"""
+
+import os
+import sys
+import threading
+from typing import Optional
+
+
+def current_rss() -> int:
+    """
+    返回当前进程的常驻内存 (字节)
+
+    Linux 下读取 /proc/self/statm;其他平台退化为进程生命周期内的峰值 RSS。
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return peak_rss()
+
+
+def peak_rss() -> int:
+    """返回进程生命周期内的峰值常驻内存 (字节)"""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return 0
+
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS 以字节为单位,Linux 以 KB 为单位
+    return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+
+class PeakMemorySampler:
+    """
+    在后台线程中周期性采样 RSS,记录 with 块执行期间的峰值
+
+    Examples:
+        >>> with PeakMemorySampler() as sampler:
+        ...     data = bytearray(10**6)
+        >>> sampler.peak >= sampler.start
+        True
+    """
+
+    def __init__(self, interval: float = 0.01):
+        """
+        Args:
+            interval: 采样间隔(秒)
+        """
+        self.interval = interval
+        self.start = 0
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _sample(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, current_rss())
+
+    def __enter__(self) -> "PeakMemorySampler":
+        self.start = self.peak = current_rss()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._sample, name="rss-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.peak = max(self.peak, current_rss())
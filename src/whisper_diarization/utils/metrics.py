@@ -0,0 +1,58 @@
+"""
+识别质量指标模块
+计算字错误率 (CER),用于比较不同模型、精度或后端的识别结果
+"""
+
+import unicodedata
+
+
+def normalize_text(text: str) -> str:
+    """去掉空白和标点,只保留参与比较的字符"""
+    return "".join(
+        ch for ch in text if not ch.isspace() and not unicodedata.category(ch).startswith("P")
+    )
+
+
+def edit_distance(reference: str, hypothesis: str) -> int:
+    """
+    计算两个字符串的编辑距离(替换、插入、删除各计 1)
+
+    Args:
+        reference: 参考文本
+        hypothesis: 识别文本
+
+    Returns:
+        编辑距离
+    """
+    previous = list(range(len(hypothesis) + 1))
+    for i, ref_char in enumerate(reference, 1):
+        current = [i]
+        for j, hyp_char in enumerate(hypothesis, 1):
+            current.append(
+                min(
+                    previous[j] + 1,
+                    current[j - 1] + 1,
+                    previous[j - 1] + (ref_char != hyp_char),
+                )
+            )
+        previous = current
+    return previous[-1]
+
+
+def character_error_rate(reference: str, hypothesis: str, normalize: bool = True) -> float:
+    """
+    计算字错误率: 编辑距离 / 参考文本字符数
+
+    Args:
+        reference: 参考文本
+        hypothesis: 识别文本
+        normalize: 是否先去掉空白和标点
+
+    Returns:
+        字错误率,参考文本为空时识别文本也为空返回 0,否则返回 1
+    """
+    if normalize:
+        reference, hypothesis = normalize_text(reference), normalize_text(hypothesis)
+    if not reference:
+        return 0.0 if not hypothesis else 1.0
+    return edit_distance(reference, hypothesis) / len(reference)
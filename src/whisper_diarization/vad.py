@@ -0,0 +1,169 @@
+"""
+语音活动检测模块
+在语音识别前按短时能量裁剪说话人片段首尾的静音,并丢弃不含语音的片段,
+减少送入 Whisper 的音频时长,同时避免静音和噪声引起的幻觉输出
+"""
+
+from typing import Any, Optional, Union
+
+import torch
+
+from . import config
+from .audio_processor import AudioSource
+
+# 低能量帧取该分位数作为噪声底
+NOISE_FLOOR_QUANTILE = 0.1
+# 分析 AudioSource 时每次读取的时长(秒)
+ANALYZE_CHUNK_DURATION = 60.0
+
+
+def frame_energy(samples: torch.Tensor, frame_length: int) -> torch.Tensor:
+    """
+    计算不重叠分帧的短时能量
+
+    Args:
+        samples: (channels, samples) 或 (samples,) 波形,多声道时取平均
+        frame_length: 每帧采样数,末尾不足一帧的部分补零
+
+    Returns:
+        (n_frames,) 每帧的均方能量(dBFS)
+    """
+    if samples.dim() > 1:
+        samples = samples.mean(dim=0)
+    remainder = samples.shape[-1] % frame_length
+    if remainder:
+        samples = torch.nn.functional.pad(samples, (0, frame_length - remainder))
+    frames = samples.reshape(-1, frame_length)
+    return 10 * torch.log10(frames.pow(2).mean(dim=1) + 1e-10)
+
+
+class VoiceActivityDetector:
+    """基于能量的语音活动检测器"""
+
+    def __init__(
+        self,
+        threshold_db: float = None,
+        margin_db: float = None,
+        frame_duration: float = None,
+        min_speech: float = None,
+        padding: float = None,
+    ):
+        """
+        初始化语音活动检测器
+
+        能量超过 max(threshold_db, 噪声底 + margin_db) 的帧视为语音,
+        噪声底取整个文件帧能量的低分位数,因此对整体录音电平不敏感。
+
+        Args:
+            threshold_db: 语音帧的最低能量(dBFS),默认 config.VAD_THRESHOLD_DB
+            margin_db: 语音帧高出噪声底的最小能量(dB),默认 config.VAD_MARGIN_DB
+            frame_duration: 帧长(秒),默认 config.VAD_FRAME_DURATION
+            min_speech: 片段内语音总时长低于该值(秒)时丢弃,默认 config.VAD_MIN_SPEECH
+            padding: 裁剪后在语音首尾保留的余量(秒),默认 config.VAD_PADDING
+        """
+        self.threshold_db = config.VAD_THRESHOLD_DB if threshold_db is None else threshold_db
+        self.margin_db = config.VAD_MARGIN_DB if margin_db is None else margin_db
+        self.frame_duration = frame_duration or config.VAD_FRAME_DURATION
+        self.min_speech = config.VAD_MIN_SPEECH if min_speech is None else min_speech
+        self.padding = config.VAD_PADDING if padding is None else padding
+
+        self.mask: Optional[torch.Tensor] = None
+        self.threshold: Optional[float] = None
+
+    def analyze(self, waveform: Union[torch.Tensor, AudioSource], sample_rate: int) -> torch.Tensor:
+        """
+        计算整个音频的逐帧语音掩码
+
+        张量输入一次性向量化计算;AudioSource 分块读取,峰值内存由块大小决定。
+
+        Args:
+            waveform: 音频波形或 AudioSource
+            sample_rate: 采样率
+
+        Returns:
+            (n_frames,) 布尔张量,True 表示语音帧
+        """
+        frame_length = max(int(round(self.frame_duration * sample_rate)), 1)
+
+        if isinstance(waveform, AudioSource):
+            # 不足一帧的尾部留到下一块,分块计算的结果与整体计算一致
+            energies = []
+            carry = torch.zeros(0)
+            start = 0.0
+            while start < waveform.duration:
+                end = min(start + ANALYZE_CHUNK_DURATION, waveform.duration)
+                samples = torch.cat([carry, waveform.read_segment(start, end).mean(dim=0)])
+                usable = samples.shape[0] // frame_length * frame_length
+                energies.append(frame_energy(samples[:usable], frame_length))
+                carry = samples[usable:]
+                start = end
+            if carry.numel():
+                energies.append(frame_energy(carry, frame_length))
+            energy = torch.cat(energies) if energies else torch.zeros(0)
+        else:
+            energy = frame_energy(waveform, frame_length)
+
+        if energy.numel():
+            floor = torch.quantile(energy.float(), NOISE_FLOOR_QUANTILE).item()
+        else:
+            floor = self.threshold_db
+        self.threshold = max(self.threshold_db, floor + self.margin_db)
+        self.mask = energy > self.threshold
+        self.frame_duration = frame_length / sample_rate
+        return self.mask
+
+    def filter_segments(self, segments: list[dict]) -> tuple[list[dict], dict[str, Any]]:
+        """
+        裁剪片段首尾静音并丢弃不含语音的片段,需先调用 analyze
+
+        Args:
+            segments: 说话人片段列表
+
+        Returns:
+            (kept, stats):
+            - kept: 保留的片段(其余字段不变,start/end 为裁剪后的时间)
+            - stats: 输入/输出片段数、丢弃和裁剪的片段数、输入/输出/节省的音频时长
+        """
+        if self.mask is None:
+            raise RuntimeError("请先调用 analyze() 计算语音掩码")
+
+        mask = self.mask
+        n_frames = mask.numel()
+        # 前缀和: 任意区间内的语音帧数为两次查表之差
+        speech_frames = torch.nn.functional.pad(mask.to(torch.int64).cumsum(0), (1, 0))
+
+        kept = []
+        dropped = trimmed = 0
+        input_seconds = output_seconds = 0.0
+        for segment in segments:
+            start, end = segment["start"], segment["end"]
+            input_seconds += end - start
+
+            first = min(int(start / self.frame_duration), n_frames)
+            last = min(int(-(-end // self.frame_duration)), n_frames)
+            speech = (speech_frames[last] - speech_frames[first]).item()
+            # min_speech 为 0 时也要丢弃没有任何语音帧的片段,否则无法确定裁剪位置
+            if speech == 0 or speech * self.frame_duration < self.min_speech:
+                dropped += 1
+                continue
+
+            indices = torch.nonzero(mask[first:last]).flatten()
+            new_start = max(start, (first + indices[0].item()) * self.frame_duration - self.padding)
+            new_end = min(
+                end, (first + indices[-1].item() + 1) * self.frame_duration + self.padding
+            )
+            if new_start > start or new_end < end:
+                trimmed += 1
+
+            kept.append({**segment, "start": new_start, "end": new_end})
+            output_seconds += new_end - new_start
+
+        return kept, {
+            "segments": len(segments),
+            "kept": len(kept),
+            "dropped": dropped,
+            "trimmed": trimmed,
+            "input_seconds": input_seconds,
+            "output_seconds": output_seconds,
+            "skipped_seconds": input_seconds - output_seconds,
+        }
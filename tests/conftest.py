@@ -17,3 +17,44 @@ def output_dir(tmp_path):
     output_path = tmp_path / "output"
     output_path.mkdir(exist_ok=True)
     return output_path
+
+
+@pytest.fixture
+def fake_pipeline(tmp_path, monkeypatch):
+    """
+    用替身替换处理流程中的说话人分离、语音识别和音频加载
+
+    返回 install(diarizer, recognizer, waveform, sample_rate=16000) 函数,调用后返回占位音频文件路径:
+    - diarizer: 说话人分离替身实例,或以 (hf_token, offline) 构造替身的类;
+      统计信息使用 SpeakerDiarization.get_speaker_statistics 的真实实现
+    - recognizer: 语音识别替身实例,或以处理选项为参数的工厂函数
+    - waveform: 加载音频时返回的 (channels, samples) 波形,时长按 sample_rate 计算
+
+    可以多次调用 install 替换替身或波形。
+    """
+    from whisper_diarization import pipeline
+
+    audio_path = tmp_path / "audio.wav"
+    audio_path.write_bytes(b"fake audio")
+
+    def install(diarizer, recognizer, waveform, sample_rate=16000):
+        class Diarization:
+            get_speaker_statistics = staticmethod(
+                pipeline.SpeakerDiarization.get_speaker_statistics
+            )
+
+            def __new__(cls, hf_token=None, offline=False):
+                if isinstance(diarizer, type):
+                    return diarizer(hf_token=hf_token, offline=offline)
+                return diarizer
+
+        create = recognizer if callable(recognizer) else lambda options: recognizer
+        duration = waveform.shape[1] / sample_rate
+        monkeypatch.setattr(pipeline, "SpeakerDiarization", Diarization)
+        monkeypatch.setattr(pipeline, "_create_recognizer", create)
+        monkeypatch.setattr(
+            pipeline, "_load_audio", lambda path, options: (waveform, sample_rate, duration)
+        )
+        return audio_path
+
+    return install
@@ -0,0 +1,68 @@
+"""测试词级对齐模块"""
+
+import random
+
+from whisper_diarization.alignment import IntervalTree, assign_words
+
+
+def test_interval_tree_matches_brute_force():
+    """测试区间树的重叠查询与逐个比较的结果一致"""
+    rng = random.Random(0)
+    intervals = []
+    for _ in range(200):
+        start = rng.uniform(0, 100)
+        intervals.append((start, start + rng.choice([0.0, rng.uniform(0, 5), rng.uniform(0, 40)])))
+    tree = IntervalTree(intervals)
+
+    for _ in range(500):
+        start = rng.uniform(-5, 105)
+        end = start + rng.choice([0.0, rng.uniform(0, 3)])
+        expected = [i for i, (s, e) in enumerate(intervals) if s <= end and e >= start]
+        assert tree.overlapping(start, end) == expected
+
+
+def test_interval_tree_nearest():
+    """测试查找最近区间"""
+    tree = IntervalTree([(0.0, 1.0), (5.0, 6.0), (2.0, 4.0)])
+
+    assert tree.nearest(0.5) == 0
+    assert tree.nearest(1.4) == 0
+    assert tree.nearest(1.6) == 2
+    assert tree.nearest(4.6) == 1
+    assert tree.nearest(100.0) == 1
+    assert IntervalTree([]).nearest(1.0) is None
+
+
+def test_assign_words_by_overlap():
+    """测试词归入重叠最多的片段,间隙中的词归入最近的片段"""
+    segments = [
+        {"speaker": "SPEAKER_00", "start": 0.0, "end": 2.0},
+        {"speaker": "SPEAKER_01", "start": 2.0, "end": 4.0},
+        {"speaker": "SPEAKER_00", "start": 5.0, "end": 7.0},
+    ]
+    words = [
+        {"word": "你好", "start": 0.2, "end": 0.8},
+        {"word": "。", "start": 1.8, "end": 2.1},
+        {"word": "是的", "start": 1.9, "end": 2.6},
+        {"word": "嗯", "start": 4.6, "end": 4.8},
+        {"word": "好", "start": 6.0, "end": 6.0},
+    ]
+
+    assert assign_words(words, segments) == ["你好。", "是的", "嗯好"]
+
+
+def test_assign_words_overlapping_segments_and_offset():
+    """测试重叠的说话人片段和时间偏移"""
+    segments = [
+        {"speaker": "SPEAKER_00", "start": 10.0, "end": 20.0},
+        {"speaker": "SPEAKER_01", "start": 15.0, "end": 16.0},
+    ]
+    words = [
+        {"word": " hello", "start": 0.0, "end": 1.0},
+        {"word": " yes", "start": 5.0, "end": 6.0},
+        {"word": " world", "start": 6.0, "end": 8.0},
+    ]
+
+    # 完全落在插话片段内的词与两个片段重叠相同,取较短的片段
+    assert assign_words(words, segments, offset=10.0) == ["hello world", "yes"]
+    assert assign_words(words, []) == []
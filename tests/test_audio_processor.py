@@ -0,0 +1,181 @@
+"""测试音频处理模块"""
+
+import shutil
+import sys
+
+import pytest
+import torch
+import torchaudio
+
+from whisper_diarization.audio_processor import (
+    AudioProcessor,
+    AudioSource,
+    decode_with_ffmpeg,
+    get_resampler,
+    resample,
+)
+
+
+@pytest.fixture
+def stereo_wav(tmp_path):
+    """生成 3 秒 8kHz 双声道 16-bit WAV 文件"""
+    path = tmp_path / "stereo.wav"
+    t = torch.arange(8000 * 3) / 8000
+    waveform = torch.stack([torch.sin(2 * torch.pi * 220 * t), torch.zeros_like(t)]) * 0.5
+    torchaudio.save(str(path), waveform, 8000, encoding="PCM_S", bits_per_sample=16)
+    return path
+
+
+def test_audio_source_memmap(stereo_wav):
+    """测试内存映射读取与完整加载结果一致"""
+    processor = AudioProcessor(sample_rate=8000)
+    source = processor.open_audio(str(stereo_wav))
+    waveform, _ = processor.load_audio(str(stereo_wav))
+
+    assert source._memmap is not None
+    assert source.duration == pytest.approx(3.0)
+    assert processor.get_duration(source, 8000) == pytest.approx(3.0)
+
+    segment = processor.extract_segment(source, 1.0, 2.0, 8000)
+    expected = processor.extract_segment(waveform, 1.0, 2.0, 8000)
+    assert segment.shape == (1, 8000)
+    assert torch.allclose(segment, expected, atol=1e-4)
+
+
+def test_audio_source_resample(stereo_wav):
+    """测试按需读取时重采样到目标采样率"""
+    source = AudioSource(str(stereo_wav), sample_rate=16000)
+
+    assert source.read_segment(0.5, 1.5).shape == (1, 16000)
+    assert source.read_segment(2.5, 10.0).shape == (1, 8000)
+
+
+def test_stream_audio(stereo_wav):
+    """测试流式分块读取"""
+    processor = AudioProcessor(sample_rate=8000)
+
+    chunks = list(processor.stream_audio(str(stereo_wav), chunk_duration=1.0, overlap=0.25))
+
+    assert [start for start, _ in chunks] == [0.0, 0.75, 1.5, 2.25]
+    assert chunks[0][1].shape == (1, 8000)
+    assert chunks[-1][1].shape == (1, 6000)
+
+
+@pytest.mark.parametrize("orig_sample_rate", [8000, 22050, 44100, 48000])
+def test_resample_matches_torchaudio(orig_sample_rate):
+    """测试分块混音重采样与 torchaudio 整段重采样一致"""
+    waveform = torch.randn(2, orig_sample_rate * 2 + 7)
+    expected = torchaudio.transforms.Resample(orig_sample_rate, 16000)(
+        waveform.mean(dim=0, keepdim=True)
+    )
+
+    resampled = resample(waveform, orig_sample_rate, 16000, downmix=True, chunk_duration=0.3)
+
+    assert resampled.shape == expected.shape
+    assert torch.allclose(resampled, expected, atol=1e-5)
+
+
+def test_resampler_cached():
+    """测试重采样器按采样率对缓存"""
+    assert get_resampler(44100, 16000) is get_resampler(44100, 16000)
+    assert get_resampler(48000, 16000) is not get_resampler(44100, 16000)
+
+
+def test_load_audio_memmap_matches_torchaudio(stereo_wav):
+    """测试 WAV 通过内存映射分块加载的结果与 torchaudio 解码一致"""
+    waveform, sample_rate = AudioProcessor(sample_rate=16000).load_audio(str(stereo_wav))
+
+    decoded, orig_sample_rate = torchaudio.load(str(stereo_wav))
+    expected = torchaudio.transforms.Resample(orig_sample_rate, 16000)(
+        decoded.mean(dim=0, keepdim=True)
+    )
+    assert sample_rate == 16000
+    assert waveform.shape == expected.shape
+    assert torch.allclose(waveform, expected, atol=1e-5)
+
+
+def test_load_audio_without_downmix(stereo_wav):
+    """测试不混音时保留各声道"""
+    waveform, _ = AudioProcessor(sample_rate=16000).load_audio(str(stereo_wav), downmix=False)
+
+    decoded, orig_sample_rate = torchaudio.load(str(stereo_wav))
+    expected = torchaudio.transforms.Resample(orig_sample_rate, 16000)(decoded)
+    assert waveform.shape == expected.shape == (2, 3 * 16000)
+    assert torch.allclose(waveform, expected, atol=1e-5)
+    assert waveform[1].abs().max() == 0
+
+
+def test_invalid_backend():
+    """测试不支持的解码后端"""
+    with pytest.raises(ValueError):
+        AudioProcessor(backend="sox")
+
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="需要 ffmpeg")
+def test_load_audio_ffmpeg(stereo_wav):
+    """测试 ffmpeg 后端解码为目标采样率的单声道"""
+    waveform, sample_rate = AudioProcessor(sample_rate=16000, backend="ffmpeg").load_audio(
+        str(stereo_wav)
+    )
+
+    assert sample_rate == 16000
+    assert waveform.shape[0] == 1
+    assert abs(waveform.shape[1] - 3 * 16000) <= 16
+
+    stereo, _ = AudioProcessor(sample_rate=16000, backend="ffmpeg").load_audio(
+        str(stereo_wav), downmix=False
+    )
+    assert stereo.shape == (2, waveform.shape[1])
+    assert stereo[1].abs().max() == 0
+
+
+FAKE_FFMPEG = """#!{python}
+import sys
+import numpy as np
+sys.stderr.write("warning\\n" * 100000)
+sys.stderr.flush()
+channels = int(sys.argv[sys.argv.index("-ac") + 1])
+frames = np.arange(16000 * 90, dtype=np.float32)
+sys.stdout.buffer.write(np.repeat(frames, channels).tobytes())
+sys.exit(int(sys.argv[sys.argv.index("-i") + 1] == "broken"))
+"""
+
+
+def test_decode_with_ffmpeg_large_output(tmp_path, monkeypatch):
+    """测试 ffmpeg 输出大量警告和超过初始缓冲区的采样时不会阻塞,失败时报告错误输出"""
+    ffmpeg = tmp_path / "ffmpeg"
+    ffmpeg.write_text(FAKE_FFMPEG.format(python=sys.executable))
+    ffmpeg.chmod(0o755)
+    monkeypatch.setenv("PATH", str(tmp_path), prepend=":")
+
+    waveform = decode_with_ffmpeg("audio.mp3", 16000, channels=2)
+
+    assert waveform.shape == (2, 16000 * 90)
+    assert torch.equal(waveform[0], waveform[1])
+    assert waveform[0, -1] == 16000 * 90 - 1
+    with pytest.raises(RuntimeError, match="warning"):
+        decode_with_ffmpeg("broken", 16000)
+
+
+FAKE_FFPROBE = """#!{python}
+import sys
+print(4 if "quad" in sys.argv[-1] else 1)
+"""
+
+
+def test_load_audio_ffmpeg_keeps_channel_count(tmp_path, monkeypatch):
+    """测试 ffmpeg 后端不混音时按 ffprobe 读取的声道数解码"""
+    for name, script in [("ffmpeg", FAKE_FFMPEG), ("ffprobe", FAKE_FFPROBE)]:
+        tool = tmp_path / name
+        tool.write_text(script.format(python=sys.executable))
+        tool.chmod(0o755)
+    monkeypatch.setenv("PATH", str(tmp_path), prepend=":")
+    processor = AudioProcessor(sample_rate=16000, backend="ffmpeg")
+    for name in ("quad.wav", "mono.wav"):
+        (tmp_path / name).write_bytes(b"fake audio")
+
+    quad, _ = processor.load_audio(str(tmp_path / "quad.wav"), downmix=False)
+    mono, _ = processor.load_audio(str(tmp_path / "mono.wav"), downmix=False)
+
+    assert quad.shape == (4, 16000 * 90)
+    assert mono.shape == (1, 16000 * 90)
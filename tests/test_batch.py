@@ -0,0 +1,106 @@
+"""测试批量处理模块"""
+
+import json
+
+import pytest
+
+from whisper_diarization import batch
+from whisper_diarization.batch import collect_inputs, output_path_for, run_batch
+from whisper_diarization.pipeline import PipelineOptions
+
+
+def _touch(path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"")
+    return path
+
+
+def test_collect_inputs_directory(tmp_path):
+    """测试从目录递归收集音频文件"""
+    a = _touch(tmp_path / "a.wav")
+    b = _touch(tmp_path / "sub" / "b.mp3")
+    _touch(tmp_path / "notes.txt")
+
+    assert collect_inputs(str(tmp_path)) == sorted([a, b])
+
+
+def test_collect_inputs_glob_and_manifest(tmp_path):
+    """测试通配符和清单文件输入"""
+    a = _touch(tmp_path / "a.wav")
+    b = _touch(tmp_path / "b.wav")
+    manifest = tmp_path / "manifest.txt"
+    manifest.write_text("# 注释\nb.wav\n\nmissing.wav\n", encoding="utf-8")
+
+    assert collect_inputs(str(tmp_path / "*.wav")) == [a, b]
+    assert collect_inputs(str(manifest)) == [b]
+
+
+def test_run_batch_skips_existing_outputs(tmp_path):
+    """测试已有输出的文件被跳过并写出汇总"""
+    audio = _touch(tmp_path / "in" / "call.wav")
+    output_dir = tmp_path / "out"
+    _touch(output_path_for(audio, output_dir, "json"))
+
+    summary = run_batch([audio], output_dir, "json", PipelineOptions(), workers=2)
+
+    assert summary["skipped"] == 1
+    assert summary["processed"] == 0
+    assert json.loads((output_dir / "summary.json").read_text(encoding="utf-8"))["total"] == 1
+
+
+def test_describe_zero_duration():
+    """测试时长为 0 的文件(实时率为 None)也能输出进度"""
+    result = {"audio": "empty.wav", "elapsed": 1.5, "rtf": None}
+
+    assert batch._describe(result) == "empty.wav (1.5s, RTF -)"
+    assert batch._describe({**result, "rtf": 0.5}) == "empty.wav (1.5s, RTF 0.500)"
+
+
+def test_output_path_keeps_relative_path(tmp_path):
+    """测试不同目录的同名文件、同名不同格式的文件映射到不同的输出"""
+    inputs = [
+        _touch(tmp_path / "in" / "a" / "x.wav"),
+        _touch(tmp_path / "in" / "b" / "x.wav"),
+        _touch(tmp_path / "in" / "b" / "x.mp3"),
+    ]
+    root = batch.input_root(inputs)
+    output_dir = tmp_path / "out"
+
+    outputs = [output_path_for(p, output_dir, "json", root) for p in inputs]
+
+    assert outputs == [
+        output_dir / "a" / "x.wav.json",
+        output_dir / "b" / "x.wav.json",
+        output_dir / "b" / "x.mp3.json",
+    ]
+
+
+def test_run_batch_rejects_invalid_inputs(tmp_path):
+    """测试工作进程数小于 1、输出与汇总文件同名时报错"""
+    audio = _touch(tmp_path / "in" / "call.wav")
+    summary_like = _touch(tmp_path / "in" / "summary")
+
+    with pytest.raises(ValueError):
+        run_batch([audio], tmp_path / "out", "json", PipelineOptions(), workers=0)
+    with pytest.raises(ValueError):
+        run_batch([summary_like], tmp_path / "out", "json", PipelineOptions())
+
+
+def test_save_atomic_leaves_no_partial_output(tmp_path, monkeypatch):
+    """测试写入失败时不留下输出文件,成功时输出完整"""
+    output_path = tmp_path / "out" / "sub" / "call.wav.json"
+
+    def failing_save(output_data, path, fmt):
+        path.write_text("{", encoding="utf-8")
+        raise OSError("磁盘已满")
+
+    monkeypatch.setattr(batch, "save_result", failing_save)
+    with pytest.raises(OSError):
+        batch._save_atomic({}, output_path, "json")
+    assert list(output_path.parent.iterdir()) == []
+
+    monkeypatch.setattr(
+        batch, "save_result", lambda data, path, fmt: path.write_text("{}", encoding="utf-8")
+    )
+    batch._save_atomic({}, output_path, "json")
+    assert list(output_path.parent.iterdir()) == [output_path]
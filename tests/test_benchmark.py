@@ -0,0 +1,131 @@
+"""测试基准测试模块"""
+
+import json
+from types import SimpleNamespace
+
+import pytest
+import torch
+
+from whisper_diarization import benchmark, speech_recognition
+
+
+class FakeWhisperModel:
+    """返回固定文本的 Whisper 模型替身"""
+
+    dims = SimpleNamespace(n_mels=80)
+    device = torch.device("cpu")
+
+    def transcribe(self, audio, **kwargs):
+        words = [{"word": "测试", "start": 0.0, "end": 0.5}]
+        return {"text": " 测试 ", "segments": [{"words": words}]}
+
+    def embed_audio(self, mel):
+        return mel
+
+
+def fake_decode(model, audio_features, options):
+    """返回固定文本的 whisper.decode 替身"""
+    return [
+        SimpleNamespace(text=" 测试 ", no_speech_prob=0.0, avg_logprob=0.0, compression_ratio=1.0)
+        for _ in audio_features
+    ]
+
+
+@pytest.fixture
+def fake_whisper(monkeypatch):
+    """替换 Whisper 模型加载和解码"""
+    monkeypatch.setattr(
+        speech_recognition, "get_whisper_model", lambda name, device, **kwargs: FakeWhisperModel()
+    )
+    monkeypatch.setattr(speech_recognition.whisper, "decode", fake_decode)
+
+
+def test_synthetic_segments():
+    """测试合成片段覆盖整个音频且说话人轮流"""
+    segments = benchmark.synthetic_segments(12.0, turn=5.0)
+
+    assert [(s["start"], s["end"]) for s in segments] == [(0.0, 5.0), (5.0, 10.0), (10.0, 12.0)]
+    assert [s["speaker"] for s in segments] == ["SPEAKER_00", "SPEAKER_01", "SPEAKER_00"]
+
+
+def test_stage_recorder():
+    """测试阶段记录包含耗时、实时率和吞吐量"""
+    recorder = benchmark.StageRecorder(duration=10.0)
+
+    with recorder.stage("transcribe") as info:
+        info["segments"] = 4
+
+    stage = recorder.stages["transcribe"]
+    assert stage["seconds"] >= 0
+    assert stage["rtf"] == pytest.approx(stage["seconds"] / 10.0)
+    assert stage["peak_rss_mb"] > 0
+    assert "segments_per_second" in stage
+    assert recorder.summary()["total_seconds"] == stage["seconds"]
+
+
+def test_benchmark_main(sample_audio_path, tmp_path, fake_whisper):
+    """测试命令行入口在原始和合成长输入上输出 JSON 结果"""
+    output = tmp_path / "bench.json"
+
+    benchmark.main(
+        [
+            "--audio",
+            str(sample_audio_path),
+            "--skip-diarization",
+            "--synthetic-minutes",
+            "0.5",
+            "--json",
+            str(output),
+        ]
+    )
+
+    results = json.loads(output.read_text(encoding="utf-8"))["results"]
+    assert len(results) == 2
+    assert results[1]["duration"] == pytest.approx(30.0)
+    assert set(results[0]["stages"]) == {"load", "diarize", "transcribe", "save"}
+    assert results[0]["stages"]["diarize"]["synthetic"] is True
+
+
+def test_benchmark_main_missing_audio(tmp_path, monkeypatch, capsys):
+    """测试默认测试音频不存在(如安装后运行)时给出明确的错误"""
+    monkeypatch.setattr(benchmark, "DEFAULT_AUDIO", tmp_path / "multi-speaker.wav")
+
+    with pytest.raises(SystemExit) as excinfo:
+        benchmark.main(["--skip-diarization"])
+
+    assert excinfo.value.code == 2
+    assert "--audio" in capsys.readouterr().err
+
+
+def test_benchmark_vad_stage(sample_audio_path, fake_whisper):
+    """测试启用语音活动检测时报告 vad 阶段"""
+
+    result = benchmark.run_benchmark(sample_audio_path, diarization=False, vad=True)
+
+    assert list(result["stages"]) == ["load", "diarize", "vad", "transcribe", "save"]
+    assert result["stages"]["vad"]["skipped_seconds"] >= 0
+
+
+def test_benchmark_compare_asr_modes(sample_audio_path, tmp_path, fake_whisper):
+    """测试依次对比逐片段识别和对齐模式"""
+    output = tmp_path / "bench.json"
+
+    benchmark.main(
+        [
+            "--audio",
+            str(sample_audio_path),
+            "--skip-diarization",
+            "--asr-mode",
+            "segments",
+            "align",
+            "--json",
+            str(output),
+        ]
+    )
+
+    results = json.loads(output.read_text(encoding="utf-8"))["results"]
+    assert [r["asr_mode"] for r in results] == ["segments", "align"]
+    assert (
+        results[1]["stages"]["transcribe"]["segments"]
+        == results[0]["stages"]["transcribe"]["segments"]
+    )
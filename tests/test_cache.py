@@ -0,0 +1,50 @@
+"""测试结果缓存模块"""
+
+import os
+
+from whisper_diarization.cache import ResultCache, file_hash, make_key
+
+
+def test_file_hash(tmp_path):
+    """测试文件内容哈希只取决于内容"""
+    a = tmp_path / "a.wav"
+    b = tmp_path / "b.wav"
+    a.write_bytes(b"audio" * 1000)
+    b.write_bytes(b"audio" * 1000)
+
+    assert file_hash(a, chunk_size=7) == file_hash(b)
+
+
+def test_make_key():
+    """测试缓存键对参数敏感"""
+    assert make_key("hash", "medium", "zh") == make_key("hash", "medium", "zh")
+    assert make_key("hash", "medium", "zh") != make_key("hash", "large", "zh")
+
+
+def test_put_and_get(tmp_path):
+    """测试写入和读取缓存条目"""
+    cache = ResultCache(tmp_path)
+    segments = [{"speaker": "SPEAKER_00", "start": 0.0, "end": 1.0}]
+
+    assert cache.get("diarization", "key") is None
+    cache.put("diarization", "key", {"duration": 1.0, "segments": segments})
+
+    assert cache.get("diarization", "key") == {"duration": 1.0, "segments": segments}
+    assert cache.get("transcripts", "key") is None
+
+
+def test_evict_least_recently_used(tmp_path):
+    """测试超过大小上限时淘汰最久未使用的条目"""
+    cache = ResultCache(tmp_path, max_bytes=10**9)
+    for i, key in enumerate(["old", "used", "new"]):
+        cache.put("transcripts", key, ["x" * 100])
+        os.utime(cache._path("transcripts", key), (1000 + i, 1000 + i))
+
+    # 读取会刷新修改时间
+    cache.get("transcripts", "old")
+    cache.max_bytes = 250
+
+    assert cache.evict() == 1
+    assert cache.get("transcripts", "used") is None
+    assert cache.get("transcripts", "old") is not None
+    assert cache.get("transcripts", "new") is not None
@@ -0,0 +1,66 @@
+"""测试分声道说话人分离模块"""
+
+import torch
+
+from whisper_diarization.channel_separation import (
+    channel_turns,
+    crosstalk_ratio,
+    diarize_channels,
+)
+
+SAMPLE_RATE = 16000
+
+
+def _speech(duration: float, bursts: list[tuple[float, float]], seed: int) -> torch.Tensor:
+    """在低电平噪声上叠加若干段"语音"(较响的噪声)"""
+    generator = torch.Generator().manual_seed(seed)
+    signal = torch.randn(int(duration * SAMPLE_RATE), generator=generator) * 1e-3
+    for start, end in bursts:
+        lo, hi = int(start * SAMPLE_RATE), int(end * SAMPLE_RATE)
+        signal[lo:hi] += torch.randn(hi - lo, generator=generator) * 0.1
+    return signal
+
+
+def test_diarize_channels_call_recording():
+    """测试双声道录音按声道得到片段,漏入对方声道的低电平串音不算说话"""
+    agent = _speech(10.0, [(0.5, 2.0), (2.3, 3.0), (6.0, 8.0)], seed=0)
+    customer = _speech(10.0, [(3.5, 5.5), (7.8, 9.0)], seed=1)
+    # 坐席的声音以 -26 dB 漏入客户声道
+    waveform = torch.stack([agent, customer + agent * 0.05])
+
+    segments, stats = diarize_channels(waveform, SAMPLE_RATE)
+
+    assert stats["channels"] == 2
+    assert stats["crosstalk"] < 0.1
+    assert [(s["speaker"], s["channel"]) for s in segments] == [
+        ("SPEAKER_00", 0),
+        ("SPEAKER_01", 1),
+        ("SPEAKER_00", 0),
+        ("SPEAKER_01", 1),
+    ]
+    # 间隔 0.3 秒的两段语音合并,首尾各保留 0.2 秒余量
+    bounds = [(round(s["start"], 1), round(s["end"], 1)) for s in segments]
+    assert bounds == [(0.3, 3.2), (3.3, 5.7), (5.8, 8.2), (7.6, 9.2)]
+
+
+def test_diarize_channels_falls_back():
+    """测试单声道、两个声道内容相同时不按声道分离"""
+    mixed = _speech(5.0, [(0.5, 2.0), (3.0, 4.0)], seed=0)
+
+    duplicated, stats = diarize_channels(torch.stack([mixed, mixed * 0.9]), SAMPLE_RATE)
+    mono, _ = diarize_channels(mixed.unsqueeze(0), SAMPLE_RATE)
+
+    assert duplicated is None and stats["crosstalk"] > 0.9
+    assert mono is None
+
+
+def test_channel_turns_drops_short_speech():
+    """测试短于最短时长的语音段被丢弃,没有语音帧时串音比例为 0"""
+    active = torch.zeros(2, 100, dtype=torch.bool)
+    active[0, 10:12] = True
+    active[1, 50:80] = True
+
+    segments = channel_turns(active, 0.03, padding=0.0)
+
+    assert [(s["channel"], s["start"], s["end"]) for s in segments] == [(1, 1.5, 2.4)]
+    assert crosstalk_ratio(torch.zeros(2, 10, dtype=torch.bool)) == 0.0
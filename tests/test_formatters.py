@@ -1,6 +1,23 @@
 """测试格式化工具"""
 
-from whisper_diarization.utils.formatters import format_time, save_json, save_srt, save_text
+import json
+
+import pytest
+
+from whisper_diarization.utils.formatters import (
+    SegmentWriter,
+    format_time,
+    open_segment_writer,
+    save_json,
+    save_jsonl,
+    save_srt,
+    save_text,
+)
+
+SEGMENTS = [
+    {"speaker": "SPEAKER_00", "start": 0.0, "end": 5.0, "text": "测试文本"},
+    {"speaker": "SPEAKER_01", "start": 5.5, "end": 10.0, "text": "第二段文本"},
+]
 
 
 def test_format_time():
@@ -25,8 +42,6 @@ def test_save_json(output_dir):
     assert output_path.exists()
 
     # 验证能正确读取
-    import json
-
     with open(output_path) as f:
         loaded_data = json.load(f)
     assert loaded_data == test_data
@@ -75,3 +90,72 @@ def test_save_srt(output_dir):
     assert "00:00:00,000 --> 00:00:05,000" in content
     assert "[SPEAKER_00]" in content
     assert "测试文本" in content
+
+
+def test_segment_writer_streams(output_dir):
+    """测试增量写入: 片段写入后立即可见,结束时追加汇总"""
+    output_path = output_dir / "stream.jsonl"
+
+    with open_segment_writer(output_path, "jsonl", flush_interval=0) as writer:
+        writer.write_segment(SEGMENTS[0])
+        lines = output_path.read_text(encoding="utf-8").splitlines()
+        assert len(lines) == 1
+        assert json.loads(lines[0])["text"] == "测试文本"
+
+        writer.write_segment(SEGMENTS[1])
+        writer.finalize({"audio_file": "a.wav", "duration": 10.0, "speakers": 2, "segments": []})
+
+    records = [json.loads(line) for line in output_path.read_text(encoding="utf-8").splitlines()]
+    assert [r["type"] for r in records] == ["segment", "segment", "summary"]
+    assert records[-1]["segment_count"] == 2
+    assert "segments" not in records[-1]
+
+
+def test_srt_writer_matches_save_srt(output_dir):
+    """测试增量写入的 SRT 与一次性保存的结果一致"""
+    data = {"audio_file": "a.wav", "duration": 10.0, "speakers": 2, "segments": SEGMENTS}
+    save_srt(data, output_dir / "full.srt")
+
+    with open_segment_writer(output_dir / "stream.srt", "srt") as writer:
+        for segment in SEGMENTS:
+            writer.write_segment(segment)
+        writer.finalize(data)
+
+    assert (output_dir / "stream.srt").read_text(encoding="utf-8") == (
+        output_dir / "full.srt"
+    ).read_text(encoding="utf-8")
+
+
+def test_text_writer_summary(output_dir):
+    """测试文本增量写入在末尾写入总时长和说话人数"""
+    data = {"audio_file": "a.wav", "duration": 10.0, "speakers": 2, "segments": SEGMENTS}
+    with open_segment_writer(output_dir / "stream.txt", "text", audio_file="a.wav") as writer:
+        for segment in SEGMENTS:
+            writer.write_segment(segment)
+        writer.finalize(data)
+
+    content = (output_dir / "stream.txt").read_text(encoding="utf-8")
+    assert content.startswith("音频文件: a.wav")
+    assert content.index("第二段文本") < content.index("说话人数: 2")
+
+
+def test_segment_writer_is_abstract(output_dir):
+    """测试未实现片段写入的写入器不能创建,也不会创建输出文件"""
+    with pytest.raises(TypeError):
+        SegmentWriter(output_dir / "stream.out")
+    assert not (output_dir / "stream.out").exists()
+
+
+def test_save_jsonl(output_dir):
+    """测试 JSON Lines 格式保存"""
+    data = {"audio_file": "a.wav", "duration": 10.0, "speakers": 2, "segments": SEGMENTS}
+    save_jsonl(data, output_dir / "test.jsonl")
+
+    lines = (output_dir / "test.jsonl").read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 3
+
+
+def test_json_not_streamable(output_dir):
+    """测试 JSON 格式不支持增量写入"""
+    with pytest.raises(ValueError):
+        open_segment_writer(output_dir / "test.json", "json")
@@ -0,0 +1,92 @@
+"""测试性能埋点模块"""
+
+import json
+import threading
+
+import pytest
+
+from whisper_diarization import instrumentation
+from whisper_diarization.instrumentation import Tracer, count, get_tracer, set_tracer, span
+
+
+@pytest.fixture
+def tracer():
+    """设置当前埋点记录器,测试结束后恢复"""
+    tracer = Tracer()
+    set_tracer(tracer)
+    yield tracer
+    set_tracer(None)
+
+
+def test_span_records_event(tracer):
+    """测试 span 记录名称、耗时、属性和内存"""
+    with span("decode", segment=3) as attrs:
+        attrs["speaker"] = "SPEAKER_00"
+
+    (event,) = tracer.events
+    assert event["name"] == "decode"
+    assert event["duration"] >= 0
+    assert event["end"] >= event["start"]
+    assert event["attrs"] == {"segment": 3, "speaker": "SPEAKER_00"}
+    assert event["thread"] == threading.get_ident()
+    assert event["rss"] > 0
+
+
+def test_span_records_on_error(tracer):
+    """测试发生异常时 span 仍被记录"""
+    with pytest.raises(RuntimeError), span("load"):
+        raise RuntimeError("boom")
+
+    assert [e["name"] for e in tracer.events] == ["load"]
+
+
+def test_hooks_and_counters(tracer):
+    """测试回调和计数器"""
+    seen = []
+    tracer.add_hook(lambda event: seen.append(event["name"]))
+
+    with span("mel"), span("encode"):
+        pass
+    count("segments_transcribed")
+    count("audio_seconds_transcribed", 2.5)
+    count("audio_seconds_transcribed", 1.5)
+
+    assert seen == ["encode", "mel"]
+    assert tracer.counters == {"segments_transcribed": 1, "audio_seconds_transcribed": 4.0}
+
+    summary = tracer.summary()
+    assert summary["mel"]["count"] == 1
+    assert summary["mel"]["total"] >= summary["encode"]["total"]
+
+
+def test_disabled_is_noop():
+    """测试未设置埋点记录器时不记录"""
+    set_tracer(None)
+    assert get_tracer() is None
+
+    with span("decode", segment=1) as attrs:
+        attrs["extra"] = True
+    count("segments_transcribed")
+
+    assert instrumentation.get_tracer() is None
+
+
+def test_dump(tracer, tmp_path):
+    """测试导出 JSON 和 Chrome trace"""
+    with span("diarize"):
+        pass
+    tracer.count("cache_hits")
+
+    tracer.dump_json(tmp_path / "trace.json")
+    data = json.loads((tmp_path / "trace.json").read_text(encoding="utf-8"))
+    assert data["events"][0]["name"] == "diarize"
+    assert data["counters"] == {"cache_hits": 1}
+    assert data["peak_rss"] > 0
+
+    tracer.dump_chrome_trace(tmp_path / "chrome.json")
+    chrome = json.loads((tmp_path / "chrome.json").read_text(encoding="utf-8"))
+    phases = {e["ph"] for e in chrome["traceEvents"]}
+    assert phases == {"X", "C"}
+    complete = next(e for e in chrome["traceEvents"] if e["ph"] == "X")
+    assert complete["name"] == "diarize"
+    assert complete["dur"] >= 0
@@ -0,0 +1,226 @@
+"""测试实时流模块"""
+
+import io
+
+import numpy as np
+import pytest
+import torch
+from pyannote.core import Annotation, Segment
+
+from whisper_diarization.live import LiveTranscriber, read_pcm
+from whisper_diarization.speech_recognition import FALLBACK_TEMPERATURES
+
+SAMPLE_RATE = 16000
+
+
+class ScriptedPipeline:
+    """
+    按波形幅度给出说话人的 pipeline 替身
+
+    幅度 0.1 为一个说话人,0.2 为另一个,0 为静音;局部标签按窗口内出现顺序命名,
+    因此不同窗口中同一说话人的局部标签不同,需要靠中心向量关联。
+    """
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, audio_input, return_embeddings=False):
+        self.calls += 1
+        waveform = audio_input["waveform"][0]
+        frame = audio_input["sample_rate"] // 10
+        usable = waveform.shape[0] // frame * frame
+        levels = torch.round(waveform[:usable].reshape(-1, frame).mean(dim=1) * 10).int().tolist()
+
+        annotation = Annotation()
+        names: dict[int, str] = {}
+        start = None
+        for i, level in enumerate([*levels, 0]):
+            if start is not None and level != levels[start]:
+                label = names.setdefault(levels[start], f"local_{len(names)}")
+                annotation[Segment(start / 10, i / 10)] = label
+                start = None
+            if start is None and level:
+                start = i
+
+        labels = annotation.labels()
+        level_of = {name: level for level, name in names.items()}
+        embeddings = np.array([[1.0, 0.0] if level_of[lb] == 1 else [0.0, 1.0] for lb in labels])
+        return annotation, embeddings.reshape(len(labels), 2)
+
+
+class FakeDiarizer:
+    def __init__(self):
+        self.pipeline = ScriptedPipeline()
+
+
+class FakeRecognizer:
+    """返回片段时长的识别器替身"""
+
+    def __init__(self):
+        self.calls = []
+
+    def transcribe_batch(
+        self, audio_inputs, language=None, initial_prompt=None, temperatures=(0.0,)
+    ):
+        self.calls.append((len(audio_inputs), temperatures))
+        return [f"{audio.shape[0] / SAMPLE_RATE:.1f}s" for audio in audio_inputs]
+
+
+def make_audio(script: list[tuple[float, float]]) -> torch.Tensor:
+    """按 (幅度, 时长) 列表生成波形"""
+    return torch.cat([torch.full((int(d * SAMPLE_RATE),), level) for level, d in script])
+
+
+def make_engine(events: list, **kwargs) -> LiveTranscriber:
+    options = {"window": 30.0, "step": 1.0, "settle": 0.5, "max_segment": 20.0}
+    options.update(kwargs)
+    return LiveTranscriber(
+        FakeDiarizer(),
+        FakeRecognizer(),
+        sample_rate=SAMPLE_RATE,
+        on_segment=events.append,
+        **options,
+    )
+
+
+def feed_all(engine: LiveTranscriber, audio: torch.Tensor, chunk: float = 0.1) -> None:
+    size = int(chunk * SAMPLE_RATE)
+    for i in range(0, audio.shape[0], size):
+        engine.feed(audio[i : i + size])
+
+
+SCRIPT = [(0.1, 5.0), (0.0, 1.0), (0.2, 4.0), (0.0, 2.0), (0.1, 4.0), (0.0, 2.0)]
+
+
+def test_read_pcm_handles_partial_samples():
+    """测试读取跨越样本边界的数据块"""
+    samples = np.array([0, 16384, -32768, 32767], dtype=np.int16).tobytes()
+
+    class Trickle(io.RawIOBase):
+        def __init__(self, data):
+            self.data = data
+
+        def read(self, size=-1):
+            piece, self.data = self.data[:3], self.data[3:]
+            return piece
+
+    chunks = list(read_pcm(Trickle(samples), SAMPLE_RATE))
+
+    result = torch.cat(chunks)
+    assert result.tolist() == pytest.approx([0.0, 0.5, -1.0, 32767 / 32768])
+
+
+def test_read_pcm_f32le():
+    """测试 float32 格式"""
+    samples = np.array([0.25, -0.5], dtype=np.float32).tobytes()
+
+    chunks = list(read_pcm(io.BytesIO(samples), SAMPLE_RATE, fmt="f32le"))
+
+    assert torch.cat(chunks).tolist() == [0.25, -0.5]
+
+
+def test_read_pcm_invalid_format():
+    """测试不支持的格式"""
+    with pytest.raises(ValueError):
+        list(read_pcm(io.BytesIO(b""), SAMPLE_RATE, fmt="mp3"))
+
+
+def test_live_final_segments_with_consistent_speakers():
+    """测试滚动窗口输出的最终片段和跨窗口一致的说话人标签"""
+    events = []
+    engine = make_engine(events)
+
+    feed_all(engine, make_audio(SCRIPT))
+    engine.flush()
+
+    finals = [e for e in events if e["final"]]
+    assert [s["speaker"] for s in finals] == ["SPEAKER_00", "SPEAKER_01", "SPEAKER_00"]
+    assert [(s["start"], s["end"]) for s in finals] == [
+        pytest.approx((0.0, 5.0)),
+        pytest.approx((6.0, 10.0)),
+        pytest.approx((12.0, 16.0)),
+    ]
+    assert [s["text"] for s in finals] == ["5.0s", "4.0s", "4.0s"]
+    assert engine.segments == [
+        {k: s[k] for k in ("speaker", "start", "end", "text")} for s in finals
+    ]
+    # 最终结果使用温度回退,临时结果只做贪心解码
+    calls = engine.recognizer.calls
+    assert sum(n for n, temps in calls if temps == FALLBACK_TEMPERATURES) == 3
+    assert all(temps == (0.0,) for n, temps in calls if temps != FALLBACK_TEMPERATURES)
+
+
+def test_live_emits_before_stream_ends():
+    """测试片段结束后在 step + settle 内输出最终结果,之前输出临时结果"""
+    events = []
+    engine = make_engine(events)
+    emitted_at = []
+    engine.on_segment = lambda e: (events.append(e), emitted_at.append(engine.now))
+
+    feed_all(engine, make_audio(SCRIPT))
+
+    first_final = next(i for i, e in enumerate(events) if e["final"])
+    assert emitted_at[first_final] <= 5.0 + engine.settle + engine.step
+    partials = [e for e in events[:first_final] if not e["final"]]
+    assert partials
+    assert all(e["speaker"] == "SPEAKER_00" and e["end"] <= 5.0 for e in partials)
+    assert all(e["latency"] >= 0 for e in events)
+
+
+def test_live_splits_long_turns():
+    """测试超过 max_segment 的进行中片段被切分"""
+    events = []
+    engine = make_engine(events, max_segment=8.0, partial_interval=0)
+
+    feed_all(engine, make_audio([(0.1, 25.0)]))
+    engine.flush()
+
+    assert all(e["final"] for e in events)
+    finals = engine.segments
+    assert len(finals) > 1
+    assert all(s["end"] - s["start"] <= 8.0 + 1e-6 for s in finals)
+    assert finals[0]["start"] == pytest.approx(0.0)
+    assert finals[-1]["end"] == pytest.approx(25.0)
+    for previous, current in zip(finals, finals[1:]):
+        assert current["start"] == pytest.approx(previous["end"])
+
+
+def test_live_backlog_is_not_dropped():
+    """测试一次接收超过窗口时长的积压音频时按步处理,窗口之前的片段不会丢失"""
+    events = []
+    engine = make_engine(events, partial_interval=0)
+    script = SCRIPT * 3 + [(0.2, 6.0)]
+
+    engine.feed(make_audio(script))
+    engine.flush()
+
+    streamed = make_engine([], partial_interval=0)
+    feed_all(streamed, make_audio(script))
+    streamed.flush()
+    finals = engine.segments
+    assert len(finals) == 10
+    assert finals[0]["start"] == pytest.approx(0.0)
+    assert finals[-1]["end"] == pytest.approx(60.0)
+    assert [s["speaker"] for s in finals] == [s["speaker"] for s in streamed.segments]
+    for s, expected in zip(finals, streamed.segments):
+        assert (s["start"], s["end"]) == pytest.approx((expected["start"], expected["end"]))
+
+
+def test_live_run_stream():
+    """测试从字节流读取并处理到结束"""
+    events = []
+    engine = make_engine(events, partial_interval=0)
+    pcm = (make_audio(SCRIPT).numpy() * 32767).astype(np.int16).tobytes()
+
+    segments = engine.run(io.BytesIO(pcm))
+
+    assert [s["speaker"] for s in segments] == ["SPEAKER_00", "SPEAKER_01", "SPEAKER_00"]
+    summary = engine.summary()
+    assert summary["speakers"] == 2
+    assert summary["duration"] == pytest.approx(18.0)
+
+
+def test_live_invalid_window():
+    """测试窗口小于切分和确认所需时长时报错"""
+    with pytest.raises(ValueError):
+        LiveTranscriber(FakeDiarizer(), FakeRecognizer(), window=10.0, max_segment=20.0)
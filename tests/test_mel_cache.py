@@ -0,0 +1,52 @@
+"""测试 log-mel 频谱缓存模块"""
+
+import pytest
+import torch
+import whisper
+
+from whisper_diarization.mel_cache import MelCache
+
+SAMPLE_RATE = whisper.audio.SAMPLE_RATE
+
+
+@pytest.fixture
+def waveform():
+    """40 秒幅度逐渐增大的噪声"""
+    generator = torch.Generator().manual_seed(0)
+    samples = 40 * SAMPLE_RATE
+    return (torch.randn(samples, generator=generator) * torch.linspace(0.01, 0.5, samples))[None]
+
+
+@pytest.mark.parametrize("start, end", [(0.0, 5.0), (12.34, 39.0), (30.0, 40.0)])
+def test_segment_matches_whisper(waveform, start, end):
+    """测试切片结果与 Whisper 对片段单独计算的 mel 一致(首尾各两帧除外)"""
+    cache = MelCache(waveform, chunk_frames=700)
+    audio = waveform[0, int(start * SAMPLE_RATE) : int(end * SAMPLE_RATE)]
+    expected = whisper.log_mel_spectrogram(whisper.pad_or_trim(audio))
+    frames = audio.shape[0] // whisper.audio.HOP_LENGTH
+
+    mel = cache.segment(start, end)
+
+    assert mel.shape == expected.shape
+    assert torch.allclose(mel[:, 2 : frames - 2], expected[:, 2 : frames - 2], atol=1e-4)
+    assert torch.allclose(mel[:, frames + 2 :], expected[:, frames + 2 :], atol=1e-4)
+
+
+def test_chunks_computed_lazily(waveform):
+    """测试按块计算且分块边界不影响结果"""
+    chunked = MelCache(waveform, chunk_frames=500)
+    whole = MelCache(waveform, chunk_frames=10**6)
+
+    mel = chunked.segment(4.0, 8.0)
+
+    assert sorted(chunked._chunks) == [0, 1]
+    assert torch.allclose(mel, whole.segment(4.0, 8.0), atol=1e-5)
+
+
+def test_silence_segment():
+    """测试静音片段填充为全零音频对应的值"""
+    cache = MelCache(torch.zeros(1, 5 * SAMPLE_RATE))
+
+    mel = cache.segment(1.0, 2.0)
+
+    assert torch.allclose(mel, torch.full_like(mel, -1.5))
@@ -0,0 +1,25 @@
+"""测试识别质量指标"""
+
+import pytest
+
+from whisper_diarization.utils.metrics import character_error_rate, edit_distance
+
+
+def test_edit_distance():
+    """测试替换、插入、删除"""
+    assert edit_distance("今天天气好", "今天天气好") == 0
+    assert edit_distance("今天天气好", "今天天汽好") == 1
+    assert edit_distance("今天天气好", "今天气好啊") == 2
+    assert edit_distance("", "你好") == 2
+
+
+def test_character_error_rate_ignores_punctuation():
+    """测试忽略空白和标点"""
+    assert character_error_rate("你好,世界。", "你好 世界") == 0.0
+    assert character_error_rate("你好世界", "你好世") == pytest.approx(0.25)
+
+
+def test_character_error_rate_empty_reference():
+    """测试参考文本为空"""
+    assert character_error_rate("", "") == 0.0
+    assert character_error_rate("。", "嗯") == 1.0
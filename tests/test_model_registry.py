@@ -0,0 +1,41 @@
+"""测试模型注册表"""
+
+import pytest
+
+from whisper_diarization import config, model_registry
+
+
+@pytest.fixture(autouse=True)
+def empty_registry(monkeypatch):
+    """每个测试使用空的注册表"""
+    monkeypatch.setattr(config, "MODEL_CACHE_SIZE", 2)
+    model_registry.clear()
+    yield
+    model_registry.clear()
+
+
+def test_get_model_caches_instance():
+    """测试同一键只加载一次"""
+    loads = []
+
+    def loader():
+        loads.append(1)
+        return object()
+
+    first = model_registry.get_model(("whisper", "tiny", "cpu"), loader)
+    second = model_registry.get_model(("whisper", "tiny", "cpu"), loader)
+
+    assert first is second
+    assert len(loads) == 1
+
+
+def test_get_model_evicts_least_recently_used():
+    """测试超过容量时淘汰最久未使用的模型"""
+    model_registry.get_model(("a",), object)
+    model_registry.get_model(("b",), object)
+    model_registry.get_model(("a",), object)
+    model_registry.get_model(("c",), object)
+
+    assert model_registry.is_loaded(("a",))
+    assert not model_registry.is_loaded(("b",))
+    assert model_registry.is_loaded(("c",))
@@ -0,0 +1,97 @@
+"""测试多进程语音识别模块"""
+
+import os
+
+import pytest
+import torch
+
+from whisper_diarization.parallel_asr import ParallelTranscriber, split_tasks
+
+SAMPLE_RATE = 16000
+
+
+class LevelRecognizer:
+    """返回片段平均幅度和所在进程的识别器替身,在工作进程中由 spawn 导入本模块创建"""
+
+    def __init__(self, model_name=None):
+        self.model_name = model_name
+
+    def create_mel_cache(self, waveform):
+        return "cache"
+
+    def transcribe_segments(
+        self, waveform, segments, sample_rate, batch_size=1, merge_gap=None, mel_cache=None
+    ):
+        results = []
+        for segment in segments:
+            start = int(segment["start"] * sample_rate)
+            end = int(segment["end"] * sample_rate)
+            level = waveform[0, start:end].mean().item()
+            text = f"{self.model_name}:{level:.1f}:{mel_cache}:{os.getpid()}"
+            results.append({**segment, "text": text})
+        return results
+
+
+def make_segments(count: int, length: float = 1.0) -> list[dict]:
+    return [
+        {"speaker": f"SPEAKER_{i % 2:02d}", "start": i * length, "end": (i + 1) * length}
+        for i in range(count)
+    ]
+
+
+def test_split_tasks_contiguous_and_balanced():
+    """测试按时长切分为连续分组"""
+    segments = make_segments(8)
+
+    tasks = split_tasks(segments, 4)
+
+    assert tasks == [[0, 1], [2, 3], [4, 5], [6, 7]]
+    assert split_tasks(segments, 1) == [list(range(8))]
+    assert split_tasks([], 4) == []
+
+
+def test_split_tasks_long_segment():
+    """测试超过平均时长的片段单独成组"""
+    segments = [{"start": 0.0, "end": 10.0}] + [
+        {"start": 10.0 + i, "end": 11.0 + i} for i in range(4)
+    ]
+
+    tasks = split_tasks(segments, 2)
+
+    assert tasks[0] == [0]
+    assert [i for task in tasks for i in task] == list(range(5))
+
+
+def test_parallel_transcriber_orders_results():
+    """测试工作进程读取共享内存波形,结果和回调按片段顺序返回"""
+    segments = make_segments(10)
+    # 第 i 秒的幅度为 i / 10
+    waveform = torch.cat(
+        [torch.full((SAMPLE_RATE,), i / 10) for i in range(len(segments))]
+    ).unsqueeze(0)
+    emitted = []
+
+    with ParallelTranscriber(
+        2, threads_per_worker=1, factory=LevelRecognizer, model_name="tiny"
+    ) as transcriber:
+        results = transcriber.transcribe_segments(
+            waveform, segments, SAMPLE_RATE, on_segment=emitted.append
+        )
+
+    levels = [r["text"].split(":")[:3] for r in results]
+    assert levels == [["tiny", f"{i / 10:.1f}", "cache"] for i in range(len(segments))]
+    assert [r["start"] for r in results] == [s["start"] for s in segments]
+    assert emitted == results
+    assert os.getpid() not in {int(r["text"].rsplit(":", 1)[1]) for r in results}
+    assert "text" not in segments[0]
+
+
+@pytest.mark.parametrize("mel_cache", [True, False])
+def test_parallel_transcriber_mel_cache_option(mel_cache):
+    """测试关闭 mel 缓存时工作进程不创建缓存"""
+    with ParallelTranscriber(1, threads_per_worker=1, factory=LevelRecognizer) as transcriber:
+        results = transcriber.transcribe_segments(
+            torch.zeros(1, SAMPLE_RATE), make_segments(1), SAMPLE_RATE, mel_cache=mel_cache
+        )
+
+    assert results[0]["text"].split(":")[2] == ("cache" if mel_cache else "None")
@@ -0,0 +1,345 @@
+"""测试处理流程模块"""
+
+import threading
+
+import pytest
+import torch
+
+from whisper_diarization.pipeline import (
+    PipelineOptions,
+    _diarize_and_transcribe_pipelined,
+    _transcripts_cache_key,
+)
+
+
+class FakeDiarizer:
+    """逐窗口产出片段的说话人分离替身"""
+
+    def __init__(self, fail=False):
+        self.fail = fail
+
+    def diarize_windows(self, waveform, sample_rate):
+        yield [{"speaker": "SPEAKER_00", "start": 0.0, "end": 1.0}]
+        if self.fail:
+            raise RuntimeError("diarization failed")
+        yield [
+            {"speaker": "SPEAKER_01", "start": 2.0, "end": 3.0},
+            {"speaker": "SPEAKER_00", "start": 1.5, "end": 2.5},
+        ]
+
+
+class FakeRecognizer:
+    """记录调用的语音识别替身"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def create_mel_cache(self, waveform):
+        return None
+
+    def transcribe_segments(
+        self,
+        waveform,
+        segments,
+        sample_rate,
+        batch_size=1,
+        merge_gap=None,
+        mel_cache=None,
+        on_segment=None,
+    ):
+        self.calls += 1
+        results = [{**segment, "text": segment["speaker"]} for segment in segments]
+        for result in results:
+            if on_segment is not None:
+                on_segment(result)
+        return results
+
+
+def test_pipelined_collects_all_turns():
+    """测试流水线模式识别全部片段并按时间排序"""
+    recognizer = FakeRecognizer()
+
+    segments, results = _diarize_and_transcribe_pipelined(
+        torch.zeros(1, 16000 * 3), 16000, FakeDiarizer(), recognizer, PipelineOptions()
+    )
+
+    assert [s["start"] for s in segments] == [0.0, 1.5, 2.0]
+    assert [r["text"] for r in results] == ["SPEAKER_00", "SPEAKER_00", "SPEAKER_01"]
+    assert recognizer.calls >= 1
+
+
+def test_pipelined_propagates_diarization_error():
+    """测试后台说话人分离线程的异常会在主线程抛出"""
+    with pytest.raises(RuntimeError):
+        _diarize_and_transcribe_pipelined(
+            torch.zeros(1, 16000),
+            16000,
+            FakeDiarizer(fail=True),
+            FakeRecognizer(),
+            PipelineOptions(),
+        )
+
+
+def test_pipelined_stops_diarization_when_transcription_fails(monkeypatch):
+    """测试识别出错时后台说话人分离线程退出,不会阻塞在已满的队列上"""
+    from whisper_diarization import config
+
+    class ManyTurnsDiarizer:
+        def diarize_windows(self, waveform, sample_rate):
+            for i in range(20):
+                yield [{"speaker": "SPEAKER_00", "start": float(i), "end": i + 0.5}]
+
+    class FailingRecognizer(FakeRecognizer):
+        def transcribe_segments(self, *args, **kwargs):
+            raise RuntimeError("transcription failed")
+
+    monkeypatch.setattr(config, "PIPELINE_QUEUE_SIZE", 2)
+    with pytest.raises(RuntimeError, match="transcription failed"):
+        _diarize_and_transcribe_pipelined(
+            torch.zeros(1, 16000 * 20),
+            16000,
+            ManyTurnsDiarizer(),
+            FailingRecognizer(),
+            PipelineOptions(),
+        )
+
+    assert not any(t.name == "diarization" for t in threading.enumerate())
+
+
+def test_process_audio_uses_cache(tmp_path, fake_pipeline):
+    """测试缓存命中时跳过对应阶段,只更换 Whisper 模型时不重新分离"""
+    from whisper_diarization import pipeline
+
+    calls = []
+
+    class Diarizer:
+        def __init__(self, hf_token=None, offline=False):
+            calls.append("load-diarization")
+
+        def diarize(self, waveform, sample_rate=None):
+            calls.append("diarize")
+            return [{"speaker": "SPEAKER_00", "start": 0.0, "end": 1.0}]
+
+    def create_recognizer(options):
+        calls.append(f"load-{options.whisper_model}")
+        return FakeRecognizer()
+
+    audio_path = fake_pipeline(Diarizer, create_recognizer, torch.zeros(1, 16000))
+    options = PipelineOptions(whisper_model="tiny", cache_dir=str(tmp_path / "cache"))
+
+    first = pipeline.process_audio(audio_path, options)
+    second = pipeline.process_audio(audio_path, options)
+    assert calls == ["load-diarization", "diarize", "load-tiny"]
+    assert second["segments"] == first["segments"]
+    assert second["duration"] == 1.0
+
+    calls.clear()
+    pipeline.process_audio(
+        audio_path, PipelineOptions(whisper_model="base", cache_dir=options.cache_dir)
+    )
+    assert calls == ["load-base"]
+
+
+def test_process_audio_vad(tmp_path, fake_pipeline):
+    """测试语音活动检测跳过静音片段并裁剪首尾静音"""
+    from whisper_diarization import pipeline
+
+    class Diarizer:
+        def diarize(self, waveform, sample_rate=None):
+            return [
+                {"speaker": "SPEAKER_00", "start": 0.0, "end": 1.5},
+                {"speaker": "SPEAKER_01", "start": 2.0, "end": 3.0},
+            ]
+
+    waveform = torch.zeros(1, 16000 * 3)
+    waveform[0, 8000:16000] = 0.5
+    audio_path = fake_pipeline(Diarizer(), FakeRecognizer(), waveform)
+    options = PipelineOptions(vad=True, cache_dir=str(tmp_path / "cache"))
+
+    for _ in range(2):
+        result = pipeline.process_audio(audio_path, options)
+        (segment,) = result["segments"]
+        assert segment["speaker"] == "SPEAKER_00"
+        assert segment["start"] == pytest.approx(0.3, abs=0.05)
+        assert segment["end"] == pytest.approx(1.2, abs=0.05)
+        assert result["speakers"] == 2
+
+
+def test_transcripts_cache_key_depends_on_backend():
+    """测试不同识别后端的结果分别缓存"""
+    segments = [{"speaker": "SPEAKER_00", "start": 0.0, "end": 1.0}]
+
+    default = _transcripts_cache_key("hash", PipelineOptions(), segments)
+    faster = _transcripts_cache_key("hash", PipelineOptions(asr_backend="faster-whisper"), segments)
+
+    assert default != faster
+
+
+def test_process_audio_parallel_workers(fake_pipeline, monkeypatch):
+    """测试 asr_workers 大于 1 时使用多进程识别器,低内存模式下回退到单进程"""
+    from whisper_diarization import pipeline
+
+    class Diarizer:
+        def diarize(self, waveform, sample_rate=None):
+            return [{"speaker": "SPEAKER_00", "start": 0.0, "end": 1.0}]
+
+    parallel = FakeRecognizer()
+    single = FakeRecognizer()
+    audio_path = fake_pipeline(Diarizer(), single, torch.zeros(1, 16000))
+    monkeypatch.setattr(pipeline, "_get_parallel_transcriber", lambda options: parallel)
+    pipeline.process_audio(audio_path, PipelineOptions(asr_workers=2, use_cache=False))
+    pipeline.process_audio(
+        audio_path, PipelineOptions(asr_workers=2, low_memory=True, use_cache=False)
+    )
+
+    assert parallel.calls == 1
+    assert single.calls == 1
+
+
+def test_align_mode_cache_keys():
+    """测试对齐模式复用顺序模式的说话人分离缓存,识别结果单独缓存"""
+    from whisper_diarization.pipeline import _diarization_cache_key
+
+    segments = [{"speaker": "SPEAKER_00", "start": 0.0, "end": 1.0}]
+    sequential = PipelineOptions()
+    align = PipelineOptions(mode="align")
+
+    assert _diarization_cache_key("hash", sequential) == _diarization_cache_key("hash", align)
+    assert _transcripts_cache_key("hash", sequential, segments) != _transcripts_cache_key(
+        "hash", align, segments
+    )
+
+
+def test_process_audio_align_mode(fake_pipeline):
+    """测试对齐模式调用整段识别"""
+    from whisper_diarization import pipeline
+
+    class Diarizer:
+        def diarize(self, waveform, sample_rate=None):
+            return [
+                {"speaker": "SPEAKER_00", "start": 0.0, "end": 1.0},
+                {"speaker": "SPEAKER_01", "start": 1.0, "end": 2.0},
+            ]
+
+    class Recognizer(FakeRecognizer):
+        def transcribe_aligned(self, waveform, segments, sample_rate, on_segment=None):
+            results = [{**s, "text": f"aligned-{s['speaker']}"} for s in segments]
+            for result in results:
+                if on_segment is not None:
+                    on_segment(result)
+            return results
+
+    recognizer = Recognizer()
+    audio_path = fake_pipeline(Diarizer(), recognizer, torch.zeros(1, 32000))
+    emitted = []
+    result = pipeline.process_audio(
+        audio_path, PipelineOptions(mode="align", use_cache=False), on_segment=emitted.append
+    )
+
+    assert [s["text"] for s in result["segments"]] == ["aligned-SPEAKER_00", "aligned-SPEAKER_01"]
+    assert emitted == result["segments"]
+    assert recognizer.calls == 0
+
+
+def test_process_audio_chunked_diarization(fake_pipeline):
+    """测试指定分块时长时使用分块说话人分离,缓存键随分块参数变化"""
+    from whisper_diarization import pipeline
+    from whisper_diarization.pipeline import _diarization_cache_key
+
+    calls = []
+
+    class Diarizer:
+        def diarize_chunked(self, waveform, sample_rate, chunk=None, workers=1):
+            calls.append((chunk, workers))
+            return [{"speaker": "SPEAKER_00", "start": 0.0, "end": 1.0}]
+
+    audio_path = fake_pipeline(Diarizer(), FakeRecognizer(), torch.zeros(1, 16000))
+    options = PipelineOptions(diarization_chunk=300.0, diarization_workers=2, use_cache=False)
+    result = pipeline.process_audio(audio_path, options)
+
+    assert calls == [(300.0, 2)]
+    assert result["speakers"] == 1
+    assert _diarization_cache_key("hash", options) != _diarization_cache_key(
+        "hash", PipelineOptions()
+    )
+
+
+def test_process_audio_speaker_index(tmp_path, fake_pipeline):
+    """测试启用说话人索引时把匹配的说话人替换为登记的名称,缓存命中时仍可识别"""
+    from whisper_diarization import pipeline
+    from whisper_diarization.speaker_index import SpeakerIndex
+
+    calls = []
+
+    class Diarizer:
+        def diarize(self, waveform, sample_rate=None, return_embeddings=False):
+            calls.append(return_embeddings)
+            segments = [
+                {"speaker": "SPEAKER_00", "start": 0.0, "end": 1.0},
+                {"speaker": "SPEAKER_01", "start": 1.0, "end": 2.0},
+            ]
+            return segments, {"SPEAKER_00": [0.0, 1.0], "SPEAKER_01": [1.0, 0.1]}
+
+    audio_path = fake_pipeline(Diarizer(), FakeRecognizer(), torch.zeros(1, 32000))
+    SpeakerIndex(tmp_path / "speakers").add("张三", [1.0, 0.0])
+    options = PipelineOptions(
+        speaker_index=str(tmp_path / "speakers"), cache_dir=str(tmp_path / "cache")
+    )
+
+    first = pipeline.process_audio(audio_path, options)
+    second = pipeline.process_audio(audio_path, options)
+
+    assert calls == [True]
+    for result in (first, second):
+        assert [s["speaker"] for s in result["segments"]] == ["SPEAKER_00", "张三"]
+        assert result["identities"]["SPEAKER_01"]["name"] == "张三"
+        assert set(result["statistics"]) == {"SPEAKER_00", "张三"}
+
+
+def test_process_audio_split_channels(fake_pipeline):
+    """测试分声道模式按声道识别且不加载 pyannote,声道内容相同时回退到常规说话人分离"""
+    from whisper_diarization import pipeline
+
+    diarized = []
+
+    class Diarizer:
+        def diarize(self, waveform, sample_rate=None):
+            diarized.append(waveform.shape[0])
+            return [{"speaker": "SPEAKER_00", "start": 0.0, "end": 2.0}]
+
+    class Recognizer(FakeRecognizer):
+        def transcribe_segments(self, waveform, segments, sample_rate, on_segment=None, **kwargs):
+            # 以片段所在声道的波形电平作为识别文本
+            results = [{**s, "text": f"{waveform.abs().max():.1f}"} for s in segments]
+            for result in results:
+                if on_segment is not None:
+                    on_segment(result)
+            return results
+
+    sample_rate = 16000
+    t = torch.arange(4 * sample_rate)
+    agent_speaking = (t < sample_rate) | (t > 3.3 * sample_rate)
+    agent = torch.where(agent_speaking, 0.5, 1e-4) * torch.sin(t * 0.3)
+    customer = torch.where((t > 2 * sample_rate) & (t < 3 * sample_rate), 0.2, 1e-4)
+    customer = customer * torch.sin(t * 0.2)
+    diarizer, recognizer = Diarizer(), Recognizer()
+
+    audio_path = fake_pipeline(diarizer, recognizer, torch.stack([agent, customer]), sample_rate)
+    options = PipelineOptions(split_channels=True, use_cache=False)
+    streamed = []
+    result = pipeline.process_audio(audio_path, options, on_segment=streamed.append)
+
+    assert diarized == []
+    assert [(s["speaker"], s["channel"], s["text"]) for s in result["segments"]] == [
+        ("SPEAKER_00", 0, "0.5"),
+        ("SPEAKER_01", 1, "0.2"),
+        ("SPEAKER_00", 0, "0.5"),
+    ]
+    # 流式输出按时间顺序,而不是按声道顺序
+    assert streamed == result["segments"]
+
+    fake_pipeline(diarizer, recognizer, torch.stack([agent, agent]), sample_rate)
+    result = pipeline.process_audio(audio_path, options)
+
+    assert diarized == [1]
+    assert [s["speaker"] for s in result["segments"]] == ["SPEAKER_00"]
@@ -0,0 +1,98 @@
+"""测试 Whisper 模型量化"""
+
+import torch
+import whisper
+from whisper.model import ModelDimensions, Whisper
+
+from whisper_diarization import quantization
+
+DIMS = ModelDimensions(
+    n_mels=80,
+    n_audio_ctx=1500,
+    n_audio_state=64,
+    n_audio_head=2,
+    n_audio_layer=1,
+    n_vocab=51865,
+    n_text_ctx=448,
+    n_text_state=64,
+    n_text_head=2,
+    n_text_layer=1,
+)
+
+
+def make_model() -> Whisper:
+    """随机初始化的小型 Whisper 模型"""
+    torch.manual_seed(0)
+    model = Whisper(DIMS)
+    with torch.no_grad():
+        model.decoder.positional_embedding.normal_(0, 0.01)
+    return model.eval()
+
+
+def test_quantize_dynamic_whisper():
+    """测试全部 Linear 层被替换为动态量化层,输出与 FP32 接近"""
+    model = make_model()
+    mel = torch.randn(1, 80, 3000)
+    with torch.no_grad():
+        expected = model.embed_audio(mel)
+
+    quantized = quantization.quantize_dynamic_whisper(model)
+
+    linear_types = (torch.nn.Linear, whisper.model.Linear)
+    assert not any(type(m) in linear_types for m in quantized.modules())
+    assert any(isinstance(m, torch.ao.nn.quantized.dynamic.Linear) for m in quantized.modules())
+    with torch.no_grad():
+        result = quantized.embed_audio(mel)
+    assert torch.allclose(result, expected, atol=0.2)
+
+    options = whisper.DecodingOptions(
+        language="zh", without_timestamps=True, fp16=False, sample_len=3
+    )
+    (decoded,) = whisper.decode(quantized, result, options)
+    assert isinstance(decoded.text, str)
+
+
+def test_load_quantized_whisper_caches_on_disk(tmp_path, monkeypatch):
+    """测试量化模型只转换一次,之后从磁盘缓存加载"""
+    loads = []
+
+    def load_model(name, device=None):
+        loads.append(name)
+        return make_model()
+
+    monkeypatch.setattr(quantization.whisper, "load_model", load_model)
+
+    first = quantization.load_quantized_whisper("tiny", cache_dir=tmp_path)
+    second = quantization.load_quantized_whisper("tiny", cache_dir=tmp_path)
+
+    assert loads == ["tiny"]
+    assert quantization.quantized_model_path("tiny", tmp_path).exists()
+    mel = torch.randn(1, 80, 3000)
+    with torch.no_grad():
+        assert torch.equal(first.embed_audio(mel), second.embed_audio(mel))
+
+
+def test_load_quantized_whisper_recovers_from_corrupt_cache(tmp_path, monkeypatch):
+    """测试缓存文件损坏时重新转换"""
+    monkeypatch.setattr(quantization.whisper, "load_model", lambda name, device=None: make_model())
+    path = quantization.quantized_model_path("tiny", tmp_path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"broken")
+
+    model = quantization.load_quantized_whisper("tiny", cache_dir=tmp_path)
+
+    assert any(isinstance(m, torch.ao.nn.quantized.dynamic.Linear) for m in model.modules())
+    assert path.stat().st_size > len(b"broken")
+
+
+def test_get_whisper_model_quantize_key(monkeypatch):
+    """测试量化模型与原始模型分别缓存"""
+    from whisper_diarization import model_registry
+
+    model_registry.clear()
+    monkeypatch.setattr(quantization, "load_quantized_whisper", lambda name: "quantized")
+    monkeypatch.setattr(whisper, "load_model", lambda name, device=None: "fp32")
+
+    assert model_registry.get_whisper_model("tiny", "cpu") == "fp32"
+    assert model_registry.get_whisper_model("tiny", "cpu", quantize=True) == "quantized"
+    model_registry.clear()
@@ -0,0 +1,30 @@
+"""测试 CPU 资源管理模块"""
+
+import torch
+
+from whisper_diarization.resources import available_cores, split_cores, stage_threads
+
+
+def test_split_cores():
+    """测试核心平均分配且每个任务至少 1 个"""
+    assert split_cores(10, 3) == [4, 3, 3]
+    assert split_cores(32, 2) == [16, 16]
+    assert split_cores(1, 2) == [1, 1]
+    assert split_cores(8, 0) == []
+
+
+def test_stage_threads_restores():
+    """测试阶段结束后恢复原线程数"""
+    previous = torch.get_num_threads()
+
+    with stage_threads(1):
+        assert torch.get_num_threads() == 1
+    assert torch.get_num_threads() == previous
+
+    with stage_threads(None):
+        assert torch.get_num_threads() == previous
+
+
+def test_available_cores():
+    """测试可用核心数为正数"""
+    assert available_cores() >= 1
@@ -0,0 +1,51 @@
+"""测试片段合并模块"""
+
+from whisper_diarization.segment_merger import merge_segments, split_words
+
+
+def test_merge_segments():
+    """测试合并同一说话人间隔较短的相邻片段"""
+    segments = [
+        {"speaker": "SPEAKER_00", "start": 0.0, "end": 1.0},
+        {"speaker": "SPEAKER_00", "start": 1.2, "end": 2.0},
+        {"speaker": "SPEAKER_00", "start": 3.5, "end": 4.0},
+        {"speaker": "SPEAKER_01", "start": 4.1, "end": 5.0},
+        {"speaker": "SPEAKER_01", "start": 5.3, "end": 6.0},
+    ]
+
+    groups = merge_segments(segments, max_gap=0.5)
+
+    assert [g["members"] for g in groups] == [[0, 1], [2], [3, 4]]
+    assert groups[0]["start"] == 0.0
+    assert groups[0]["end"] == 2.0
+    assert groups[2]["speaker"] == "SPEAKER_01"
+
+
+def test_merge_segments_max_duration():
+    """测试合并后的片段不超过最大时长"""
+    segments = [
+        {"speaker": "SPEAKER_00", "start": float(i * 10), "end": float(i * 10 + 10)}
+        for i in range(5)
+    ]
+
+    groups = merge_segments(segments, max_gap=0.5, max_duration=30.0)
+
+    assert [g["members"] for g in groups] == [[0, 1, 2], [3, 4]]
+    assert all(g["end"] - g["start"] <= 30.0 for g in groups)
+
+
+def test_split_words():
+    """测试按词级时间戳拆分回原始片段"""
+    members = [
+        {"speaker": "SPEAKER_00", "start": 10.0, "end": 11.0},
+        {"speaker": "SPEAKER_00", "start": 11.5, "end": 13.0},
+    ]
+    words = [
+        {"word": "你", "start": 0.1, "end": 0.3},
+        {"word": "好", "start": 0.3, "end": 0.6},
+        {"word": "再", "start": 1.3, "end": 1.6},
+        {"word": "见", "start": 2.0, "end": 2.5},
+    ]
+
+    assert split_words(words, members, offset=10.0) == ["你好", "再见"]
+    assert split_words([], members, offset=10.0) == ["", ""]
@@ -0,0 +1,88 @@
+"""测试常驻工作进程"""
+
+import json
+import threading
+
+from whisper_diarization import server
+from whisper_diarization.pipeline import PipelineOptions
+
+
+def test_submit_job_roundtrip(tmp_path, monkeypatch):
+    """测试通过 Unix socket 提交任务并收到结果"""
+    received = []
+
+    def fake_process_audio(audio_path, options):
+        received.append(options)
+        return {
+            "audio_file": str(audio_path),
+            "duration": 1.5,
+            "speakers": 1,
+            "segments": [{"speaker": "SPEAKER_00", "start": 0.0, "end": 1.5, "text": "你好"}],
+        }
+
+    monkeypatch.setattr(server, "process_audio", fake_process_audio)
+
+    audio_path = tmp_path / "audio.wav"
+    audio_path.write_bytes(b"")
+    output_path = tmp_path / "result.json"
+    socket_path = str(tmp_path / "worker.sock")
+
+    with server.WorkerServer(socket_path, PipelineOptions(whisper_model="tiny")) as worker:
+        thread = threading.Thread(target=worker.serve_forever, daemon=True)
+        thread.start()
+        try:
+            ok = server.submit_job(
+                {"audio": str(audio_path), "output": str(output_path), "batch_size": 4},
+                socket_path,
+            )
+            missing = server.submit_job({"audio": str(tmp_path / "missing.wav")}, socket_path)
+        finally:
+            worker.shutdown()
+
+    assert ok["status"] == "ok"
+    assert ok["output"] == str(output_path)
+    assert json.loads(output_path.read_text(encoding="utf-8"))["segments"][0]["text"] == "你好"
+    assert received[0].whisper_model == "tiny"
+    assert received[0].batch_size == 4
+    assert missing["status"] == "error"
+
+
+def test_socket_job_keeps_server_defaults(tmp_path, monkeypatch):
+    """测试 --socket 只转发显式给出的选项,未给出的选项使用工作进程的设置"""
+    from whisper_diarization.__main__ import build_parser, explicit_options, socket_job
+
+    received = []
+
+    def fake_process_audio(audio_path, options):
+        received.append(options)
+        return {"audio_file": str(audio_path), "duration": 1.0, "speakers": 0, "segments": []}
+
+    monkeypatch.setattr(server, "process_audio", fake_process_audio)
+    audio_path = tmp_path / "audio.wav"
+    audio_path.write_bytes(b"")
+    defaults = PipelineOptions(whisper_model="base", batch_size=8, vad=True)
+
+    jobs = []
+    for argv in (
+        ["--audio", str(audio_path), "--socket"],
+        [
+            "--audio",
+            str(audio_path),
+            "--socket",
+            "--no-mel-cache",
+            "--speaker-index",
+            "--mode",
+            "align",
+        ],
+    ):
+        args = build_parser().parse_args(argv)
+        job = socket_job(args, explicit_options(argv), audio_path)
+        job["output"] = str(tmp_path / "result.json")
+        jobs.append(job)
+        server.run_job(job, defaults)
+
+    assert set(jobs[0]) == {"audio", "format", "output"}
+    assert received[0] == defaults
+    assert received[1].whisper_model == "base" and received[1].batch_size == 8
+    assert received[1].mode == "align" and received[1].mel_cache is False
+    assert received[1].speaker_index.endswith("speakers")
@@ -0,0 +1,160 @@
+"""测试说话人分离模块"""
+
+import numpy as np
+import pytest
+import torch
+from pyannote.core import Annotation, Segment
+
+from whisper_diarization.speaker_diarization import SpeakerDiarization
+
+
+class FakePipeline:
+    """记录输入并返回固定结果的 pyannote pipeline 替身"""
+
+    def __init__(self):
+        self.inputs = []
+
+    def __call__(self, audio_input):
+        self.inputs.append(audio_input)
+        annotation = Annotation()
+        annotation[Segment(2.0, 3.0)] = "SPEAKER_01"
+        annotation[Segment(0.0, 1.5)] = "SPEAKER_00"
+        return annotation
+
+
+@pytest.fixture
+def diarizer():
+    """不加载模型的说话人分离器"""
+    diarizer = SpeakerDiarization.__new__(SpeakerDiarization)
+    diarizer.pipeline = FakePipeline()
+    return diarizer
+
+
+def test_diarize_waveform(diarizer):
+    """测试直接传入内存波形"""
+    waveform = torch.zeros(1, 16000 * 4)
+
+    segments = diarizer.diarize(waveform, 16000)
+
+    audio_input = diarizer.pipeline.inputs[0]
+    assert audio_input["waveform"] is waveform
+    assert audio_input["sample_rate"] == 16000
+    assert [s["speaker"] for s in segments] == ["SPEAKER_00", "SPEAKER_01"]
+
+
+def test_diarize_waveform_requires_sample_rate(diarizer):
+    """测试传入波形但缺少采样率时报错"""
+    with pytest.raises(ValueError):
+        diarizer.diarize(torch.zeros(1, 16000))
+
+
+def test_diarize_path(diarizer):
+    """测试传入文件路径"""
+    diarizer.diarize("audio.wav")
+
+    assert diarizer.pipeline.inputs[0] == "audio.wav"
+
+
+class FakeWindowPipeline:
+    """
+    按绝对时间返回固定说话人片段的 pipeline 替身
+
+    测试波形的采样值等于其时间(秒),据此得到窗口的开始时间。
+    """
+
+    truth = [("A", 0.0, 50.0), ("B", 50.0, 100.0), ("A", 100.0, 130.0)]
+    embeddings = {"A": [1.0, 0.0], "B": [0.0, 1.0]}
+
+    def __call__(self, audio_input, return_embeddings=False):
+        chunk = audio_input["waveform"]
+        sample_rate = audio_input["sample_rate"]
+        start = float(chunk[0, 0])
+        end = start + chunk.shape[-1] / sample_rate
+
+        annotation = Annotation()
+        local = {}
+        for speaker, turn_start, turn_end in self.truth:
+            if turn_end <= start or turn_start >= end:
+                continue
+            label = local.setdefault(speaker, f"SPEAKER_{len(local):02d}")
+            annotation[Segment(max(turn_start, start) - start, min(turn_end, end) - start)] = label
+
+        labels = annotation.labels()
+        speakers = {label: speaker for speaker, label in local.items()}
+        centroids = np.array([self.embeddings[speakers[label]] for label in labels])
+        return annotation, centroids
+
+
+def test_diarize_windows(diarizer):
+    """测试滑动窗口分离的片段跨窗口合并且标签一致"""
+    diarizer.pipeline = FakeWindowPipeline()
+    sample_rate = 100
+    waveform = (torch.arange(130 * sample_rate, dtype=torch.float64) / sample_rate).unsqueeze(0)
+
+    windows = list(diarizer.diarize_windows(waveform, sample_rate, window=40.0, overlap=10.0))
+    segments = [segment for finalized in windows for segment in finalized]
+
+    assert len(windows) == 4
+    assert [(s["speaker"], round(s["start"]), round(s["end"])) for s in segments] == [
+        ("SPEAKER_00", 0, 50),
+        ("SPEAKER_01", 50, 100),
+        ("SPEAKER_00", 100, 130),
+    ]
+
+
+class ScriptedDiarization(SpeakerDiarization):
+    """使用 FakeWindowPipeline 的说话人分离器,可在 spawn 工作进程中按类重新创建"""
+
+    def __init__(self, hf_token=None, offline=False, local_model_path=None):
+        self.hf_token = hf_token
+        self.offline = offline
+        self.local_model_path = local_model_path
+        self.pipeline = FakeWindowPipeline()
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_diarize_chunked(workers):
+    """测试分块分离后全局聚类,标签一致且分块边界处的片段被合并"""
+    diarizer = ScriptedDiarization()
+    sample_rate = 100
+    waveform = (torch.arange(130 * sample_rate, dtype=torch.float64) / sample_rate).unsqueeze(0)
+
+    segments = diarizer.diarize_chunked(waveform, sample_rate, chunk=40.0, workers=workers)
+
+    assert [(s["speaker"], round(s["start"]), round(s["end"])) for s in segments] == [
+        ("SPEAKER_00", 0, 50),
+        ("SPEAKER_01", 50, 100),
+        ("SPEAKER_00", 100, 130),
+    ]
+
+
+def test_diarize_chunked_silent(diarizer):
+    """测试所有分块都没有说话人时返回空结果"""
+
+    def silent_pipeline(audio_input, return_embeddings=False):
+        return Annotation(), np.zeros((0, 2))
+
+    diarizer.pipeline = silent_pipeline
+    waveform = torch.zeros(1, 30 * 16000)
+
+    assert diarizer.diarize_chunked(waveform, 16000, chunk=10.0) == []
+    assert diarizer.diarize_chunked(waveform, 16000, chunk=10.0, return_embeddings=True) == ([], {})
+
+
+def test_diarize_returns_embeddings(diarizer):
+    """测试分离时同时返回各说话人的中心向量"""
+    diarizer.pipeline = FakeWindowPipeline()
+    sample_rate = 100
+    waveform = (torch.arange(130 * sample_rate, dtype=torch.float64) / sample_rate).unsqueeze(0)
+
+    segments, embeddings = diarizer.diarize(waveform, sample_rate, return_embeddings=True)
+    chunked, chunked_embeddings = ScriptedDiarization().diarize_chunked(
+        waveform, sample_rate, chunk=40.0, return_embeddings=True
+    )
+
+    assert [s["speaker"] for s in segments] == ["SPEAKER_00", "SPEAKER_01", "SPEAKER_00"]
+    np.testing.assert_allclose(embeddings["SPEAKER_00"], [1.0, 0.0])
+    np.testing.assert_allclose(embeddings["SPEAKER_01"], [0.0, 1.0])
+    assert sorted(chunked_embeddings) == ["SPEAKER_00", "SPEAKER_01"]
+    np.testing.assert_allclose(chunked_embeddings["SPEAKER_00"], [1.0, 0.0])
+    np.testing.assert_allclose(chunked_embeddings["SPEAKER_01"], [0.0, 1.0])
@@ -0,0 +1,170 @@
+"""测试说话人索引模块"""
+
+import numpy as np
+import pytest
+
+from whisper_diarization.speaker_index import (
+    SpeakerIndex,
+    dominant_embedding,
+    identify_speakers,
+    open_index,
+)
+
+
+def _voices(count: int, dim: int = 32, seed: int = 0) -> np.ndarray:
+    """生成 count 个随机方向的说话人向量"""
+    rng = np.random.default_rng(seed)
+    voices = rng.normal(size=(count, dim))
+    return voices / np.linalg.norm(voices, axis=1, keepdims=True)
+
+
+def _noisy(voice: np.ndarray, count: int, noise: float = 0.1, seed: int = 1) -> np.ndarray:
+    """同一说话人不同录音的向量"""
+    rng = np.random.default_rng(seed)
+    return voice + rng.normal(scale=noise / np.sqrt(len(voice)), size=(count, len(voice)))
+
+
+def test_add_search_and_persist(tmp_path):
+    """测试登记、搜索,以及重新打开目录后内容不变"""
+    voices = _voices(3)
+    index = SpeakerIndex(tmp_path / "speakers")
+    for name, voice in zip(["张三", "李四", "王五"], voices):
+        index.add(name, _noisy(voice, 2))
+
+    reopened = SpeakerIndex(tmp_path / "speakers")
+    results = reopened.search(voices[[1, 2]], k=2)
+
+    assert len(reopened) == 6
+    assert reopened.speakers == ["张三", "李四", "王五"]
+    assert [found[0][0] for found in results] == ["李四", "王五"]
+    assert len(results[0]) == 2 and results[0][1][0] != "李四"
+    assert results[0][0][1] > 0.9
+    assert isinstance(reopened.embeddings, np.memmap)
+
+
+def test_add_rejects_invalid_embeddings(tmp_path):
+    """测试零向量和维度不一致的向量不能登记"""
+    index = SpeakerIndex(tmp_path)
+    index.add("张三", np.ones(8))
+
+    with pytest.raises(ValueError):
+        index.add("李四", np.zeros(8))
+    with pytest.raises(ValueError):
+        index.add("李四", np.ones(4))
+    assert SpeakerIndex(tmp_path / "missing").search(np.ones(8)) == [[]]
+
+
+def test_ivf_search_matches_flat(tmp_path):
+    """测试 IVF 分区搜索的召回率,以及建立分区后新登记的向量可以被搜索到"""
+    voices = _voices(400, dim=64)
+    index = SpeakerIndex(tmp_path)
+    index.extend(
+        [f"speaker{i}" for i in range(400) for _ in range(3)],
+        np.concatenate([_noisy(voice, 3, seed=i) for i, voice in enumerate(voices)]),
+    )
+    queries = voices[:100] + np.random.default_rng(7).normal(scale=0.01, size=(100, 64))
+
+    flat = [found[0][0] for found in index.search(queries)]
+    index.build_ivf(nlist=16)
+    ivf = [found[0][0] for found in SpeakerIndex(tmp_path).search(queries, nprobe=4)]
+    index.add("新人", voices[0] * -1)
+
+    assert flat == [f"speaker{i}" for i in range(100)]
+    assert np.mean(np.array(ivf) == np.array(flat)) >= 0.95
+    assert index.offsets[-1] == len(index) == 1201
+    assert index.search(-voices[0], nprobe=16)[0][0][0] == "新人"
+
+
+def test_identify_one_to_one(tmp_path):
+    """测试同一文件中的两个匿名说话人不会映射到同一身份,低于阈值的不映射"""
+    voices = _voices(3)
+    index = SpeakerIndex(tmp_path)
+    index.add("张三", voices[0])
+    index.add("李四", voices[1])
+
+    mapping = index.identify(
+        {
+            "SPEAKER_00": voices[0] * 0.9 + voices[1] * 0.1,
+            "SPEAKER_01": voices[0] * 0.8 + voices[1] * 0.6,
+            "SPEAKER_02": voices[2],
+        },
+        threshold=0.5,
+    )
+
+    assert {label: name for label, (name, _) in mapping.items()} == {
+        "SPEAKER_00": "张三",
+        "SPEAKER_01": "李四",
+    }
+
+
+def test_identify_speakers_renames_segments(tmp_path):
+    """测试身份识别后替换片段标签,未匹配和向量无效的说话人保持匿名"""
+    voices = _voices(3)
+    index = SpeakerIndex(tmp_path)
+    index.add("张三", voices[0])
+    segments = [
+        {"speaker": "SPEAKER_00", "start": 0.0, "end": 1.0},
+        {"speaker": "SPEAKER_01", "start": 1.0, "end": 4.0},
+        {"speaker": "SPEAKER_02", "start": 4.0, "end": 5.0},
+    ]
+    embeddings = {
+        "SPEAKER_00": voices[1].tolist(),
+        "SPEAKER_01": voices[0].tolist(),
+        "SPEAKER_02": [float("nan")] * 32,
+    }
+
+    renamed, identities = identify_speakers(segments, embeddings, index)
+
+    assert [s["speaker"] for s in renamed] == ["SPEAKER_00", "张三", "SPEAKER_02"]
+    assert list(identities) == ["SPEAKER_01"]
+    assert identities["SPEAKER_01"]["name"] == "张三"
+    assert identities["SPEAKER_01"]["score"] == pytest.approx(1.0)
+    np.testing.assert_allclose(dominant_embedding(segments, embeddings), voices[0], rtol=1e-6)
+
+
+def test_open_index_reloads_after_update(tmp_path):
+    """测试进程内复用的索引在其他实例登记后重新打开"""
+    first = open_index(tmp_path)
+    assert open_index(tmp_path) is first and len(first) == 0
+
+    SpeakerIndex(tmp_path).add("张三", np.ones(8))
+
+    assert len(open_index(tmp_path)) == 1
+
+
+def test_save_commits_generations_through_manifest(tmp_path):
+    """测试每次保存写入新一代数据文件,已打开的旧索引不受影响,只保留当前和上一代"""
+    voices = _voices(3)
+    index = SpeakerIndex(tmp_path)
+    index.add("张三", voices[0])
+    before = SpeakerIndex(tmp_path)
+    index.add("李四", voices[1])
+    index.build_ivf(nlist=2)
+
+    reopened = SpeakerIndex(tmp_path)
+    assert reopened.generation == 3
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "centroids.3.npy",
+        "embeddings.2.npy",
+        "embeddings.3.npy",
+        "index.json",
+    ]
+    assert len(before) == 1 and before.search(voices[0])[0][0][0] == "张三"
+    assert len(reopened) == 2 and reopened.search(voices[1])[0][0][0] == "李四"
+
+
+def test_open_version_1_index(tmp_path):
+    """测试读取没有代数的旧版索引,保存后升级并删除旧文件"""
+    voices = _voices(2)
+    np.save(tmp_path / "embeddings.npy", voices[:1].astype(np.float32))
+    (tmp_path / "index.json").write_text(
+        '{"version": 1, "dim": 32, "names": ["张三"], "offsets": null}', encoding="utf-8"
+    )
+
+    index = SpeakerIndex(tmp_path)
+    assert index.search(voices[0])[0][0][0] == "张三"
+    index.add("李四", voices[1])
+    index.add("李四", voices[1])
+
+    assert not (tmp_path / "embeddings.npy").exists()
+    assert SpeakerIndex(tmp_path).speakers == ["张三", "李四"]
@@ -0,0 +1,62 @@
+"""测试说话人关联模块"""
+
+import numpy as np
+
+from whisper_diarization.speaker_linking import SpeakerLinker, cluster_speakers
+
+
+def test_link_consistent_across_windows():
+    """测试不同窗口中的同一说话人映射到同一全局标签"""
+    linker = SpeakerLinker(threshold=0.5)
+
+    first = linker.link(["SPEAKER_00", "SPEAKER_01"], np.array([[1.0, 0.0], [0.0, 1.0]]))
+    # 第二个窗口中局部标签顺序与第一个窗口相反
+    second = linker.link(["SPEAKER_00", "SPEAKER_01"], np.array([[0.1, 0.9], [0.9, 0.1]]))
+
+    assert first == {"SPEAKER_00": "SPEAKER_00", "SPEAKER_01": "SPEAKER_01"}
+    assert second == {"SPEAKER_00": "SPEAKER_01", "SPEAKER_01": "SPEAKER_00"}
+    assert linker.num_speakers == 2
+
+
+def test_link_new_speaker_and_one_to_one():
+    """测试相似度不足时注册新说话人,且同一窗口内不重复映射"""
+    linker = SpeakerLinker(threshold=0.5)
+    linker.link(["SPEAKER_00"], np.array([[1.0, 0.0, 0.0]]))
+
+    mapping = linker.link(
+        ["SPEAKER_00", "SPEAKER_01", "SPEAKER_02"],
+        np.array([[0.9, 0.1, 0.0], [0.8, 0.2, 0.0], [0.0, 0.0, 0.0]]),
+    )
+
+    assert mapping["SPEAKER_00"] == "SPEAKER_00"
+    assert len(set(mapping.values())) == 3
+    assert linker.num_speakers == 3
+
+
+def test_cluster_speakers_across_chunks():
+    """测试各分块的中心向量聚类为全局说话人,编号按首次出现顺序"""
+    embeddings = np.array(
+        [
+            [0.0, 1.0],  # 分块 0: B
+            [1.0, 0.0],  # 分块 0: A
+            [0.9, 0.1],  # 分块 1: A
+            [0.1, 0.9],  # 分块 2: B
+            [0.0, 0.0],  # 分块 2: 无效中心向量
+        ]
+    )
+
+    labels = cluster_speakers(embeddings, [0, 0, 1, 2, 2], threshold=0.5)
+
+    assert labels == [0, 1, 1, 0, 2]
+    assert cluster_speakers(np.zeros((0, 2)), []) == []
+
+
+def test_cluster_speakers_cannot_link_within_chunk():
+    """测试同一分块内的说话人不会被合并,且低于阈值的簇保持分开"""
+    embeddings = np.array([[1.0, 0.0], [0.95, 0.05], [0.97, 0.03], [0.0, 1.0]])
+
+    labels = cluster_speakers(embeddings, [0, 0, 1, 1], threshold=0.5)
+
+    assert labels[0] != labels[1]
+    assert labels[2] in (labels[0], labels[1])
+    assert labels[3] not in labels[:3]
@@ -0,0 +1,376 @@
+"""测试语音识别模块的片段调度逻辑"""
+
+from types import SimpleNamespace
+
+import pytest
+import torch
+import whisper
+
+from whisper_diarization.mel_cache import MelCache
+from whisper_diarization.speech_recognition import (
+    FALLBACK_TEMPERATURES,
+    FasterWhisperRecognition,
+    SpeechRecognition,
+    create_recognizer,
+    log_mel_batch,
+)
+
+
+def _make_recognizer(calls):
+    """构造不加载模型的识别器,记录每次转录调用"""
+    recognizer = SpeechRecognition.__new__(SpeechRecognition)
+
+    def transcribe(audio_input, language=None, initial_prompt=None):
+        calls.append(("single", audio_input.shape[-1]))
+        return f"single-{audio_input.shape[-1]}"
+
+    def transcribe_batch(audio_inputs, language=None, initial_prompt=None):
+        calls.append(("batch", len(audio_inputs)))
+        return [f"batch-{audio.shape[-1]}" for audio in audio_inputs]
+
+    recognizer.transcribe = transcribe
+    recognizer.transcribe_batch = transcribe_batch
+    return recognizer
+
+
+def test_transcribe_segments_batched():
+    """测试批量模式按批解码短片段并保持原有顺序"""
+    calls = []
+    recognizer = _make_recognizer(calls)
+    waveform = torch.zeros(1, 16000 * 50)
+    segments = [
+        {"speaker": "SPEAKER_00", "start": 0.0, "end": 1.0},
+        {"speaker": "SPEAKER_01", "start": 1.0, "end": 41.0},
+        {"speaker": "SPEAKER_00", "start": 41.0, "end": 43.0},
+        {"speaker": "SPEAKER_01", "start": 43.0, "end": 46.0},
+    ]
+
+    results = recognizer.transcribe_segments(waveform, segments, 16000, batch_size=2)
+
+    assert [r["text"] for r in results] == [
+        "batch-16000",
+        "single-640000",
+        "batch-32000",
+        "batch-48000",
+    ]
+    assert calls == [("batch", 2), ("batch", 1), ("single", 640000)]
+    assert results[1]["speaker"] == "SPEAKER_01"
+    assert "text" not in segments[0]
+
+
+def test_transcribe_segments_sequential():
+    """测试默认模式逐个片段转录"""
+    calls = []
+    recognizer = _make_recognizer(calls)
+    waveform = torch.zeros(1, 16000 * 5)
+    segments = [
+        {"speaker": "SPEAKER_00", "start": 0.0, "end": 1.0},
+        {"speaker": "SPEAKER_01", "start": 1.0, "end": 3.0},
+    ]
+
+    results = recognizer.transcribe_segments(waveform, segments, 16000)
+
+    assert [r["text"] for r in results] == ["single-16000", "single-32000"]
+    assert calls == [("single", 16000), ("single", 32000)]
+
+
+def test_transcribe_segments_merged():
+    """测试合并模式把合并片段的词拆回原始片段"""
+    calls = []
+    recognizer = _make_recognizer(calls)
+
+    def transcribe_words(audio_input, language=None, initial_prompt=None):
+        calls.append(("words", audio_input.shape[-1]))
+        return [
+            {"word": "甲", "start": 0.2, "end": 0.4},
+            {"word": "乙", "start": 1.4, "end": 1.6},
+        ]
+
+    recognizer.transcribe_words = transcribe_words
+    waveform = torch.zeros(1, 16000 * 10)
+    segments = [
+        {"speaker": "SPEAKER_00", "start": 0.0, "end": 1.0},
+        {"speaker": "SPEAKER_00", "start": 1.2, "end": 2.0},
+        {"speaker": "SPEAKER_01", "start": 5.0, "end": 6.0},
+    ]
+
+    results = recognizer.transcribe_segments(waveform, segments, 16000, merge_gap=0.5)
+
+    assert [r["text"] for r in results] == ["甲", "乙", "single-16000"]
+    assert ("words", 32000) in calls
+
+
+def test_transcribe_aligned():
+    """测试对齐模式整段识别一次并按词级时间戳分配给片段"""
+    calls = []
+    recognizer = _make_recognizer(calls)
+
+    def transcribe_words(audio_input, language=None, initial_prompt=None):
+        calls.append(("words", audio_input.shape[-1]))
+        return [
+            {"word": "你好", "start": 0.1, "end": 0.6},
+            {"word": "在吗", "start": 0.7, "end": 0.9},
+            {"word": "在", "start": 1.1, "end": 1.3},
+            {"word": "好的", "start": 2.6, "end": 2.9},
+        ]
+
+    class Source:
+        """只支持整体读取的按需音频源"""
+
+        def read_all(self):
+            return torch.zeros(1, 16000 * 3)
+
+    recognizer.transcribe_words = transcribe_words
+    segments = [
+        {"speaker": "SPEAKER_00", "start": 0.0, "end": 1.0},
+        {"speaker": "SPEAKER_01", "start": 1.0, "end": 1.5},
+        {"speaker": "SPEAKER_00", "start": 2.0, "end": 3.0},
+    ]
+    emitted = []
+
+    results = recognizer.transcribe_aligned(Source(), segments, 16000, on_segment=emitted.append)
+
+    assert [r["text"] for r in results] == ["你好在吗", "在", "好的"]
+    assert [r["speaker"] for r in results] == ["SPEAKER_00", "SPEAKER_01", "SPEAKER_00"]
+    assert calls == [("words", 48000)]
+    assert emitted == results
+
+
+def test_log_mel_batch_matches_whisper():
+    """测试批量 log-mel 与 Whisper 逐条计算的结果一致"""
+    audios = [torch.randn(16000 * 3) * 0.1, torch.randn(16000 * 20) * 0.5, torch.zeros(160)]
+    batch = torch.zeros(len(audios), whisper.audio.N_SAMPLES)
+    for row, audio in zip(batch, audios):
+        row[: audio.shape[0]] = audio
+
+    expected = torch.stack(
+        [whisper.log_mel_spectrogram(whisper.pad_or_trim(audio)) for audio in audios]
+    )
+    assert torch.allclose(log_mel_batch(batch), expected, atol=1e-5)
+
+
+def test_transcribe_passes_tensor_view():
+    """测试片段以完整波形的视图交给 Whisper,不复制为 numpy 数组"""
+    seen = []
+
+    class FakeModel:
+        def transcribe(self, audio, **kwargs):
+            seen.append(audio)
+            return {"text": " ok "}
+
+    recognizer = SpeechRecognition.__new__(SpeechRecognition)
+    recognizer.model = FakeModel()
+    waveform = torch.randn(1, 16000 * 4)
+    segment = waveform[:, 16000:32000]
+
+    assert recognizer.transcribe(segment) == "ok"
+    (audio,) = seen
+    assert isinstance(audio, torch.Tensor)
+    assert audio.shape == (16000,)
+    assert audio.data_ptr() == segment.data_ptr()
+
+
+def test_transcribe_segments_mel_cache():
+    """测试使用 mel 缓存时短片段切片解码并启用温度回退,长片段仍逐个转录"""
+    calls = []
+    recognizer = _make_recognizer(calls)
+
+    def transcribe_mels(mels, language=None, initial_prompt=None, temperatures=(0.0,)):
+        calls.append(("mels", tuple(mels.shape), temperatures[-1]))
+        return ["mel"] * len(mels)
+
+    recognizer.transcribe_mels = transcribe_mels
+    waveform = torch.zeros(1, 16000 * 50)
+    cache = MelCache(waveform)
+    segments = [
+        {"speaker": "SPEAKER_00", "start": 0.0, "end": 1.0},
+        {"speaker": "SPEAKER_01", "start": 1.0, "end": 41.0},
+    ]
+
+    results = recognizer.transcribe_segments(waveform, segments, 16000, mel_cache=cache)
+
+    assert [r["text"] for r in results] == ["mel", "single-640000"]
+    assert calls == [("mels", (1, 80, 3000), 1.0), ("single", 640000)]
+
+
+def test_transcribe_mels_fallback(monkeypatch):
+    """测试只对未通过的片段用更高温度重新解码"""
+    temperatures = []
+
+    def decode(model, audio_features, options):
+        temperatures.append((options.temperature, len(audio_features)))
+        results = []
+        for features in audio_features:
+            # 第 1 条在温度 0 时重复输出,提高温度后正常
+            repetitive = features[0, 0].item() == 1.0 and options.temperature == 0.0
+            results.append(
+                SimpleNamespace(
+                    text=f" t{options.temperature} ",
+                    no_speech_prob=0.0,
+                    avg_logprob=-0.1,
+                    compression_ratio=3.0 if repetitive else 1.0,
+                )
+            )
+        return results
+
+    monkeypatch.setattr(whisper, "decode", decode)
+    recognizer = SpeechRecognition.__new__(SpeechRecognition)
+    recognizer.model = SimpleNamespace(
+        device=torch.device("cpu"), embed_audio=lambda mel: mel, dims=None
+    )
+    mels = torch.zeros(2, 80, 3000)
+    mels[1] = 1.0
+
+    texts = recognizer.transcribe_mels(mels, temperatures=(0.0, 0.2, 0.4))
+
+    assert texts == ["t0.0", "t0.2"]
+    assert temperatures == [(0.0, 2), (0.2, 1)]
+
+
+@pytest.mark.parametrize(
+    ("avg_logprob", "compression_ratio", "texts", "decodes"),
+    [
+        # 静音: 不回退,输出空文本
+        (-1.5, 1.0, [""], [0.0]),
+        # 无语音概率高但解码置信: 不满足回退条件,只解码一次
+        (-0.2, 1.0, ["t0.0"], [0.0]),
+        # 无语音概率高、解码置信但重复输出: 文本会被保留,需要回退
+        (-0.2, 3.0, ["t0.4"], [0.0, 0.2, 0.4]),
+    ],
+)
+def test_transcribe_mels_fallback_with_high_no_speech_prob(
+    monkeypatch, avg_logprob, compression_ratio, texts, decodes
+):
+    """测试无语音概率高的片段只在文本会被保留且需要重解码时回退"""
+    temperatures = []
+
+    def decode(model, audio_features, options):
+        temperatures.append(options.temperature)
+        return [
+            SimpleNamespace(
+                text=f" t{options.temperature} ",
+                no_speech_prob=0.9,
+                avg_logprob=avg_logprob,
+                compression_ratio=compression_ratio,
+            )
+        ]
+
+    monkeypatch.setattr(whisper, "decode", decode)
+    recognizer = SpeechRecognition.__new__(SpeechRecognition)
+    recognizer.model = SimpleNamespace(
+        device=torch.device("cpu"), embed_audio=lambda mel: mel, dims=None
+    )
+
+    result = recognizer.transcribe_mels(torch.zeros(1, 80, 3000), temperatures=(0.0, 0.2, 0.4))
+
+    assert result == texts
+    assert temperatures == decodes
+
+
+def test_transcribe_segments_emits_in_order():
+    """测试批量模式下片段按原顺序回调,长片段完成前后续片段暂存"""
+    calls = []
+    recognizer = _make_recognizer(calls)
+    waveform = torch.zeros(1, 16000 * 50)
+    segments = [
+        {"speaker": "SPEAKER_00", "start": 0.0, "end": 1.0},
+        {"speaker": "SPEAKER_01", "start": 1.0, "end": 41.0},
+        {"speaker": "SPEAKER_00", "start": 41.0, "end": 43.0},
+    ]
+    emitted = []
+
+    results = recognizer.transcribe_segments(
+        waveform, segments, 16000, batch_size=2, on_segment=emitted.append
+    )
+
+    assert emitted == results
+
+
+class FakeFasterWhisperModel:
+    """记录调用参数的 faster-whisper 模型替身"""
+
+    def __init__(self):
+        self.calls = []
+
+    def transcribe(self, audio, **kwargs):
+        self.calls.append((audio, kwargs))
+        words = [SimpleNamespace(word="你好", start=0.1, end=0.5)]
+        segments = [
+            SimpleNamespace(text=" 你好", words=words),
+            SimpleNamespace(text="世界 ", words=None),
+        ]
+        return iter(segments), SimpleNamespace(language="zh")
+
+
+def _make_faster_recognizer():
+    recognizer = FasterWhisperRecognition.__new__(FasterWhisperRecognition)
+    recognizer.model = FakeFasterWhisperModel()
+    return recognizer
+
+
+def test_faster_whisper_transcribe():
+    """测试 faster-whisper 后端共享波形内存并使用与 Whisper 一致的回退参数"""
+    recognizer = _make_faster_recognizer()
+    waveform = torch.randn(1, 16000 * 4)
+    segment = waveform[:, 16000:32000]
+
+    assert recognizer.transcribe(segment) == "你好世界"
+    ((audio, kwargs),) = recognizer.model.calls
+    assert audio.shape == (16000,)
+    assert audio.__array_interface__["data"][0] == segment.data_ptr()
+    assert kwargs["language"] == "zh"
+    assert kwargs["initial_prompt"] == "以下是普通话的句子。"
+    assert kwargs["beam_size"] == 1
+    assert kwargs["temperature"] == list(FALLBACK_TEMPERATURES)
+
+
+def test_faster_whisper_words_and_batch():
+    """测试 faster-whisper 后端的词级时间戳和批量接口"""
+    recognizer = _make_faster_recognizer()
+
+    words = recognizer.transcribe_words(torch.zeros(16000))
+    texts = recognizer.transcribe_batch([torch.zeros(8000), torch.zeros(4000)])
+
+    assert words == [{"word": "你好", "start": 0.1, "end": 0.5}]
+    assert texts == ["你好世界", "你好世界"]
+    assert recognizer.model.calls[0][1]["word_timestamps"] is True
+    assert [kwargs["temperature"] for _, kwargs in recognizer.model.calls[1:]] == [[0.0], [0.0]]
+    assert recognizer.create_mel_cache(torch.zeros(1, 16000)) is None
+
+
+def test_faster_whisper_transcribe_segments_batched():
+    """测试 faster-whisper 后端沿用片段调度逻辑"""
+    recognizer = _make_faster_recognizer()
+    waveform = torch.zeros(1, 16000 * 5)
+    segments = [
+        {"speaker": "SPEAKER_00", "start": 0.0, "end": 1.0},
+        {"speaker": "SPEAKER_01", "start": 1.0, "end": 3.0},
+    ]
+
+    results = recognizer.transcribe_segments(
+        waveform, segments, 16000, batch_size=2, mel_cache=recognizer.create_mel_cache(waveform)
+    )
+
+    assert [r["text"] for r in results] == ["你好世界", "你好世界"]
+
+
+def test_create_recognizer_unknown_backend():
+    """测试不支持的后端名称"""
+    with pytest.raises(ValueError):
+        create_recognizer("tiny", backend="onnx")
+
+
+def test_faster_whisper_ignores_mel_cache():
+    """测试 faster-whisper 后端收到 mel 缓存时仍以波形识别"""
+    recognizer = _make_faster_recognizer()
+
+    class UnusableMelCache:
+        def segment(self, start, end):
+            raise AssertionError("不应使用 mel 缓存")
+
+    segments = [{"speaker": "SPEAKER_00", "start": 0.0, "end": 0.5}]
+    for batch_size in (1, 2):
+        results = recognizer.transcribe_segments(
+            torch.zeros(1, 16000), segments, 16000, batch_size, mel_cache=UnusableMelCache()
+        )
+        assert [r["text"] for r in results] == ["你好世界"]
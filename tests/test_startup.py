@@ -0,0 +1,76 @@
+"""测试命令行启动开销: 导入包和 --help 不加载 torch 等重量级依赖"""
+
+import subprocess
+import sys
+import time
+
+import pytest
+
+import whisper_diarization
+
+# python -m whisper_diarization --help 的耗时上限(秒),包含解释器启动;
+# 延迟导入后约 0.2 秒,导入 torch/whisper 时需要数秒
+HELP_TIME_BUDGET = 1.5
+
+HEAVY_MODULES = ("torch", "torchaudio", "whisper", "pyannote.audio", "numpy")
+
+_CHECK_MODULES = """
+import runpy, sys
+sys.argv = ["whisper_diarization", *sys.argv[1:]]
+try:
+    runpy.run_module("whisper_diarization", run_name="__main__")
+except SystemExit:
+    pass
+print("loaded:" + ",".join(m for m in {modules!r} if m in sys.modules))
+"""
+
+
+def _run(*args, cwd=None) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *args], capture_output=True, text=True, cwd=cwd, check=True
+    )
+
+
+def test_help_does_not_import_heavy_modules():
+    """测试 --help 和参数错误不导入 torch、whisper、pyannote.audio"""
+    script = _CHECK_MODULES.format(modules=HEAVY_MODULES)
+
+    for args in (["--help"], ["--unknown-option"]):
+        output = _run("-c", script, *args).stdout.splitlines()
+        assert output[-1] == "loaded:"
+
+
+def test_help_time_budget():
+    """测试 python -m whisper_diarization --help 在时间预算内返回"""
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        result = _run("-m", "whisper_diarization", "--help")
+        best = min(best, time.perf_counter() - start)
+
+    assert "--audio" in result.stdout
+    assert best < HELP_TIME_BUDGET
+
+
+def test_config_import_has_no_side_effects(tmp_path):
+    """测试导入 config 不创建输出目录,DEVICE 在首次访问时检测"""
+    script = (
+        "import sys; from whisper_diarization import config; "
+        "assert 'torch' not in sys.modules; "
+        "print(config.DEVICE, 'torch' in sys.modules)"
+    )
+
+    result = _run("-c", script, cwd=tmp_path)
+
+    assert not (tmp_path / "output").exists()
+    assert result.stdout.split() in (["cpu", "True"], ["cuda", "True"])
+
+
+def test_lazy_package_attributes():
+    """测试包的公开类按需导入"""
+    from whisper_diarization.speech_recognition import SpeechRecognition
+
+    assert whisper_diarization.SpeechRecognition is SpeechRecognition
+    assert "AudioProcessor" in dir(whisper_diarization)
+    with pytest.raises(AttributeError):
+        whisper_diarization.Missing  # noqa: B018
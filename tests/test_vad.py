@@ -0,0 +1,87 @@
+"""测试语音活动检测模块"""
+
+import pytest
+import torch
+import torchaudio
+
+from whisper_diarization.audio_processor import AudioSource
+from whisper_diarization.vad import VoiceActivityDetector, frame_energy
+
+SAMPLE_RATE = 16000
+
+
+@pytest.fixture
+def waveform():
+    """0-2 秒静音,2-4 秒正弦“语音”,4-6 秒静音,6-6.1 秒短促噪声,6.1-8 秒静音"""
+    t = torch.arange(8 * SAMPLE_RATE) / SAMPLE_RATE
+    signal = torch.full_like(t, 1e-4) * torch.sin(2 * torch.pi * 50 * t)
+    tone = 0.3 * torch.sin(2 * torch.pi * 440 * t)
+    signal[2 * SAMPLE_RATE : 4 * SAMPLE_RATE] = tone[2 * SAMPLE_RATE : 4 * SAMPLE_RATE]
+    signal[int(6 * SAMPLE_RATE) : int(6.1 * SAMPLE_RATE)] = 0.3
+    return signal.unsqueeze(0)
+
+
+def test_frame_energy():
+    """测试分帧能量与补零"""
+    samples = torch.ones(1, 1000)
+    energy = frame_energy(samples, 480)
+    assert energy.shape == (3,)
+    assert energy[0].item() == pytest.approx(0.0, abs=1e-4)
+    assert energy[2].item() < energy[0].item()
+
+
+def test_filter_segments(waveform):
+    """测试裁剪首尾静音、丢弃静音和过短的片段并统计节省时长"""
+    vad = VoiceActivityDetector(padding=0.1, min_speech=0.2)
+    vad.analyze(waveform, SAMPLE_RATE)
+
+    segments = [
+        {"speaker": "SPEAKER_00", "start": 1.0, "end": 5.0},
+        {"speaker": "SPEAKER_01", "start": 4.5, "end": 5.5},
+        {"speaker": "SPEAKER_01", "start": 5.5, "end": 7.0},
+    ]
+    kept, stats = vad.filter_segments(segments)
+
+    assert len(kept) == 1
+    assert kept[0]["speaker"] == "SPEAKER_00"
+    assert kept[0]["start"] == pytest.approx(1.9, abs=0.05)
+    assert kept[0]["end"] == pytest.approx(4.1, abs=0.05)
+    assert stats["dropped"] == 2
+    assert stats["trimmed"] == 1
+    assert stats["input_seconds"] == pytest.approx(6.5)
+    assert stats["skipped_seconds"] == pytest.approx(6.5 - 2.2, abs=0.1)
+
+
+def test_filter_drops_silent_segments_without_min_speech(waveform):
+    """测试 min_speech 为 0 时不含语音帧的片段被丢弃,短促语音仍保留"""
+    vad = VoiceActivityDetector(padding=0.0, min_speech=0.0)
+    vad.analyze(waveform, SAMPLE_RATE)
+
+    segments = [
+        {"speaker": "SPEAKER_00", "start": 0.0, "end": 1.5},
+        {"speaker": "SPEAKER_01", "start": 5.5, "end": 7.0},
+    ]
+    kept, stats = vad.filter_segments(segments)
+
+    assert [s["speaker"] for s in kept] == ["SPEAKER_01"]
+    assert kept[0]["start"] == pytest.approx(6.0, abs=0.05)
+    assert stats["dropped"] == 1
+
+
+def test_filter_requires_analyze():
+    """测试未分析时抛出异常"""
+    with pytest.raises(RuntimeError):
+        VoiceActivityDetector().filter_segments([])
+
+
+def test_audio_source_matches_tensor(waveform, tmp_path, monkeypatch):
+    """测试 AudioSource 分块分析与整体分析结果一致"""
+    from whisper_diarization import vad as vad_module
+
+    monkeypatch.setattr(vad_module, "ANALYZE_CHUNK_DURATION", 1.0)
+    path = tmp_path / "audio.wav"
+    torchaudio.save(str(path), waveform, SAMPLE_RATE, encoding="PCM_F", bits_per_sample=32)
+
+    expected = VoiceActivityDetector().analyze(waveform, SAMPLE_RATE)
+    mask = VoiceActivityDetector().analyze(AudioSource(str(path), SAMPLE_RATE), SAMPLE_RATE)
+    assert torch.equal(mask, expected)